@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Tender analytics engine
+Daily/weekly/monthly rollups precomputed into the analytics table with pandas
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+
+from startup import lazy_import
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+# Granularity -> pandas period frequency (weeks start on Monday)
+GRANULARITIES = {'day': 'D', 'week': 'W-SUN', 'month': 'M'}
+
+# Range -> number of months shown; trends compare against the window before it
+RANGES = {'3months': 3, '6months': 6, '12months': 12, 'all': None}
+TREND_MONTHS_FOR_ALL = 12
+
+BUCKET_METRICS = ['bids', 'won', 'lost', 'value', 'won_value', 'profit_sum', 'profit_count']
+VALUE_BAND_EDGES = [100000, 500000, 1000000, 5000000]
+VALUE_BAND_LABELS = ['<$100K', '$100K-$500K', '$500K-$1M', '$1M-$5M', '>$5M']
+RISK_SCATTER_LIMIT = 200
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket containing day"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def months_before(day, months):
+    """First day of the month `months` months before day's month"""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _as_date(value):
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d').date()
+
+
+# Rollups
+def refresh_user(conn, user_id, since=None):
+    """Recompute every bucket starting on or after `since` (all buckets if None)"""
+    params = [user_id]
+    where = 'user_id = ?'
+    if since is not None:
+        where += ' AND COALESCE(submission_date, DATE(created_at)) >= ?'
+        params.append(since.isoformat())
+
+    rows = conn.execute(f'''
+        SELECT COALESCE(submission_date, DATE(created_at)), status, value, profit_prediction, category
+        FROM tenders
+        WHERE {where}
+    ''', params).fetchall()
+
+    if since is None:
+        conn.execute('DELETE FROM analytics WHERE user_id = ?', (user_id,))
+    else:
+        conn.execute('DELETE FROM analytics WHERE user_id = ? AND date >= ?', (user_id, since.isoformat()))
+
+    if rows:
+        conn.executemany(
+            'INSERT INTO analytics (user_id, metric_name, metric_value, date) VALUES (?, ?, ?, ?)',
+            [(user_id, name, value, day) for name, value, day in _rollup_rows(rows, since)]
+        )
+    conn.commit()
+
+
+def refresh_for_date(conn, user_id, day):
+    """Incrementally refresh only the buckets that contain day"""
+    day = _as_date(day)
+    since = min(bucket_start(day, granularity) for granularity in GRANULARITIES)
+    refresh_user(conn, user_id, since)
+
+
+def _rollup_rows(rows, since):
+    """Vectorized aggregation of tender rows into (metric_name, value, bucket_date) tuples"""
+    df = pd.DataFrame(rows, columns=['date', 'status', 'value', 'profit', 'category'])
+    df['date'] = pd.to_datetime(df['date'])
+    # Rows written before values were validated may hold text; count those as 0
+    df['value'] = pd.to_numeric(df['value'], errors='coerce').fillna(0.0)
+    df['bids'] = 1
+    df['won'] = (df['status'] == 'won').astype(int)
+    df['lost'] = (df['status'] == 'lost').astype(int)
+    df['won_value'] = df['value'] * df['won']
+    df['profit_sum'] = df['profit'].fillna(0.0)
+    df['profit_count'] = df['profit'].notna().astype(int)
+    df['category'] = df['category'].fillna('Other')
+    df['band'] = np.digitize(df['value'].to_numpy(), VALUE_BAND_EDGES)
+
+    frames = []
+    for granularity, freq in GRANULARITIES.items():
+        df['bucket'] = df['date'].dt.to_period(freq).dt.start_time
+        totals = df.groupby('bucket')[BUCKET_METRICS].sum()
+        long = totals.stack().reset_index()
+        long.columns = ['bucket', 'metric', 'value']
+        long['metric'] = granularity + ':' + long['metric']
+        frames.append(long)
+
+        if granularity == 'month':
+            by_category = df.groupby(['bucket', 'category'])[['bids', 'won']].sum().stack().reset_index()
+            by_category.columns = ['bucket', 'category', 'metric', 'value']
+            by_category['metric'] = 'month:category_' + by_category['metric'] + ':' + by_category['category']
+            frames.append(by_category[['bucket', 'metric', 'value']])
+
+            by_band = df.groupby(['bucket', 'band']).size().reset_index(name='value')
+            by_band['metric'] = 'month:band:' + by_band['band'].astype(str)
+            frames.append(by_band[['bucket', 'metric', 'value']])
+
+    out = pd.concat(frames, ignore_index=True)
+    if since is not None:
+        # Buckets that straddle `since` were only partially read; leave them untouched
+        out = out[out['bucket'] >= pd.Timestamp(since)]
+    out['day'] = out['bucket'].dt.strftime('%Y-%m-%d')
+    return zip(out['metric'], out['value'].astype(float), out['day'])
+
+
+# Read path
+def _load_buckets(conn, user_id, granularity, start):
+    prefix = granularity + ':'
+    params = [user_id, prefix, prefix + '\uffff']
+    where = 'user_id = ? AND metric_name >= ? AND metric_name < ?'
+    if start is not None:
+        where += ' AND date >= ?'
+        params.append(start.isoformat())
+    rows = conn.execute(
+        f'SELECT metric_name, date, metric_value FROM analytics WHERE {where}', params
+    ).fetchall()
+    if not rows:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name='date'))
+    df = pd.DataFrame(rows, columns=['metric', 'date', 'value'])
+    df['metric'] = df['metric'].str.slice(len(prefix))
+    df['date'] = pd.to_datetime(df['date'])
+    return df.pivot_table(index='date', columns='metric', values='value', aggfunc='sum', fill_value=0)
+
+
+def _window_summary(buckets):
+    totals = buckets.reindex(columns=BUCKET_METRICS, fill_value=0).sum()
+    bids = totals['bids']
+    return {
+        'totalBids': int(bids),
+        'winRate': round(totals['won'] / bids * 100, 1) if bids else 0.0,
+        'totalValue': float(totals['won_value']),
+        'avgProfitMargin': round(totals['profit_sum'] / totals['profit_count'] * 100, 1) if totals['profit_count'] else 0.0
+    }
+
+
+def _pct_change(current, previous):
+    if not previous:
+        return 0.0
+    return round((current - previous) / previous * 100, 1)
+
+
+def _label(ts, granularity):
+    if granularity == 'month':
+        return ts.strftime('%b %Y')
+    return ts.strftime('%Y-%m-%d')
+
+
+def has_rollups(conn, user_id):
+    return conn.execute('SELECT 1 FROM analytics WHERE user_id = ? LIMIT 1', (user_id,)).fetchone() is not None
+
+
+def summarize(conn, user_id, range_name='12months', granularity='month', today=None):
+    """Build the /api/analytics payload from precomputed buckets"""
+    today = today or date.today()
+    months = RANGES[range_name]
+    trend_months = months or TREND_MONTHS_FOR_ALL
+    start = months_before(today, months - 1) if months else None
+    trend_start = months_before(today, trend_months - 1)
+    previous_start = months_before(today, 2 * trend_months - 1)
+
+    # Monthly buckets drive the summary, trends and breakdowns
+    monthly = _load_buckets(conn, user_id, 'month', None if start is None else min(start, previous_start))
+    current = monthly[monthly.index >= pd.Timestamp(start)] if start else monthly
+    summary = _window_summary(current)
+
+    this_window = _window_summary(monthly[monthly.index >= pd.Timestamp(trend_start)])
+    last_window = _window_summary(monthly[
+        (monthly.index >= pd.Timestamp(previous_start)) & (monthly.index < pd.Timestamp(trend_start))
+    ])
+    summary['trends'] = {
+        'bids': _pct_change(this_window['totalBids'], last_window['totalBids']),
+        'winRate': round(this_window['winRate'] - last_window['winRate'], 1),
+        'value': _pct_change(this_window['totalValue'], last_window['totalValue']),
+        'profit': round(this_window['avgProfitMargin'] - last_window['avgProfitMargin'], 1)
+    }
+
+    # Time series at the requested granularity
+    series = current if granularity == 'month' else _load_buckets(conn, user_id, granularity, start)
+    series = series.reindex(columns=BUCKET_METRICS, fill_value=0).sort_index()
+    labels = [_label(ts, granularity) for ts in series.index]
+
+    # Category win rates and value bands over the selected window
+    category_bids = current.filter(like='category_bids:').sum()
+    category_won = current.filter(like='category_won:').sum()
+    categories = [name.split(':', 1)[1] for name in category_bids.index]
+    win_rates = [
+        round(float(category_won.get(f'category_won:{c}', 0)) / bids * 100, 1) if bids else 0.0
+        for c, bids in zip(categories, category_bids.to_numpy())
+    ]
+    bands = current.reindex(
+        columns=[f'band:{i}' for i in range(len(VALUE_BAND_LABELS))], fill_value=0
+    ).sum()
+
+    charts = {
+        'bidTrends': {
+            'labels': labels,
+            'datasets': [
+                {'label': 'Bids Submitted', 'data': series['bids'].astype(int).tolist()},
+                {'label': 'Bids Won', 'data': series['won'].astype(int).tolist()}
+            ]
+        },
+        'categoryPerformance': {
+            'labels': categories,
+            'datasets': [{'label': 'Win Rate %', 'data': win_rates}]
+        },
+        'valueDistribution': {
+            'labels': VALUE_BAND_LABELS,
+            'datasets': [{'data': bands.astype(int).tolist()}]
+        },
+        'riskVsProfit': {
+            'datasets': [{'label': 'Tenders', 'data': _risk_scatter(conn, user_id, start)}]
+        },
+        'monthlyRevenue': {
+            'labels': [_label(ts, 'month') for ts in current.index.sort_values()],
+            'datasets': [{
+                'label': 'Revenue ($)',
+                'data': current.sort_index().reindex(columns=['won_value'], fill_value=0)['won_value'].tolist()
+            }]
+        }
+    }
+
+    return {
+        'summary': summary,
+        'charts': charts,
+        'insights': _insights(summary, categories, win_rates)
+    }
+
+
+def _risk_scatter(conn, user_id, start):
+    params = [user_id]
+    where = 'user_id = ? AND risk_score IS NOT NULL AND profit_prediction IS NOT NULL'
+    if start is not None:
+        where += ' AND created_at >= ?'
+        params.append(start.isoformat())
+    rows = conn.execute(f'''
+        SELECT risk_score, profit_prediction FROM tenders
+        WHERE {where}
+        ORDER BY created_at DESC, id DESC
+        LIMIT {RISK_SCATTER_LIMIT}
+    ''', params).fetchall()
+    return [{'x': round(risk, 2), 'y': round(profit * 100, 1)} for risk, profit in rows]
+
+
+def _insights(summary, categories, win_rates):
+    insights = []
+    if categories and summary['totalBids']:
+        best = int(np.argmax(win_rates))
+        insights.append({
+            'type': 'positive',
+            'title': f'Strongest Category: {categories[best]}',
+            'description': f'{categories[best]} tenders won {win_rates[best]}% of bids in this period.'
+        })
+    trend = summary['trends']['winRate']
+    if trend < 0:
+        insights.append({
+            'type': 'warning',
+            'title': 'Win Rate Declining',
+            'description': f'Win rate is down {abs(trend)} points compared with the previous period.'
+        })
+    elif trend > 0:
+        insights.append({
+            'type': 'positive',
+            'title': 'Win Rate Improving',
+            'description': f'Win rate is up {trend} points compared with the previous period.'
+        })
+    return insights
@@ -7,33 +7,50 @@ Free, open-source tender management with ML-driven insights
 import os
 import sys
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from functools import wraps
 import jwt
 import bcrypt
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Request, Response, g, request, jsonify, make_response, send_file
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-import sqlite3
-import pandas as pd
-import numpy as np
-from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-import pickle
-import io
-import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
-import cv2
-import easyocr
+import math
+import time
+import base64
 import json
-from werkzeug.utils import secure_filename
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
+import threading
+from urllib.parse import quote
+from werkzeug.exceptions import RequestEntityTooLarge, RequestedRangeNotSatisfiable
+from werkzeug.routing import BaseConverter
+from werkzeug.security import safe_join
+from werkzeug.utils import secure_filename, send_file as send_file_from
+from startup import lazy_import, report as startup_report
+from db import Connection, Database
+from cache import TTLCache
+from auth import PasswordHasher, TokenDecoder, HasherBusy
+import analytics
+import search
+import bulk
+from documents import process_document_job, process_document_failed, get_pages, iter_text, reuse_extraction
+from documents import ensure_schema as ensure_document_schema
+from jobs import JobQueue
+from scheduler import Scheduler
+import metrics
+import ratelimit  # registers the sqlite:// limiter storage
+import reports
+import training
+import client_stats
+import http_cache
+import ocr
+import uploads
+from storage import BlobStore
+from model_registry import ModelRegistry
+from storage import ensure_schema as ensure_blob_schema
+
+# Heavy scientific stack is imported on first use, not at worker startup
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -43,93 +60,345 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['REPORT_FOLDER'] = os.environ.get('REPORT_FOLDER', 'reports')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
+# Bulk imports are read as a stream, so they may be far larger (nginx.conf allows the same)
+IMPORT_MAX_CONTENT_LENGTH = int(os.environ.get('IMPORT_MAX_CONTENT_LENGTH', 512 * 1024 * 1024))
+# Behind nginx: the internal location that serves UPLOAD_FOLDER (see nginx.conf). Downloads are
+# then answered with X-Accel-Redirect and sent by nginx; unset, the worker sends them itself
+DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX')
+app.config['RATELIMIT_ENABLED'] = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+
+class RowIdConverter(BaseConverter):
+    """Tender and document ids in URLs: integers on SQLite, UUIDs on the PostgreSQL schema"""
+    regex = r'\d+|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+    
+    def to_python(self, value):
+        return int(value) if value.isdigit() else value.lower()
+
+app.url_map.converters['rowid'] = RowIdConverter
+
+# Endpoints whose request body may exceed MAX_CONTENT_LENGTH
+BODY_LIMITS = {'import_tenders': IMPORT_MAX_CONTENT_LENGTH}
+
+class AppRequest(Request):
+    """Request with per-endpoint body limits (BODY_LIMITS)"""
+    
+    @property
+    def max_content_length(self):
+        return BODY_LIMITS.get(self.endpoint) or super().max_content_length
+
+app.request_class = AppRequest
 
 # Initialize CORS
 CORS(app, origins=['http://localhost:3000'])
 
-# Initialize rate limiter
+# Request metrics; registered before the limiter so rejected requests are timed too
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 0))
+
+if metrics.ENABLED:
+    Connection.observer = metrics.observe_query
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_token = metrics.start_request()
+
+    @app.after_request
+    def record_request_metrics(response):
+        token = g.pop('metrics_token', None)
+        if token is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        stats = metrics.end_request(token, request.method, route, response.status_code)
+        elapsed_ms = stats['elapsed'] * 1000
+        if SLOW_REQUEST_MS and elapsed_ms >= SLOW_REQUEST_MS:
+            logger.warning(f"Slow request {request.method} {route} {response.status_code} "
+                           f"in {elapsed_ms:.1f} ms ({metrics.describe(stats)})")
+        return response
+
+# Compress large JSON/text responses for clients that accept gzip (or br, with brotli installed)
+@app.after_request
+def compress_response(response):
+    return http_cache.compress_response(request, response)
+
+# Initialize rate limiter; counters live in a SQLite file shared by all worker processes
+def rate_limit_key():
+    """Limit signed-in users per account and everyone else per client address"""
+    token = request.headers.get('Authorization', '')
+    if token.startswith('Bearer '):
+        try:
+            return f"user:{token_decoder.decode(token[7:])['user_id']}"
+        except jwt.InvalidTokenError:
+            pass
+    return get_remote_address()
+
 limiter = Limiter(
-    app,
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"]
+    rate_limit_key,
+    app=app,
+    default_limits=["200 per day", "50 per hour"],
+    storage_uri=os.environ.get('RATELIMIT_STORAGE_URI', 'sqlite:///ratelimits.db'),
+    strategy=os.environ.get('RATELIMIT_STRATEGY', 'moving-window')
 )
 
+# Initialize pooled database access
+db = Database()
+db.init_app(app)
+
+# Per-user dashboard stats, tagged with the data version they were computed at
+dashboard_cache = TTLCache(maxsize=10000, ttl=float(os.environ.get('DASHBOARD_CACHE_TTL', 5)))
+
+# Per-client bid/win counters behind the ML client_history feature
+client_stats_store = client_stats.ClientStatsStore(ttl=float(os.environ.get('CLIENT_STATS_CACHE_TTL', 30)))
+
+# Auth hot path: verified token claims and user profiles cached per process
+token_decoder = TokenDecoder(app.config['SECRET_KEY'])
+user_cache = TTLCache(maxsize=10000, ttl=float(os.environ.get('AUTH_USER_CACHE_TTL', 60)))
+password_hasher = PasswordHasher()
+
 # Create upload directory
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Uploaded files are stored once per content hash
+blob_store = BlobStore(app.config['UPLOAD_FOLDER'])
+# Chunked uploads for files above MAX_CONTENT_LENGTH, resumable after a disconnect
+upload_store = uploads.UploadStore(app.config['UPLOAD_FOLDER'])
+
+# Tables the app reads and writes (what supabase/migrations must have created on PostgreSQL)
+SCHEMA_TABLES = ('users', 'tenders', 'documents', 'analytics', 'tender_stats', 'client_stats', 'data_versions',
+                 'blobs', 'document_pages', 'document_texts', 'extraction_cache', 'jobs', 'reports',
+                 'scheduled_tasks', 'upload_sessions')
+
 # Database initialization
 def init_database():
     """Initialize SQLite database with required tables"""
-    conn = sqlite3.connect('tender_management.db')
-    cursor = conn.cursor()
+    if db.backend.name != 'sqlite':
+        # The schema comes from supabase/migrations; refuse to start without it
+        with db.connection() as conn:
+            missing = [table for table in SCHEMA_TABLES
+                       if conn.execute('SELECT to_regclass(?)', (table,)).fetchone()[0] is None]
+        if missing:
+            raise RuntimeError(f"Apply supabase/migrations first; missing tables: {', '.join(missing)}")
+        logger.info(f"Schema for {db.backend.name} is managed by supabase/migrations")
+        return
     
-    # Users table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            name TEXT NOT NULL,
-            email TEXT UNIQUE NOT NULL,
-            password_hash TEXT NOT NULL,
-            company TEXT,
-            phone TEXT,
-            address TEXT,
-            bio TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    with db.connection() as conn:
+        # Users table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT NOT NULL,
+                email TEXT UNIQUE NOT NULL,
+                password_hash TEXT NOT NULL,
+                company TEXT,
+                phone TEXT,
+                address TEXT,
+                bio TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
     
-    # Tenders table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tenders (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            title TEXT NOT NULL,
-            description TEXT,
-            client TEXT,
-            value REAL,
-            deadline DATE,
-            status TEXT DEFAULT 'active',
-            category TEXT,
-            risk_score REAL,
-            profit_prediction REAL,
-            submission_date DATE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
+        # Tenders table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS tenders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                title TEXT NOT NULL,
+                description TEXT,
+                client TEXT,
+                value REAL,
+                deadline DATE,
+                status TEXT DEFAULT 'active',
+                category TEXT,
+                risk_score REAL,
+                profit_prediction REAL,
+                submission_date DATE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
     
-    # Documents table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS documents (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tender_id INTEGER,
-            filename TEXT NOT NULL,
-            original_filename TEXT NOT NULL,
-            file_size INTEGER,
-            file_type TEXT,
-            extracted_text TEXT,
-            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (tender_id) REFERENCES tenders (id)
-        )
-    ''')
+        # Documents table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tender_id INTEGER,
+                filename TEXT NOT NULL,
+                original_filename TEXT NOT NULL,
+                file_size INTEGER,
+                file_type TEXT,
+                upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (tender_id) REFERENCES tenders (id)
+            )
+        ''')
     
-    # Analytics table
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS analytics (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            metric_name TEXT,
-            metric_value REAL,
-            date DATE,
-            FOREIGN KEY (user_id) REFERENCES users (id)
-        )
-    ''')
+        # Model version behind each tender's risk_score/profit_prediction
+        add_column(conn, 'tenders', 'model_version', 'TEXT')
+        # Days-to-deadline bucket the score was computed in (training.DEADLINE_BUCKET_EDGES);
+        # refresh_deadline_scores re-scores a tender once it moves to another bucket
+        add_column(conn, 'tenders', 'deadline_bucket', 'INTEGER')
+        
+        # When a tender was decided (won/lost); new outcomes drive incremental training
+        add_column(conn, 'tenders', 'outcome_at', 'TIMESTAMP')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_tenders_outcome
+            AFTER UPDATE OF status ON tenders
+            WHEN NEW.status IN ('won', 'lost') AND OLD.status IS NOT NEW.status BEGIN
+                UPDATE tenders SET outcome_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+            END
+        ''')
+        conn.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_tenders_outcome_time ON tenders ({training.OUTCOME_TIME_SQL})
+            WHERE status IN ('won', 'lost')
+        ''')
+        
+        # Document processing state (columns added after the initial schema)
+        add_column(conn, 'documents', 'status', "TEXT DEFAULT 'ready'")
+        add_column(conn, 'documents', 'job_id', 'INTEGER')
+        add_column(conn, 'documents', 'page_count', 'INTEGER')
+        add_column(conn, 'documents', 'blob_sha256', 'TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_documents_blob ON documents (blob_sha256)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_documents_tender ON documents (tender_id)')
+        ensure_blob_schema(conn)
+        ensure_document_schema(conn)
+        uploads.ensure_schema(conn)
+        
+        # Analytics table
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS analytics (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER,
+                metric_name TEXT,
+                metric_value REAL,
+                date DATE,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # Indexes for keyset pagination and status filters on tender lists
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tenders_user_created ON tenders (user_id, created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tenders_user_status ON tenders (user_id, status, created_at, id)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_tenders_user_submission ON tenders (user_id, submission_date)')
+        # Deadline range scans of the score refresh and expiry. Written as an OR,
+        # which SQLite (unlike an IN list) can match to status = 'active' alone
+        old_index = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_tenders_open_deadline'"
+        ).fetchone()
+        if old_index and ' IN ' in old_index[0]:
+            conn.execute('DROP INDEX idx_tenders_open_deadline')
+        conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_tenders_open_deadline ON tenders (deadline)
+            WHERE status = 'active' OR status = 'pending'
+        ''')
+        
+        # Analytics rollups: one row per (user, granularity:metric, bucket start)
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_user_metric_date ON analytics (user_id, metric_name, date)')
+        
+        # Per-user dashboard summary, maintained by triggers on every tender write
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS tender_stats (
+                user_id INTEGER PRIMARY KEY,
+                total_tenders INTEGER NOT NULL DEFAULT 0,
+                active_tenders INTEGER NOT NULL DEFAULT 0,
+                won_tenders INTEGER NOT NULL DEFAULT 0,
+                won_value REAL NOT NULL DEFAULT 0,
+                profit_sum REAL NOT NULL DEFAULT 0,
+                profit_count INTEGER NOT NULL DEFAULT 0,
+                version INTEGER NOT NULL DEFAULT 0,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tender_stats_insert AFTER INSERT ON tenders BEGIN
+                INSERT OR IGNORE INTO tender_stats (user_id) VALUES (NEW.user_id);
+                {tender_stats_delta_sql('NEW', '+')}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tender_stats_update
+            AFTER UPDATE OF user_id, status, value, profit_prediction ON tenders BEGIN
+                INSERT OR IGNORE INTO tender_stats (user_id) VALUES (NEW.user_id);
+                {tender_stats_delta_sql('OLD', '-')}
+                {tender_stats_delta_sql('NEW', '+')}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_tender_stats_delete AFTER DELETE ON tenders BEGIN
+                {tender_stats_delta_sql('OLD', '-')}
+            END
+        ''')
+        # Reports are keyed on data_versions now; drop the old cache-key trigger from existing databases
+        conn.execute('DROP TRIGGER IF EXISTS trg_tender_stats_touch')
+        rebuild_tender_stats(conn)
+        client_stats.ensure_schema(conn)
+        http_cache.ensure_schema(conn)
+        
+        job_queue.ensure_schema(conn)
+        task_scheduler.ensure_schema(conn)
+        search.ensure_schema(conn)
+        reports.ensure_schema(conn)
     
-    conn.commit()
-    conn.close()
+        conn.commit()
     logger.info("Database initialized successfully")
 
+def add_column(conn, table, column, definition):
+    """Add a column to an existing SQLite table if it is missing"""
+    existing = [row[1] for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+    if column not in existing:
+        conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+
+def tender_stats_delta_sql(row, sign):
+    """Trigger statement adding (+) or removing (-) one tender row from tender_stats"""
+    return f'''
+        UPDATE tender_stats SET
+            total_tenders = total_tenders {sign} 1,
+            active_tenders = active_tenders {sign} ({row}.status = 'active'),
+            won_tenders = won_tenders {sign} ({row}.status = 'won'),
+            won_value = won_value {sign} (CASE WHEN {row}.status = 'won' THEN COALESCE({row}.value, 0) ELSE 0 END),
+            profit_sum = profit_sum {sign} COALESCE({row}.profit_prediction, 0),
+            profit_count = profit_count {sign} ({row}.profit_prediction IS NOT NULL),
+            version = version + 1
+        WHERE user_id = {row}.user_id;'''
+
+def rebuild_tender_stats(conn):
+    """Recompute every user's summary in one grouped pass over tenders"""
+    conn.execute('''
+        INSERT INTO tender_stats (user_id, total_tenders, active_tenders, won_tenders,
+                                  won_value, profit_sum, profit_count)
+        SELECT user_id,
+               COUNT(*),
+               SUM(CASE WHEN status = 'active' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'won' THEN 1 ELSE 0 END),
+               COALESCE(SUM(CASE WHEN status = 'won' THEN value END), 0),
+               COALESCE(SUM(profit_prediction), 0),
+               COUNT(profit_prediction)
+        FROM tenders
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        ON CONFLICT (user_id) DO UPDATE SET
+            total_tenders = excluded.total_tenders,
+            active_tenders = excluded.active_tenders,
+            won_tenders = excluded.won_tenders,
+            won_value = excluded.won_value,
+            profit_sum = excluded.profit_sum,
+            profit_count = excluded.profit_count,
+            version = tender_stats.version + 1
+        WHERE tender_stats.total_tenders != excluded.total_tenders
+           OR tender_stats.active_tenders != excluded.active_tenders
+           OR tender_stats.won_tenders != excluded.won_tenders
+           OR tender_stats.won_value != excluded.won_value
+           OR tender_stats.profit_sum != excluded.profit_sum
+           OR tender_stats.profit_count != excluded.profit_count
+    ''')
+
+def refresh_analytics(conn, user_id, day):
+    """Incrementally update the rollup buckets touched by a tender write"""
+    try:
+        analytics.refresh_for_date(conn, user_id, day)
+    except Exception as e:
+        # Rollups are derived data; never fail the write because of them
+        conn.rollback()
+        logger.error(f"Analytics refresh error: {e}")
+
 # Authentication decorator
 def token_required(f):
     @wraps(f)
@@ -141,7 +410,7 @@ def token_required(f):
         try:
             if token.startswith('Bearer '):
                 token = token[7:]
-            data = jwt.decode(token, app.config['SECRET_KEY'], algorithms=['HS256'])
+            data = token_decoder.decode(token)
             current_user_id = data['user_id']
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired'}), 401
@@ -151,30 +420,102 @@ def token_required(f):
         return f(current_user_id, *args, **kwargs)
     return decorated
 
+def versioned(f):
+    """Conditional GET for a per-user read endpoint (use below token_required)
+
+    The ETag derives from the user's data version, bumped by triggers on
+    every write, so a 304 costs one primary-key read and never touches the
+    tender rows. Last-Modified is informational only (see matching_etag).
+    The version is passed on in g.data_version.
+    """
+    @wraps(f)
+    def decorated(current_user_id, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return f(current_user_id, *args, **kwargs)
+        
+        version, last_modified = http_cache.data_version(db.get(), current_user_id)
+        etag = http_cache.make_etag(current_user_id, version, request.full_path)
+        matched = http_cache.matching_etag(request, etag)
+        if matched:
+            http_cache.not_modified.inc(route=request.url_rule.rule)
+            response = app.response_class(status=304)
+            response.set_etag(matched)
+        else:
+            g.data_version = version
+            response = make_response(f(current_user_id, *args, **kwargs))
+            if response.status_code != 200:
+                return response
+            response.set_etag(etag)
+        if last_modified:
+            response.last_modified = last_modified
+        # Browsers revalidate every time; shared caches must not store per-user data
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.vary.add('Authorization')
+        return response
+    return decorated
+
 # ML Models
+# Workers check the registry's active version this often and hot-swap on change
+ML_RELOAD_INTERVAL = float(os.environ.get('ML_RELOAD_INTERVAL', 5))
+ML_BATCH_LIMIT = 1000
+
 class TenderMLModels:
-    def __init__(self):
-        self.risk_model = None
-        self.profit_model = None
-        self.scaler = StandardScaler()
-        self.load_or_train_models()
+    def __init__(self, registry):
+        self.registry = registry
+        # (version, scaler, risk_model, profit_model), replaced as a whole on reload
+        self.bundle = None
+        self._checked_at = 0
+        self._lock = threading.Lock()
+    
+    @property
+    def version(self):
+        return self.bundle[0] if self.bundle else None
+    
+    def ensure_loaded(self):
+        """Load (or train) the models on first use, then follow the registry's active version"""
+        if self.bundle is None:
+            with self._lock:
+                if self.bundle is None:
+                    with startup_report.timed('ml_models_load'):
+                        self.load_or_train_models()
+            return
+        if time.monotonic() - self._checked_at >= ML_RELOAD_INTERVAL:
+            self._checked_at = time.monotonic()
+            self.reload()
     
     def load_or_train_models(self):
-        """Load existing models or train new ones"""
-        try:
-            with open('models/risk_model.pkl', 'rb') as f:
-                self.risk_model = pickle.load(f)
-            with open('models/profit_model.pkl', 'rb') as f:
-                self.profit_model = pickle.load(f)
-            with open('models/scaler.pkl', 'rb') as f:
-                self.scaler = pickle.load(f)
-            logger.info("ML models loaded successfully")
-        except FileNotFoundError:
-            logger.info("Training new ML models...")
-            self.train_models()
+        """Load the active version, importing old pickles or training one if there is none"""
+        version = self.registry.active()
+        if version is None:
+            version = self.registry.import_legacy()
+            if version is None:
+                logger.info("Training new ML models...")
+                version = self.train_models()
+            self.registry.activate(version)
+        self.load_version(version)
+        self._checked_at = time.monotonic()
+    
+    def load_version(self, version):
+        artifacts = self.registry.load(version)
+        self.bundle = (version, artifacts['scaler'], artifacts['risk_model'], artifacts['profit_model'])
+        logger.info(f"ML models {version} loaded successfully")
+    
+    def reload(self):
+        """Swap in the registry's active version if it changed; in-flight predictions keep the old one"""
+        version = self.registry.active()
+        if not version or version == self.version:
+            return
+        with self._lock:
+            if version == self.version:
+                return
+            try:
+                self.load_version(version)
+            except Exception as e:
+                logger.error(f"Reloading ML models {version} failed: {e}")
     
     def train_models(self):
-        """Train ML models with sample data"""
+        """Train ML models with sample data and save them as a new version"""
         # Generate sample training data
         np.random.seed(42)
         n_samples = 1000
@@ -192,91 +533,272 @@ class TenderMLModels:
         profit_margins = np.clip(profit_margins, 0, 0.5)
         
         # Train models
-        X_scaled = self.scaler.fit_transform(X)
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        from sklearn.preprocessing import StandardScaler
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
         
-        self.risk_model = RandomForestClassifier(n_estimators=100, random_state=42)
+        risk_model = RandomForestClassifier(n_estimators=100, random_state=42)
         risk_labels = (risk_scores > 0.5).astype(int)
-        self.risk_model.fit(X_scaled, risk_labels)
-        
-        self.profit_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.profit_model.fit(X_scaled, profit_margins)
+        risk_model.fit(X_scaled, risk_labels)
         
-        # Save models
-        os.makedirs('models', exist_ok=True)
-        with open('models/risk_model.pkl', 'wb') as f:
-            pickle.dump(self.risk_model, f)
-        with open('models/profit_model.pkl', 'wb') as f:
-            pickle.dump(self.profit_model, f)
-        with open('models/scaler.pkl', 'wb') as f:
-            pickle.dump(self.scaler, f)
+        profit_model = RandomForestRegressor(n_estimators=100, random_state=42)
+        profit_model.fit(X_scaled, profit_margins)
         
+        version = self.registry.save(
+            {'scaler': scaler, 'risk_model': risk_model, 'profit_model': profit_model},
+            {'source': 'synthetic', 'samples': n_samples}
+        )
         logger.info("ML models trained and saved successfully")
+        return version
     
     def predict_risk_and_profit(self, tender_value, days_to_deadline, category, client_history=0.5):
-        """Predict risk score and profit margin for a tender"""
+        """Predict risk score and profit margin for a tender, with the model version used"""
+        risk, profit, version = self.predict_many([tender_value], [days_to_deadline], [category], [client_history])
+        return float(risk[0]), float(profit[0]), version
+    
+    def predict_many(self, tender_values, days_to_deadline, categories, client_history=None):
+        """Predict risk scores and profit margins for N tenders in one pass per model
+        
+        Returns (risk_scores, profit_margins, model_version); the version is None
+        when the models failed and default values were returned.
+        """
+        n = len(tender_values)
         try:
-            # Encode category
-            category_map = {'Construction': 0, 'Technology': 1, 'Healthcare': 2, 'Infrastructure': 3, 'Education': 4}
-            category_encoded = category_map.get(category, 0)
-            
-            # Prepare features
-            features = np.array([[tender_value, days_to_deadline, category_encoded, client_history]])
-            features_scaled = self.scaler.transform(features)
+            self.ensure_loaded()
+            version, scaler, risk_model, profit_model = self.bundle
             
-            # Make predictions
-            risk_prob = self.risk_model.predict_proba(features_scaled)[0][1]
-            profit_margin = self.profit_model.predict(features_scaled)[0]
+            # Encode categories and prepare an N x 4 feature matrix
+            category_encoded = training.encode_categories(categories)
+            if client_history is None:
+                client_history = np.full(n, 0.5)
+            features = np.column_stack([
+                np.asarray(tender_values, dtype=float),
+                np.asarray(days_to_deadline, dtype=float),
+                np.asarray(category_encoded, dtype=float),
+                np.asarray(client_history, dtype=float)
+            ])
+            with metrics.timed('ml_inference'):
+                features_scaled = scaler.transform(features)
+                
+                # Make predictions
+                risk_probs = risk_model.predict_proba(features_scaled)[:, 1]
+                profit_margins = np.maximum(profit_model.predict(features_scaled), 0)
             
-            return float(risk_prob), float(max(0, profit_margin))
+            return risk_probs, profit_margins, version
         except Exception as e:
             logger.error(f"Error in ML prediction: {e}")
-            return 0.3, 0.15  # Default values
+            return np.full(n, 0.3), np.full(n, 0.15), None  # Default values
+
+def score_tender_rows(conn, rows, today, cached=True):
+    """Score (id, user_id, value, deadline, category, client) rows in one model pass
+    
+    Rows may belong to several users; client history is looked up per user.
+    Returns SCORE_UPDATE_SQL parameters (risk, profit, version, deadline bucket, id) per row.
+    """
+    ids, user_ids, values, deadlines, categories, clients = zip(*rows)
+    days = (pd.to_datetime(pd.Series(deadlines), errors='coerce') - today).dt.days.fillna(0).to_numpy()
+    # Rows written before values were validated may hold text; score those as 0
+    values = pd.to_numeric(pd.Series(values), errors='coerce').fillna(0).to_numpy(dtype=float)
+    client_history = np.empty(len(rows))
+    for user_id in set(user_ids):
+        positions = [i for i, owner in enumerate(user_ids) if owner == user_id]
+        client_history[positions] = client_stats_store.history(
+            conn, user_id, [clients[i] for i in positions], cached=cached)
+    risk_scores, profit_predictions, model_version = ml_models.predict_many(values, days, categories, client_history)
+    buckets = training.deadline_bucket(days)
+    return [(risk, profit, model_version, bucket, tender_id) for risk, profit, bucket, tender_id
+            in zip(risk_scores.tolist(), profit_predictions.tolist(), buckets.tolist(), ids)]
+
+SCORE_UPDATE_SQL = '''
+    UPDATE tenders SET risk_score = ?, profit_prediction = ?, model_version = ?, deadline_bucket = ? WHERE id = ?
+'''
 
-# Document processing
-class DocumentProcessor:
-    def __init__(self):
-        self.ocr_reader = easyocr.Reader(['en'])
+def score_tender_rows_isolated(conn, rows, today, cached=True):
+    """score_tender_rows, one row at a time if the chunk fails; returns (updates, ids that failed)
     
-    def extract_text_from_pdf(self, file_path):
-        """Extract text from PDF using PyMuPDF"""
+    One unreadable tender then costs only its own score, not the chunk's.
+    """
+    try:
+        return score_tender_rows(conn, rows, today, cached), []
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Scoring {len(rows)} tenders failed, retrying one by one: {e}")
+    updates, failed = [], []
+    for row in rows:
         try:
-            doc = fitz.open(file_path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            doc.close()
-            return text
+            updates += score_tender_rows(conn, [row], today, cached)
         except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
-            return ""
+            conn.rollback()
+            failed.append(row[0])
+            logger.error(f"Scoring tender {row[0]} failed: {e}")
+    return updates, failed
+
+def rescore_user_tenders(conn, user_id, chunk_size=500):
+    """Re-run ML scoring over all of a user's tenders, one chunk per transaction
+    
+    A tender that can't be scored keeps its old score; the rest are updated.
+    Returns the number of tenders re-scored.
+    """
+    today = pd.Timestamp.now().normalize()
+    last_id = None
+    updated = 0
+    while True:
+        # Keyset on id without assuming its type (integer or UUID)
+        after = '' if last_id is None else ' AND id > ?'
+        rows = conn.execute(f'''
+            SELECT id, user_id, value, deadline, category, client
+            FROM tenders
+            WHERE user_id = ?{after}
+            ORDER BY id
+            LIMIT ?
+        ''', (user_id, *([] if last_id is None else [last_id]), chunk_size)).fetchall()
+        if not rows:
+            break
+        
+        updates, _ = score_tender_rows_isolated(conn, rows, today)
+        conn.executemany(SCORE_UPDATE_SQL, updates)
+        conn.commit()
+        updated += len(updates)
+        last_id = rows[-1][0]
+    return updated
+
+# Open tenders whose deadline bucket changed are re-scored this often (seconds)
+SCORE_REFRESH_INTERVAL = int(os.environ.get('SCORE_REFRESH_INTERVAL', 3600))
+SCORE_REFRESH_CHUNK = int(os.environ.get('SCORE_REFRESH_CHUNK', 1000))
+
+def expire_tenders(conn, today):
+    """Move active tenders past their deadline to 'expired'; returns (how many, their owners' ids)
+    
+    Pending tenders have been submitted and await a decision, so their
+    deadline passing is expected and they are left alone.
+    """
+    expired, owners = 0, set()
+    while True:
+        rows = conn.execute('''
+            SELECT id, user_id FROM tenders WHERE status = 'active' AND deadline < ? LIMIT ?
+        ''', (today.isoformat(), SCORE_REFRESH_CHUNK)).fetchall()
+        # status is checked again: the owner may have closed the tender since
+        conn.executemany("UPDATE tenders SET status = 'expired' WHERE id = ? AND status = 'active'",
+                         [(row[0],) for row in rows])
+        conn.commit()
+        expired += len(rows)
+        owners.update(row[1] for row in rows)
+        if len(rows) < SCORE_REFRESH_CHUNK:
+            return expired, owners
+
+def refresh_deadline_scores(conn):
+    """Scheduled task: expire past-deadline tenders and re-score open ones that changed deadline bucket
     
-    def extract_text_from_image(self, file_path):
-        """Extract text from image using EasyOCR"""
+    Each bucket is a deadline date range as of today, read through
+    idx_tenders_open_deadline; tenders already scored in that bucket are
+    skipped, so after the first run only tenders that crossed an edge since
+    the last one (or whose inputs were edited) are read and scored, in
+    chunks of SCORE_REFRESH_CHUNK per model pass and transaction. A tender
+    that can't be scored is logged and left for the next run. The analytics
+    rollups of every user whose tenders changed are rebuilt at the end.
+    Returns the number of tenders updated.
+    """
+    today = date.today()
+    touched, users = expire_tenders(conn, today)
+    for bucket in range(len(training.DEADLINE_BUCKET_EDGES) + 1):
+        first, last = training.deadline_bucket_range(bucket, today)
+        # This form of the status test matches idx_tenders_open_deadline's predicate
+        where = ["(status = 'active' OR status = 'pending')", '(deadline_bucket IS NULL OR deadline_bucket != ?)']
+        params = [bucket]
+        if first:
+            where.append('deadline >= ?')
+            params.append(first.isoformat())
+        if last:
+            where.append('deadline < ?')
+            params.append(last.isoformat())
+        failed = []
+        while True:
+            # Rows that failed stay unscored; keep them out of the rest of this pass
+            excluded = f" AND id NOT IN ({', '.join('?' * len(failed))})" if failed else ''
+            rows = conn.execute(f'''
+                SELECT id, user_id, value, deadline, category, client FROM tenders
+                WHERE {' AND '.join(where)}{excluded}
+                LIMIT ?
+            ''', (*params, *failed, SCORE_REFRESH_CHUNK)).fetchall()
+            if not rows:
+                break
+            # The bucket comes from the range, so a scored row always leaves this query
+            updates, chunk_failed = score_tender_rows_isolated(conn, rows, pd.Timestamp(today), cached=False)
+            conn.executemany(SCORE_UPDATE_SQL, [(*update[:3], bucket, update[4]) for update in updates])
+            conn.commit()
+            failed += chunk_failed
+            touched += len(updates)
+            users.update(row[1] for row in rows if row[0] not in chunk_failed)
+            if len(rows) < SCORE_REFRESH_CHUNK:
+                break
+    
+    # Rollups hold profit predictions and statuses, as after /api/ml/rescore
+    for user_id in users:
         try:
-            result = self.ocr_reader.readtext(file_path)
-            text = " ".join([item[1] for item in result])
-            return text
+            analytics.refresh_user(conn, user_id)
         except Exception as e:
-            logger.error(f"Error extracting text from image: {e}")
-            return ""
-    
-    def process_document(self, file_path, file_type):
-        """Process document and extract text"""
-        if file_type.lower() == 'pdf':
-            return self.extract_text_from_pdf(file_path)
-        elif file_type.lower() in ['jpg', 'jpeg', 'png', 'tiff']:
-            return self.extract_text_from_image(file_path)
-        else:
-            return ""
+            conn.rollback()
+            logger.error(f"Analytics refresh for user {user_id} failed: {e}")
+    return touched
+
+# ML models load lazily; PRELOAD_MODELS=1 loads them at import so that
+# gunicorn --preload workers share the trees copy-on-write with the master
+ml_models = TenderMLModels(ModelRegistry(os.environ.get('MODEL_PATH', 'models')))
+if os.environ.get('PRELOAD_MODELS') == '1':
+    ml_models.ensure_loaded()
+
+# Background jobs; document extraction runs in worker processes, not request threads
+job_queue = JobQueue(db)
+job_queue.register('process_document', process_document_job, process_document_failed)
+job_queue.register('generate_report', reports.generate_report_job, reports.generate_report_failed)
+job_queue.register('train_models', training.train_job)
 
-# Initialize ML models and document processor
-ml_models = TenderMLModels()
-doc_processor = DocumentProcessor()
+# Periodic maintenance, run in-process by whichever worker claims it (SCHEDULER_ENABLED=0 turns it off)
+task_scheduler = Scheduler(db)
+task_scheduler.register('refresh_deadline_scores', SCORE_REFRESH_INTERVAL, refresh_deadline_scores)
+
+# Incremental training is queued once this many new outcomes arrive (0 disables)
+ML_RETRAIN_THRESHOLD = int(os.environ.get('ML_RETRAIN_THRESHOLD', 500))
+ML_RETRAIN_CHECK_INTERVAL = 60
+_retrain_checked_at = 0
+
+def queue_training(conn, mode):
+    """Queue a training job unless one is already pending; returns its id"""
+    pending = conn.execute(
+        "SELECT id FROM jobs WHERE kind = 'train_models' AND status IN ('queued', 'running')"
+    ).fetchone()
+    if pending:
+        return pending[0]
+    job_id = job_queue.enqueue(conn, 'train_models', {'mode': mode}, max_attempts=1)
+    conn.commit()
+    job_queue.notify()
+    return job_id
+
+def maybe_schedule_training(conn):
+    """After outcome writes: queue an incremental update once enough outcomes are new"""
+    global _retrain_checked_at
+    if not ML_RETRAIN_THRESHOLD or time.monotonic() - _retrain_checked_at < ML_RETRAIN_CHECK_INTERVAL:
+        return
+    _retrain_checked_at = time.monotonic()
+    try:
+        meta = ml_models.registry.metadata(ml_models.registry.active()) or {}
+        if training.new_outcomes(conn, meta.get('trainedThrough')) >= ML_RETRAIN_THRESHOLD:
+            queue_training(conn, 'incremental')
+    except Exception as e:
+        conn.rollback()
+        logger.error(f"Scheduling model training failed: {e}")
+
+@app.before_request
+def start_job_dispatcher():
+    job_queue.ensure_started()
+    task_scheduler.ensure_started()
+    startup_report.mark('first_request')
 
 # API Routes
 
 @app.route('/api/auth/register', methods=['POST'])
-@limiter.limit("5 per minute")
+@limiter.limit("5 per minute", key_func=get_remote_address)
 def register():
     """User registration endpoint"""
     try:
@@ -290,23 +812,20 @@ def register():
             return jsonify({'message': 'Missing required fields'}), 400
         
         # Hash password
-        password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+        password_hash = password_hasher.hash(password)
         
         # Insert user into database
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
+        conn = db.get()
         
         try:
-            cursor.execute('''
+            user_id = conn.insert('''
                 INSERT INTO users (name, email, password_hash, company)
                 VALUES (?, ?, ?, ?)
             ''', (name, email, password_hash, company))
-            user_id = cursor.lastrowid
             conn.commit()
-        except sqlite3.IntegrityError:
+        except db.IntegrityError:
+            conn.rollback()
             return jsonify({'message': 'Email already exists'}), 400
-        finally:
-            conn.close()
         
         # Generate JWT token
         token = jwt.encode({
@@ -324,12 +843,14 @@ def register():
             }
         }), 201
         
+    except HasherBusy:
+        return jsonify({'message': 'Server busy, please retry'}), 503
     except Exception as e:
         logger.error(f"Registration error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
 @app.route('/api/auth/login', methods=['POST'])
-@limiter.limit("10 per minute")
+@limiter.limit("10 per minute", key_func=get_remote_address)
 def login():
     """User login endpoint"""
     try:
@@ -341,13 +862,11 @@ def login():
             return jsonify({'message': 'Missing email or password'}), 400
         
         # Check user credentials
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name, email, password_hash, company FROM users WHERE email = ?', (email,))
-        user = cursor.fetchone()
-        conn.close()
+        user = db.get().execute(
+            'SELECT id, name, email, password_hash, company FROM users WHERE email = ?', (email,)
+        ).fetchone()
         
-        if not user or not bcrypt.checkpw(password.encode('utf-8'), user[3]):
+        if not user or not password_hasher.check(password, user[3]):
             return jsonify({'message': 'Invalid credentials'}), 401
         
         # Generate JWT token
@@ -366,116 +885,218 @@ def login():
             }
         }), 200
         
+    except HasherBusy:
+        return jsonify({'message': 'Server busy, please retry'}), 503
     except Exception as e:
         logger.error(f"Login error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
 @app.route('/api/auth/me', methods=['GET'])
 @token_required
+@versioned
 def get_current_user(current_user_id):
     """Get current user information"""
     try:
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, name, email, company, phone, address, bio FROM users WHERE id = ?', (current_user_id,))
-        user = cursor.fetchone()
-        conn.close()
+        # Entries carry the data version they were read at; another worker's write makes them stale
+        version = g.get('data_version')
+        cached = user_cache.get(current_user_id)
+        user = cached[1] if cached and cached[0] == version else None
+        if user is None:
+            row = db.get().execute(
+                'SELECT id, name, email, company, phone, address, bio FROM users WHERE id = ?', (current_user_id,)
+            ).fetchone()
+            
+            if not row:
+                return jsonify({'message': 'User not found'}), 404
+            
+            user = {
+                'id': row[0],
+                'name': row[1],
+                'email': row[2],
+                'company': row[3],
+                'phone': row[4],
+                'address': row[5],
+                'bio': row[6]
+            }
+            user_cache.set(current_user_id, (version, user))
+        
+        return jsonify({'user': user}), 200
         
-        if not user:
+    except Exception as e:
+        logger.error(f"Get user error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+PROFILE_FIELDS = ['name', 'company', 'phone', 'address', 'bio']
+
+@app.route('/api/auth/me', methods=['PUT'])
+@token_required
+def update_current_user(current_user_id):
+    """Update the current user's profile"""
+    try:
+        data = request.get_json(silent=True) or {}
+        updates = {field: data[field] for field in PROFILE_FIELDS if field in data}
+        if not updates:
+            return jsonify({'message': 'No updatable fields provided'}), 400
+        if 'name' in updates and not updates['name']:
+            return jsonify({'message': 'Name cannot be empty'}), 400
+        
+        conn = db.get()
+        assignments = ', '.join(f'{field} = ?' for field in updates)
+        cursor = conn.execute(
+            f'UPDATE users SET {assignments} WHERE id = ?', (*updates.values(), current_user_id)
+        )
+        if cursor.rowcount == 0:
+            conn.rollback()
             return jsonify({'message': 'User not found'}), 404
+        conn.commit()
+        user_cache.pop(current_user_id)
         
-        return jsonify({
-            'user': {
-                'id': user[0],
-                'name': user[1],
-                'email': user[2],
-                'company': user[3],
-                'phone': user[4],
-                'address': user[5],
-                'bio': user[6]
-            }
-        }), 200
+        return get_current_user.__wrapped__(current_user_id)
         
     except Exception as e:
-        logger.error(f"Get user error: {e}")
+        logger.error(f"Update user error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
 @app.route('/api/dashboard/stats', methods=['GET'])
 @token_required
+@versioned
 def get_dashboard_stats(current_user_id):
     """Get dashboard statistics"""
     try:
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        
-        # Get tender statistics
-        cursor.execute('SELECT COUNT(*) FROM tenders WHERE user_id = ?', (current_user_id,))
-        total_tenders = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM tenders WHERE user_id = ? AND status = "active"', (current_user_id,))
-        active_tenders = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM tenders WHERE user_id = ? AND status = "won"', (current_user_id,))
-        won_tenders = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT SUM(value) FROM tenders WHERE user_id = ? AND status = "won"', (current_user_id,))
-        total_value = cursor.fetchone()[0] or 0
-        
-        conn.close()
-        
-        # Calculate win rate
-        win_rate = (won_tenders / total_tenders * 100) if total_tenders > 0 else 0
-        
-        return jsonify({
-            'stats': {
+        version = g.get('data_version')
+        cached = dashboard_cache.get(current_user_id)
+        stats = cached[1] if cached and cached[0] == version else None
+        if stats is None:
+            # O(1) read of the trigger-maintained summary row
+            row = db.get().execute('''
+                SELECT total_tenders, active_tenders, won_tenders, won_value, profit_sum, profit_count
+                FROM tender_stats
+                WHERE user_id = ?
+            ''', (current_user_id,)).fetchone()
+            total_tenders, active_tenders, won_tenders, total_value, profit_sum, profit_count = row or (0, 0, 0, 0, 0, 0)
+            
+            # Calculate win rate and average predicted margin
+            win_rate = (won_tenders / total_tenders * 100) if total_tenders > 0 else 0
+            avg_profit_margin = (profit_sum / profit_count * 100) if profit_count > 0 else 0
+            
+            stats = {
                 'totalTenders': total_tenders,
                 'activeTenders': active_tenders,
                 'wonTenders': won_tenders,
                 'totalValue': total_value,
                 'winRate': round(win_rate, 1),
-                'avgProfitMargin': 15.2  # Mock data
+                'avgProfitMargin': round(avg_profit_margin, 1)
             }
-        }), 200
+            dashboard_cache.set(current_user_id, (version, stats))
+        
+        return jsonify({'stats': stats}), 200
         
     except Exception as e:
         logger.error(f"Dashboard stats error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
+# Tender list projection: API field name -> column
+TENDER_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'description': 'description',
+    'client': 'client',
+    'value': 'value',
+    'deadline': 'deadline',
+    'status': 'status',
+    'category': 'category',
+    'riskScore': 'risk_score',
+    'profitPrediction': 'profit_prediction',
+    'modelVersion': 'model_version',
+    'submissionDate': 'submission_date',
+    'createdAt': 'created_at'
+}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+def encode_cursor(created_at, tender_id):
+    """Opaque keyset cursor for the (created_at, id) sort key"""
+    raw = json.dumps([str(created_at), tender_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor):
+    created_at, tender_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    # Integer ids on SQLite, UUID strings on PostgreSQL
+    if isinstance(tender_id, bool) or not isinstance(tender_id, (int, str)):
+        raise ValueError('Invalid cursor')
+    return str(created_at), tender_id
+
 @app.route('/api/tenders', methods=['GET'])
 @token_required
+@versioned
 def get_tenders(current_user_id):
-    """Get user's tenders"""
+    """Get user's tenders, newest first, one keyset page at a time"""
     try:
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
+        args = request.args
+        
+        # Projection
+        fields = args.get('fields')
+        if fields:
+            fields = [f.strip() for f in fields.split(',') if f.strip()]
+            unknown = [f for f in fields if f not in TENDER_FIELDS]
+            if unknown:
+                return jsonify({'message': f"Unknown fields: {', '.join(unknown)}"}), 400
+            if 'id' not in fields:
+                fields.insert(0, 'id')
+        else:
+            fields = [f for f in TENDER_FIELDS if f != 'createdAt']
         
-        cursor.execute('''
-            SELECT id, title, description, client, value, deadline, status, 
-                   category, risk_score, profit_prediction, submission_date
+        # Page size and cursor
+        try:
+            limit = min(max(int(args.get('limit', DEFAULT_PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+            min_value = float(args['min_value']) if 'min_value' in args else None
+            max_value = float(args['max_value']) if 'max_value' in args else None
+            cursor_key = decode_cursor(args['cursor']) if args.get('cursor') else None
+        except (ValueError, TypeError):
+            return jsonify({'message': 'Invalid limit, cursor or value range'}), 400
+        
+        # Filters
+        where = ['user_id = ?']
+        params = [current_user_id]
+        for arg, column in (('status', 'status'), ('category', 'category')):
+            if args.get(arg):
+                where.append(f'{column} = ?')
+                params.append(args[arg])
+        if args.get('deadline_from'):
+            where.append('deadline >= ?')
+            params.append(args['deadline_from'])
+        if args.get('deadline_to'):
+            where.append('deadline <= ?')
+            params.append(args['deadline_to'])
+        if min_value is not None:
+            where.append('value >= ?')
+            params.append(min_value)
+        if max_value is not None:
+            where.append('value <= ?')
+            params.append(max_value)
+        if cursor_key:
+            where.append('(created_at, id) < (?, ?)')
+            params.extend(cursor_key)
+        
+        columns = ', '.join(TENDER_FIELDS[f] for f in fields)
+        rows = db.get().execute(f'''
+            SELECT {columns}, id, created_at
             FROM tenders 
-            WHERE user_id = ? 
-            ORDER BY created_at DESC
-        ''', (current_user_id,))
-        
-        tenders = []
-        for row in cursor.fetchall():
-            tenders.append({
-                'id': row[0],
-                'title': row[1],
-                'description': row[2],
-                'client': row[3],
-                'value': row[4],
-                'deadline': row[5],
-                'status': row[6],
-                'category': row[7],
-                'riskScore': row[8],
-                'profitPrediction': row[9],
-                'submissionDate': row[10]
-            })
+            WHERE {' AND '.join(where)}
+            ORDER BY created_at DESC, id DESC
+            LIMIT ?
+        ''', (*params, limit + 1)).fetchall()
         
-        conn.close()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        tenders = [dict(zip(fields, row)) for row in rows]
+        next_cursor = encode_cursor(rows[-1][-1], rows[-1][-2]) if has_more else None
         
-        return jsonify({'tenders': tenders}), 200
+        return jsonify({
+            'tenders': tenders,
+            'nextCursor': next_cursor,
+            'hasMore': has_more
+        }), 200
         
     except Exception as e:
         logger.error(f"Get tenders error: {e}")
@@ -497,81 +1118,206 @@ def create_tender(current_user_id):
         
         if not all([title, client, value, deadline]):
             return jsonify({'message': 'Missing required fields'}), 400
-        
-        # Calculate days to deadline
-        deadline_date = datetime.strptime(deadline, '%Y-%m-%d')
-        days_to_deadline = (deadline_date - datetime.now()).days
-        
-        # Get ML predictions
-        risk_score, profit_prediction = ml_models.predict_risk_and_profit(
-            value, days_to_deadline, category
+        try:
+            value, deadline = bulk.parse_value(value), parse_tender_deadline(deadline)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        # Calculate days to deadline (whole days, as the scheduled refresh counts them)
+        days_to_deadline = (date.fromisoformat(deadline) - date.today()).days
+        
+        # Get ML predictions, with the client's record so far
+        conn = db.get()
+        client_history = client_stats_store.history(conn, current_user_id, [client])[0]
+        risk_score, profit_prediction, model_version = ml_models.predict_risk_and_profit(
+            value, days_to_deadline, category, client_history
         )
         
         # Insert tender into database
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
         
-        cursor.execute('''
+        tender_id = conn.insert('''
             INSERT INTO tenders (user_id, title, description, client, value, deadline, 
-                               category, risk_score, profit_prediction, submission_date)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                               category, risk_score, profit_prediction, model_version, submission_date,
+                               deadline_bucket)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (current_user_id, title, description, client, value, deadline, 
-              category, risk_score, profit_prediction, datetime.now().date()))
+              category, risk_score, profit_prediction, model_version, datetime.now().date(),
+              int(training.deadline_bucket(days_to_deadline))))
         
-        tender_id = cursor.lastrowid
         conn.commit()
-        conn.close()
+        dashboard_cache.pop(current_user_id)
+        client_stats_store.invalidate(current_user_id)
+        refresh_analytics(conn, current_user_id, datetime.now().date())
         
         return jsonify({
             'message': 'Tender created successfully',
             'tender_id': tender_id,
             'risk_score': risk_score,
-            'profit_prediction': profit_prediction
+            'profit_prediction': profit_prediction,
+            'model_version': model_version
         }), 201
         
     except Exception as e:
         logger.error(f"Create tender error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
-@app.route('/api/tenders/<int:tender_id>', methods=['GET'])
+def parse_tender_deadline(deadline):
+    """Deadline as an ISO date string, or ValueError"""
+    try:
+        return datetime.strptime(deadline, '%Y-%m-%d').date().isoformat()
+    except (TypeError, ValueError):
+        raise ValueError('deadline must be YYYY-MM-DD')
+
+TENDER_STATUSES = ('active', 'pending', 'won', 'lost', 'expired')
+TENDER_UPDATABLE = ('title', 'description', 'client', 'value', 'deadline', 'status', 'category')
+# Model inputs; editing one leaves the score for the scheduled refresh to recompute
+TENDER_SCORE_INPUTS = ('client', 'value', 'deadline', 'category')
+
+@app.route('/api/tenders/import', methods=['POST'])
 @token_required
-def get_tender_detail(current_user_id, tender_id):
-    """Get detailed tender information"""
+@limiter.limit("10 per hour")
+def import_tenders(current_user_id):
+    """Bulk-import tenders from a CSV or JSONL upload"""
     try:
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        
-        # Get tender details
-        cursor.execute('''
-            SELECT id, title, description, client, value, deadline, status, 
-                   category, risk_score, profit_prediction, submission_date
-            FROM tenders 
-            WHERE id = ? AND user_id = ?
-        ''', (tender_id, current_user_id))
+        if 'file' in request.files:
+            upload = request.files['file']
+            stream = upload.stream
+            fmt = bulk.detect_format(request.args.get('format') or upload.filename, upload.content_type or '')
+        else:
+            stream = request.stream
+            fmt = bulk.detect_format(request.args.get('format'), request.content_type or '')
+        if fmt is None:
+            return jsonify({'message': 'Unknown format; use format=csv or format=jsonl'}), 400
+        
+        conn = db.get()
+        # Client history read fresh per chunk: earlier chunks of this import count
+        history = lambda clients: client_stats_store.history(conn, current_user_id, clients, cached=False)
+        importer = bulk.TenderImporter(conn, current_user_id, ml_models.predict_many, TENDER_STATUSES, history)
+        importer.run(bulk.iter_records(stream, fmt))
+        
+        if importer.imported:
+            dashboard_cache.pop(current_user_id)
+            client_stats_store.invalidate(current_user_id)
+            # Historical rows can land in old buckets; refresh from the earliest one
+            earliest = date.fromisoformat(importer.earliest) if importer.earliest else date.today()
+            since = min(analytics.bucket_start(earliest, g) for g in analytics.GRANULARITIES)
+            try:
+                analytics.refresh_user(conn, current_user_id, since)
+            except Exception as e:
+                conn.rollback()
+                logger.error(f"Analytics refresh after import failed: {e}")
+            maybe_schedule_training(conn)
+        
+        return jsonify(importer.summary()), 200
+        
+    except UnicodeDecodeError:
+        return jsonify({'message': 'File must be UTF-8 encoded'}), 400
+    except RequestEntityTooLarge:
+        return jsonify({'message': f'Import files are limited to {IMPORT_MAX_CONTENT_LENGTH} bytes'}), 413
+    except Exception as e:
+        logger.error(f"Import tenders error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/tenders/export', methods=['GET'])
+@token_required
+def export_tenders(current_user_id):
+    """Stream all of the user's tenders as CSV or JSONL"""
+    fmt = request.args.get('format', 'csv')
+    if fmt not in bulk.FORMATS:
+        return jsonify({'message': 'Unknown format; use format=csv or format=jsonl'}), 400
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    return Response(
+        bulk.export_tenders(db, current_user_id, fmt, TENDER_FIELDS),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=tenders_{datetime.now().strftime("%Y%m%d")}.{fmt}'}
+    )
+
+@app.route('/api/tenders/<rowid:tender_id>', methods=['PUT'])
+@token_required
+def update_tender(current_user_id, tender_id):
+    """Update tender fields such as status"""
+    try:
+        data = request.get_json() or {}
+        updates = {field: data[field] for field in TENDER_UPDATABLE if field in data}
         
-        tender_row = cursor.fetchone()
-        if not tender_row:
+        if not updates:
+            return jsonify({'message': 'No fields to update'}), 400
+        if 'status' in updates and updates['status'] not in TENDER_STATUSES:
+            return jsonify({'message': f"Status must be one of: {', '.join(TENDER_STATUSES)}"}), 400
+        try:
+            if 'value' in updates:
+                updates['value'] = bulk.parse_value(updates['value'])
+            if 'deadline' in updates:
+                updates['deadline'] = parse_tender_deadline(updates['deadline'])
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 400
+        
+        conn = db.get()
+        assignments = ', '.join(f'{field} = ?' for field in updates)
+        if any(field in updates for field in TENDER_SCORE_INPUTS):
+            assignments += ', deadline_bucket = NULL'
+        cursor = conn.execute(
+            f'UPDATE tenders SET {assignments} WHERE id = ? AND user_id = ?',
+            (*updates.values(), tender_id, current_user_id)
+        )
+        if cursor.rowcount == 0:
             return jsonify({'message': 'Tender not found'}), 404
         
-        # Get associated documents
-        cursor.execute('''
-            SELECT id, original_filename, file_size, file_type, upload_date
-            FROM documents 
-            WHERE tender_id = ?
-        ''', (tender_id,))
+        conn.commit()
+        dashboard_cache.pop(current_user_id)
+        client_stats_store.invalidate(current_user_id)
+        submission_date = conn.execute(
+            'SELECT COALESCE(submission_date, DATE(created_at)) FROM tenders WHERE id = ?', (tender_id,)
+        ).fetchone()[0]
+        refresh_analytics(conn, current_user_id, submission_date)
+        if updates.get('status') in ('won', 'lost'):
+            maybe_schedule_training(conn)
+        
+        return jsonify({
+            'message': 'Tender updated successfully',
+            'tender': {'id': tender_id, **updates}
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Update tender error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/tenders/<rowid:tender_id>', methods=['GET'])
+@token_required
+@versioned
+def get_tender_detail(current_user_id, tender_id):
+    """Get detailed tender information"""
+    try:
+        conn = db.get()
+        
+        # Tender and its documents' metadata in one round trip; one row per
+        # document (a single row with NULL document columns when there are none)
+        rows = conn.execute('''
+            SELECT t.id, t.title, t.description, t.client, t.value, t.deadline, t.status,
+                   t.category, t.risk_score, t.profit_prediction, t.submission_date, t.model_version,
+                   d.id, d.original_filename, d.file_size, d.file_type, d.upload_date, d.status
+            FROM tenders t
+            LEFT JOIN documents d ON d.tender_id = t.id
+            WHERE t.id = ? AND t.user_id = ?
+            ORDER BY d.id
+        ''', (tender_id, current_user_id)).fetchall()
+        
+        if not rows:
+            return jsonify({'message': 'Tender not found'}), 404
+        tender_row = rows[0]
         
         documents = []
-        for doc_row in cursor.fetchall():
+        for doc_row in (row[12:] for row in rows if row[12] is not None):
             documents.append({
                 'id': doc_row[0],
                 'name': doc_row[1],
                 'size': f"{doc_row[2] / 1024 / 1024:.1f} MB" if doc_row[2] else "Unknown",
                 'type': doc_row[3],
-                'uploadDate': doc_row[4]
+                'uploadDate': doc_row[4],
+                'status': doc_row[5]
             })
         
-        conn.close()
-        
         tender = {
             'id': tender_row[0],
             'title': tender_row[1],
@@ -583,7 +1329,8 @@ def get_tender_detail(current_user_id, tender_id):
             'category': tender_row[7],
             'riskScore': tender_row[8],
             'profitPrediction': tender_row[9],
-            'submissionDate': tender_row[10]
+            'submissionDate': tender_row[10],
+            'modelVersion': tender_row[11]
         }
         
         return jsonify({
@@ -595,7 +1342,34 @@ def get_tender_detail(current_user_id, tender_id):
         logger.error(f"Get tender detail error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
-@app.route('/api/tenders/<int:tender_id>/documents', methods=['POST'])
+def add_document(conn, tender_id, filename, sha256, file_size, ocr_engine):
+    """Create a document for a stored blob and queue its text extraction (caller commits)"""
+    blob_store.register(conn, sha256, file_size)
+    file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
+    
+    document_id = conn.insert('''
+        INSERT INTO documents (tender_id, filename, original_filename, file_size, file_type, status, blob_sha256)
+        VALUES (?, ?, ?, ?, ?, 'processing', ?)
+    ''', (tender_id, blob_store.key(sha256), filename, file_size, file_extension, sha256))
+    document = {'id': document_id, 'filename': filename, 'status': 'ready', 'jobId': None, 'ocrEngine': ocr_engine}
+    
+    # Identical content already extracted: reuse the result, no OCR
+    if reuse_extraction(conn, sha256, document_id, ocr_engine):
+        return document
+    
+    # Queue text extraction in the same transaction
+    job_id = job_queue.enqueue(conn, 'process_document', {
+        'document_id': document_id,
+        'file_path': os.path.abspath(blob_store.path(sha256)),
+        'file_type': file_extension,
+        'sha256': sha256,
+        'ocr_engine': ocr_engine
+    })
+    conn.execute('UPDATE documents SET job_id = ? WHERE id = ?', (job_id, document_id))
+    document.update(status='processing', jobId=job_id)
+    return document
+
+@app.route('/api/tenders/<rowid:tender_id>/documents', methods=['POST'])
 @token_required
 def upload_document(current_user_id, tender_id):
     """Upload document for a tender"""
@@ -607,58 +1381,361 @@ def upload_document(current_user_id, tender_id):
         if file.filename == '':
             return jsonify({'message': 'No file selected'}), 400
         
+        # OCR engine for scans: fast (Tesseract) or accurate (EasyOCR)
+        ocr_engine = request.form.get('ocrEngine') or ocr.DEFAULT_ENGINE
+        if ocr_engine not in ocr.ENGINES:
+            return jsonify({'message': f"ocrEngine must be one of: {', '.join(ocr.ENGINES)}"}), 400
+        
         # Verify tender ownership
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM tenders WHERE id = ? AND user_id = ?', (tender_id, current_user_id))
-        if not cursor.fetchone():
-            conn.close()
+        conn = db.get()
+        if not conn.execute('SELECT id FROM tenders WHERE id = ? AND user_id = ?', (tender_id, current_user_id)).fetchone():
             return jsonify({'message': 'Tender not found'}), 404
         
-        # Save file
+        # Store file by content hash (hashed while streaming to disk)
         filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], f"{tender_id}_{filename}")
-        file.save(file_path)
+        sha256, file_size = blob_store.save(file.stream)
+        document = add_document(conn, tender_id, filename, sha256, file_size, ocr_engine)
+        conn.commit()
         
-        # Extract text from document
-        file_extension = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-        extracted_text = doc_processor.process_document(file_path, file_extension)
+        if document['status'] == 'ready':
+            return jsonify({'message': 'Document uploaded successfully', 'document': document}), 201
+        job_queue.notify()
+        return jsonify({'message': 'Document accepted for processing', 'document': document}), 202
         
-        # Save document info to database
-        cursor.execute('''
-            INSERT INTO documents (tender_id, filename, original_filename, file_size, file_type, extracted_text)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (tender_id, f"{tender_id}_{filename}", filename, os.path.getsize(file_path), file_extension, extracted_text))
+    except RequestEntityTooLarge:
+        return jsonify({'message': 'File too large; use /api/tenders/<id>/uploads for chunked uploads'}), 413
+    except Exception as e:
+        logger.error(f"Upload document error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/tenders/<rowid:tender_id>/uploads', methods=['POST'])
+@token_required
+def create_upload(current_user_id, tender_id):
+    """Start a resumable chunked upload of a document"""
+    try:
+        data = request.get_json(silent=True) or {}
+        filename = secure_filename(str(data.get('filename') or ''))
+        if not filename:
+            return jsonify({'message': 'filename is required'}), 400
+        try:
+            size = int(data.get('size'))
+        except (TypeError, ValueError):
+            return jsonify({'message': 'size must be the file size in bytes'}), 400
+        ocr_engine = data.get('ocrEngine') or ocr.DEFAULT_ENGINE
+        if ocr_engine not in ocr.ENGINES:
+            return jsonify({'message': f"ocrEngine must be one of: {', '.join(ocr.ENGINES)}"}), 400
+        
+        conn = db.get()
+        if not conn.execute('SELECT id FROM tenders WHERE id = ? AND user_id = ?', (tender_id, current_user_id)).fetchone():
+            return jsonify({'message': 'Tender not found'}), 404
         
+        upload_store.cleanup(conn)
+        session = upload_store.create(conn, current_user_id, tender_id, filename, size,
+                                      data.get('sha256'), ocr_engine)
         conn.commit()
-        conn.close()
+        return jsonify({'upload': uploads.payload(session)}), 201
+        
+    except uploads.UploadError as e:
+        return jsonify({'message': str(e), **e.details}), e.status
+    except Exception as e:
+        logger.error(f"Create upload error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['GET'])
+@token_required
+def get_upload(current_user_id, upload_id):
+    """Upload progress; `received` is the offset to resume from"""
+    try:
+        session = upload_store.get(db.get(), upload_id, current_user_id)
+        if not session:
+            return jsonify({'message': 'Upload not found'}), 404
+        return jsonify({'upload': uploads.payload(session)}), 200
         
-        return jsonify({'message': 'Document uploaded successfully'}), 201
+    except Exception as e:
+        logger.error(f"Get upload error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['PUT'])
+@token_required
+@limiter.limit(os.environ.get('UPLOAD_CHUNK_RATE_LIMIT', '2000 per hour'))
+def upload_chunk(current_user_id, upload_id):
+    """Write one chunk at the Upload-Offset header, streamed to disk"""
+    try:
+        conn = db.get()
+        session = upload_store.get(conn, upload_id, current_user_id)
+        if not session:
+            return jsonify({'message': 'Upload not found'}), 404
+        if session['status'] != 'open':
+            return jsonify({'message': f"Upload is {session['status']}", 'upload': uploads.payload(session)}), 409
+        try:
+            offset = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return jsonify({'message': 'Upload-Offset header is required'}), 400
+        
+        upload_store.write_chunk(conn, session, offset, request.stream, request.content_length,
+                                 request.headers.get('X-Chunk-SHA256'))
+        return jsonify({'upload': uploads.payload(session)}), 200
         
+    except uploads.UploadError as e:
+        return jsonify({'message': str(e), **e.details}), e.status
     except Exception as e:
-        logger.error(f"Upload document error: {e}")
+        logger.error(f"Upload chunk error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+@token_required
+def complete_upload(current_user_id, upload_id):
+    """Verify the assembled file and hand it to document processing"""
+    try:
+        conn = db.get()
+        session = upload_store.get(conn, upload_id, current_user_id)
+        if not session:
+            return jsonify({'message': 'Upload not found'}), 404
+        if session['status'] != 'open':
+            return jsonify({'message': f"Upload is {session['status']}", 'upload': uploads.payload(session)}), 409
+        if not conn.execute('SELECT id FROM tenders WHERE id = ? AND user_id = ?',
+                            (session['tender_id'], current_user_id)).fetchone():
+            return jsonify({'message': 'Tender not found'}), 404
+        
+        document = {}
+        def create_document(sha256, size):
+            document.update(add_document(conn, session['tender_id'], session['filename'], sha256, size,
+                                         session['ocr_engine']))
+            return document['id']
+        upload_store.finish(conn, session, blob_store, create_document)
+        
+        if document['status'] == 'ready':
+            return jsonify({'message': 'Document uploaded successfully', 'document': document,
+                            'upload': uploads.payload(session)}), 201
+        job_queue.notify()
+        return jsonify({'message': 'Document accepted for processing', 'document': document,
+                        'upload': uploads.payload(session)}), 202
+        
+    except uploads.UploadError as e:
+        return jsonify({'message': str(e), **e.details}), e.status
+    except Exception as e:
+        logger.error(f"Complete upload error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+@token_required
+def abort_upload(current_user_id, upload_id):
+    """Abandon an unfinished upload and delete its data"""
+    try:
+        conn = db.get()
+        session = upload_store.get(conn, upload_id, current_user_id)
+        if not session:
+            return jsonify({'message': 'Upload not found'}), 404
+        upload_store.abort(conn, session)
+        return jsonify({'upload': uploads.payload(session)}), 200
+        
+    except uploads.UploadError as e:
+        return jsonify({'message': str(e), **e.details}), e.status
+    except Exception as e:
+        logger.error(f"Abort upload error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/documents/<rowid:document_id>/status', methods=['GET'])
+@token_required
+def get_document_status(current_user_id, document_id):
+    """Get text extraction state and progress for a document"""
+    try:
+        conn = db.get()
+        row = conn.execute('''
+            SELECT d.id, d.status, d.job_id, d.page_count,
+                   (SELECT COUNT(*) FROM document_pages p WHERE p.document_id = d.id)
+            FROM documents d
+            JOIN tenders t ON t.id = d.tender_id
+            WHERE d.id = ? AND t.user_id = ?
+        ''', (document_id, current_user_id)).fetchone()
+        if not row:
+            return jsonify({'message': 'Document not found'}), 404
+        
+        job = job_queue.get(conn, row[2]) if row[2] else None
+        
+        return jsonify({
+            'document': {
+                'id': row[0],
+                'status': row[1],
+                'progress': job['progress'] if job else 1.0,
+                'attempts': job['attempts'] if job else 0,
+                'error': job['error'] if job else None,
+                'pageCount': row[3],
+                'pagesDone': row[4]
+            }
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Document status error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/documents/<rowid:document_id>/pages', methods=['GET'])
+@token_required
+def get_document_pages(current_user_id, document_id):
+    """Get extracted text page by page, including pages of documents still processing"""
+    try:
+        try:
+            start = max(int(request.args.get('start', 1)), 1)
+            limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        except ValueError:
+            return jsonify({'message': 'Invalid start or limit'}), 400
+        
+        conn = db.get()
+        row = conn.execute('''
+            SELECT d.status, d.page_count
+            FROM documents d
+            JOIN tenders t ON t.id = d.tender_id
+            WHERE d.id = ? AND t.user_id = ?
+        ''', (document_id, current_user_id)).fetchone()
+        if not row:
+            return jsonify({'message': 'Document not found'}), 404
+        
+        pages = get_pages(conn, document_id, start - 1, limit + 1)
+        has_more = len(pages) > limit
+        pages = pages[:limit]
+        
+        return jsonify({
+            'status': row[0],
+            'pageCount': row[1],
+            'pages': pages,
+            'nextStart': pages[-1]['page'] + 1 if has_more else None,
+            'hasMore': has_more
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Document pages error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/documents/<rowid:document_id>/text', methods=['GET'])
+@token_required
+def get_document_text(current_user_id, document_id):
+    """Stream extracted text as plain text, page by page, optionally for a page range"""
+    try:
+        try:
+            start = max(int(request.args.get('start', 1)), 1)
+            limit = request.args.get('limit')
+            limit = max(int(limit), 1) if limit is not None else None
+        except ValueError:
+            return jsonify({'message': 'Invalid start or limit'}), 400
+        
+        conn = db.get()
+        row = conn.execute('''
+            SELECT d.status, d.page_count
+            FROM documents d
+            JOIN tenders t ON t.id = d.tender_id
+            WHERE d.id = ? AND t.user_id = ?
+        ''', (document_id, current_user_id)).fetchone()
+        if not row:
+            return jsonify({'message': 'Document not found'}), 404
+        
+        stop = start - 1 + limit if limit is not None else None
+        headers = {'X-Document-Status': row[0]}
+        if row[1] is not None:
+            headers['X-Page-Count'] = str(row[1])
+        return Response(iter_text(db, document_id, start - 1, stop), mimetype='text/plain', headers=headers)
+        
+    except Exception as e:
+        logger.error(f"Document text error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/documents/<rowid:document_id>/download', methods=['GET'])
+@token_required
+def download_document(current_user_id, document_id):
+    """Send a document's file, with Range and conditional request support
+    
+    The worker only authorizes: with DOWNLOAD_ACCEL_PREFIX nginx sends the
+    file; otherwise send_file hands it to the server's file wrapper
+    (sendfile under gunicorn). Stored files are content-addressed, so the
+    SHA-256 is a strong ETag and If-Range can resume a partial download.
+    """
+    try:
+        conn = db.get()
+        row = conn.execute('''
+            SELECT d.filename, d.original_filename, d.blob_sha256
+            FROM documents d
+            JOIN tenders t ON t.id = d.tender_id
+            WHERE d.id = ? AND t.user_id = ?
+        ''', (document_id, current_user_id)).fetchone()
+        if not row:
+            return jsonify({'message': 'Document not found'}), 404
+        
+        filename, original_filename, sha256 = row
+        file_path = safe_join(os.path.abspath(app.config['UPLOAD_FOLDER']), filename)
+        if file_path is None or not os.path.isfile(file_path):
+            logger.error(f"File for document {document_id} is missing: {filename}")
+            return jsonify({'message': 'Document file not found'}), 404
+        
+        # Werkzeug's send_file: Flask's takes X-Sendfile from app-wide config only
+        response = send_file_from(
+            file_path,
+            request.environ,
+            as_attachment=request.args.get('inline') != '1',
+            download_name=original_filename,
+            etag=sha256 or True,
+            # nginx answers ranges and conditionals itself after the redirect
+            conditional=not DOWNLOAD_ACCEL_PREFIX,
+            use_x_sendfile=bool(DOWNLOAD_ACCEL_PREFIX),
+            response_class=app.response_class,
+            max_age=0
+        )
+        if DOWNLOAD_ACCEL_PREFIX:
+            response.headers.pop('X-Sendfile')
+            response.headers['X-Accel-Redirect'] = DOWNLOAD_ACCEL_PREFIX.rstrip('/') + '/' + quote(filename)
+            response.content_length = 0
+        response.cache_control.private = True
+        return response
+        
+    except RequestedRangeNotSatisfiable as e:
+        return jsonify({'message': 'Requested range not satisfiable'}), 416, {'Content-Range': f'bytes */{e.length}'}
+    except Exception as e:
+        logger.error(f"Download document error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/search', methods=['GET'])
+@token_required
+def search_tenders(current_user_id):
+    """Full-text search over tenders and their documents' extracted text"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({'message': 'Missing search query'}), 400
+        
+        try:
+            limit = int(request.args.get('limit', 20))
+            offset = max(int(request.args.get('offset', 0)), 0)
+        except ValueError:
+            return jsonify({'message': 'Invalid limit or offset'}), 400
+        
+        results, has_more = search.search(db.get(), current_user_id, query, limit, offset)
+        
+        return jsonify({
+            'results': results,
+            'nextOffset': offset + len(results) if has_more else None,
+            'hasMore': has_more
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"Search error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
 @app.route('/api/analytics', methods=['GET'])
 @token_required
 def get_analytics(current_user_id):
-    """Get analytics data"""
-    try:
-        # Mock analytics data for demo
-        analytics_data = {
-            'summary': {
-                'totalBids': 156,
-                'winRate': 28.8,
-                'totalValue': 12450000,
-                'avgProfitMargin': 15.2,
-                'trends': {
-                    'bids': 12,
-                    'winRate': -2.1,
-                    'value': 18.5,
-                    'profit': 3.2
-                }
-            }
-        }
+    """Get analytics data from precomputed time-bucketed rollups"""
+    try:
+        range_name = request.args.get('range', '12months')
+        granularity = request.args.get('granularity', 'month')
+        if range_name not in analytics.RANGES:
+            return jsonify({'message': f"Range must be one of: {', '.join(analytics.RANGES)}"}), 400
+        if granularity not in analytics.GRANULARITIES:
+            return jsonify({'message': f"Granularity must be one of: {', '.join(analytics.GRANULARITIES)}"}), 400
+        
+        conn = db.get()
+        if not analytics.has_rollups(conn, current_user_id):
+            # First visit since rollups were introduced: build full history once
+            analytics.refresh_user(conn, current_user_id)
+        
+        analytics_data = analytics.summarize(conn, current_user_id, range_name, granularity)
         
         return jsonify(analytics_data), 200
         
@@ -666,50 +1743,311 @@ def get_analytics(current_user_id):
         logger.error(f"Analytics error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
+@app.route('/api/clients', methods=['GET'])
+@token_required
+def get_clients(current_user_id):
+    """Per-client bid history from the client_stats table, most bids first"""
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        conn = db.get()
+        rows = conn.execute(f'''
+            SELECT {', '.join(client_stats.COLUMNS)} FROM client_stats
+            WHERE user_id = ? AND bids > 0
+            ORDER BY bids DESC, client
+            LIMIT ?
+        ''', (current_user_id, limit)).fetchall()
+
+        today = datetime.now().date()
+        clients = [client_stats.payload(dict(zip(client_stats.COLUMNS, row)), today) for row in rows]
+        return jsonify({'clients': clients}), 200
+
+    except Exception as e:
+        logger.error(f"Clients error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+def prediction_payload(risk_score, profit_prediction):
+    """Shape one model output for the ML API"""
+    recommendations = []
+    if risk_score <= 0.3:
+        recommendations.append('Low risk tender')
+    elif risk_score <= 0.6:
+        recommendations.append('Moderate risk; review requirements and timeline carefully')
+    else:
+        recommendations.append('High risk; consider a risk premium or partnering')
+    if profit_prediction >= 0.15:
+        recommendations.append('Good profit potential; consider competitive pricing strategy')
+    else:
+        recommendations.append('Thin predicted margin; validate cost assumptions')
+    
+    return {
+        'riskScore': risk_score,
+        'profitPrediction': profit_prediction,
+        'confidence': round(max(risk_score, 1 - risk_score), 2),
+        'recommendations': recommendations
+    }
+
+def parse_finite(value):
+    """Model input as a finite float, or ValueError"""
+    if isinstance(value, bool):
+        raise ValueError('not a number')
+    value = float(value)
+    if not math.isfinite(value):
+        raise ValueError('not a finite number')
+    return value
+
+@app.route('/api/ml/predict', methods=['POST'])
+@token_required
+def ml_predict(current_user_id):
+    """Score one tender, or a batch of tenders in one vectorized call"""
+    try:
+        data = request.get_json() or {}
+        batch = 'tenders' in data
+        items = data['tenders'] if batch else [data]
+        
+        if not isinstance(items, list) or not items:
+            return jsonify({'message': 'No tenders provided'}), 400
+        if len(items) > ML_BATCH_LIMIT:
+            return jsonify({'message': f'At most {ML_BATCH_LIMIT} tenders per request'}), 400
+        
+        try:
+            values = [bulk.parse_value(item['tenderValue']) for item in items]
+            days = [parse_finite(item['daysToDeadline']) for item in items]
+            categories = [item.get('category') for item in items]
+            client_history = [parse_finite(item['clientHistory']) if 'clientHistory' in item else None for item in items]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'message': 'Each tender needs a non-negative tenderValue and a finite daysToDeadline'}), 400
+        
+        # Missing clientHistory comes from the named client's record (0.5 without one)
+        lookup = [i for i, history in enumerate(client_history) if history is None]
+        if lookup:
+            histories = client_stats_store.history(db.get(), current_user_id, [items[i].get('client') for i in lookup])
+            for i, history in zip(lookup, histories):
+                client_history[i] = history
+        
+        risk_scores, profit_predictions, model_version = ml_models.predict_many(
+            values, days, categories, client_history
+        )
+        predictions = [
+            prediction_payload(risk, profit)
+            for risk, profit in zip(risk_scores.tolist(), profit_predictions.tolist())
+        ]
+        
+        if batch:
+            return jsonify({'predictions': predictions, 'modelVersion': model_version}), 200
+        return jsonify({**predictions[0], 'modelVersion': model_version}), 200
+        
+    except Exception as e:
+        logger.error(f"ML predict error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/ml/rescore', methods=['POST'])
+@token_required
+@limiter.limit("5 per hour")
+def ml_rescore(current_user_id):
+    """Re-score all of the user's tenders in chunks"""
+    try:
+        conn = db.get()
+        updated = rescore_user_tenders(conn, current_user_id)
+        dashboard_cache.pop(current_user_id)
+        if updated:
+            analytics.refresh_user(conn, current_user_id)
+        
+        return jsonify({'message': 'Tenders re-scored successfully', 'updated': updated}), 200
+        
+    except Exception as e:
+        logger.error(f"ML rescore error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/ml/models', methods=['GET'])
+@token_required
+def list_models(current_user_id):
+    """Registered model versions, the active one and the one loaded by this worker"""
+    try:
+        return jsonify({
+            'active': ml_models.registry.active(),
+            'loaded': ml_models.version,
+            'versions': ml_models.registry.versions()
+        }), 200
+        
+    except Exception as e:
+        logger.error(f"List models error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+def ml_admin_error():
+    """Error response unless the request carries ML_ADMIN_TOKEN (model management is off without it)"""
+    admin_token = os.environ.get('ML_ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({'message': 'Model management over HTTP is disabled (set ML_ADMIN_TOKEN)'}), 403
+    if request.headers.get('X-Admin-Token') != admin_token:
+        return jsonify({'message': 'Admin token is missing or invalid'}), 401
+    return None
+
+@app.route('/api/ml/models/<version>/activate', methods=['POST'])
+def activate_model(version):
+    """Make a model version active; every worker hot-reloads it within ML_RELOAD_INTERVAL"""
+    try:
+        error = ml_admin_error()
+        if error:
+            return error
+        
+        try:
+            ml_models.registry.activate(version)
+        except ValueError as e:
+            return jsonify({'message': str(e)}), 404
+        ml_models.reload()
+        
+        return jsonify({'active': version, 'loaded': ml_models.version}), 200
+        
+    except Exception as e:
+        logger.error(f"Activate model error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/ml/train', methods=['POST'])
+def train_models():
+    """Queue training on won/lost outcomes in a background worker"""
+    try:
+        error = ml_admin_error()
+        if error:
+            return error
+        
+        mode = (request.get_json(silent=True) or {}).get('mode', 'full')
+        if mode not in ('full', 'incremental'):
+            return jsonify({'message': 'mode must be full or incremental'}), 400
+        
+        job_id = queue_training(db.get(), mode)
+        return jsonify({'message': 'Training queued', 'jobId': job_id}), 202
+        
+    except Exception as e:
+        logger.error(f"Train models error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/ml/train/<int:job_id>', methods=['GET'])
+def get_training_status(job_id):
+    """Status of a training job"""
+    try:
+        error = ml_admin_error()
+        if error:
+            return error
+        
+        job = job_queue.get(db.get(), job_id)
+        if not job or job['kind'] != 'train_models':
+            return jsonify({'message': 'Training job not found'}), 404
+        return jsonify({'job': job, 'active': ml_models.registry.active()}), 200
+        
+    except Exception as e:
+        logger.error(f"Training status error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+def report_payload(report):
+    """Shape a report row for the API"""
+    return {
+        'id': report['id'],
+        'type': report['type'],
+        'status': report['status'],
+        'dataVersion': report['dataVersion'],
+        'jobId': report['jobId'],
+        'createdAt': report['createdAt'],
+        'downloadUrl': f"/api/reports/{report['id']}/download" if report['status'] == 'ready' else None
+    }
+
 @app.route('/api/reports/generate', methods=['POST'])
 @token_required
 def generate_report(current_user_id):
-    """Generate PDF report"""
+    """Queue a PDF report, or return the cached render if the data hasn't changed"""
     try:
-        data = request.get_json()
+        data = request.get_json(silent=True) or {}
         report_type = data.get('type', 'summary')
+        if report_type not in reports.REPORT_TYPES:
+            return jsonify({'message': f"Invalid report type; expected one of {', '.join(reports.REPORT_TYPES)}"}), 400
+        
+        conn = db.get()
+        version = reports.data_version(conn, current_user_id)
+        report = reports.find_report(conn, current_user_id, report_type=report_type, version=version)
+        
+        if report and report['status'] == 'ready' and os.path.exists(report['filePath']):
+            return jsonify({'report': report_payload(report)}), 200
+        if report and report['status'] == 'processing':
+            return jsonify({'report': report_payload(report)}), 202
+        
+        file_path = reports.report_path(app.config['REPORT_FOLDER'], current_user_id, report_type, version)
+        if report:
+            # Failed render or file gone: render again under the same row
+            report_id = report['id']
+            conn.execute("UPDATE reports SET status = 'processing' WHERE id = ?", (report_id,))
+        else:
+            try:
+                report_id = conn.insert('''
+                    INSERT INTO reports (user_id, report_type, data_version, file_path)
+                    VALUES (?, ?, ?, ?)
+                ''', (current_user_id, report_type, version, file_path))
+            except db.IntegrityError:
+                # A concurrent request queued the same render
+                conn.rollback()
+                report = reports.find_report(conn, current_user_id, report_type=report_type, version=version)
+                return jsonify({'report': report_payload(report)}), 202
+        
+        job_id = job_queue.enqueue(conn, 'generate_report', {
+            'report_id': report_id,
+            'user_id': current_user_id,
+            'report_type': report_type,
+            'data_version': version,
+            'file_path': file_path
+        })
+        conn.execute('UPDATE reports SET job_id = ? WHERE id = ?', (job_id, report_id))
+        conn.commit()
+        job_queue.notify()
         
-        # Create PDF report
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        styles = getSampleStyleSheet()
-        story = []
+        report = reports.find_report(conn, current_user_id, report_id=report_id)
+        return jsonify({'report': report_payload(report)}), 202
         
-        # Title
-        title = Paragraph("Tender Management Report", styles['Title'])
-        story.append(title)
-        story.append(Spacer(1, 12))
+    except Exception as e:
+        logger.error(f"Generate report error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/reports/<int:report_id>', methods=['GET'])
+@token_required
+def get_report_status(current_user_id, report_id):
+    """Get render state for a report"""
+    try:
+        conn = db.get()
+        report = reports.find_report(conn, current_user_id, report_id=report_id)
+        if not report:
+            return jsonify({'message': 'Report not found'}), 404
         
-        # Summary section
-        summary_title = Paragraph("Executive Summary", styles['Heading1'])
-        story.append(summary_title)
+        payload = report_payload(report)
+        job = job_queue.get(conn, report['jobId']) if report['jobId'] else None
+        payload['progress'] = job['progress'] if job else None
+        payload['error'] = job['error'] if job and report['status'] == 'failed' else None
         
-        summary_text = """
-        This report provides a comprehensive overview of your tender management activities.
-        Key metrics include bid success rates, profit margins, and risk assessments.
-        """
-        summary_para = Paragraph(summary_text, styles['Normal'])
-        story.append(summary_para)
-        story.append(Spacer(1, 12))
+        return jsonify({'report': payload}), 200
         
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+    except Exception as e:
+        logger.error(f"Report status error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/reports/<int:report_id>/download', methods=['GET'])
+@token_required
+def download_report(current_user_id, report_id):
+    """Stream a rendered report from disk"""
+    try:
+        conn = db.get()
+        report = reports.find_report(conn, current_user_id, report_id=report_id)
+        if not report:
+            return jsonify({'message': 'Report not found'}), 404
+        if report['status'] != 'ready' or not os.path.exists(report['filePath']):
+            return jsonify({'message': 'Report is not ready'}), 409
         
         return send_file(
-            buffer,
+            report['filePath'],
             as_attachment=True,
-            download_name=f'tender_report_{datetime.now().strftime("%Y%m%d")}.pdf',
-            mimetype='application/pdf'
+            download_name=f"tender_report_{report['type']}_{datetime.now().strftime('%Y%m%d')}.pdf",
+            mimetype='application/pdf',
+            conditional=True,
+            max_age=0
         )
         
     except Exception as e:
-        logger.error(f"Generate report error: {e}")
+        logger.error(f"Download report error: {e}")
         return jsonify({'message': 'Internal server error'}), 500
 
 # Health check endpoint
@@ -722,6 +2060,45 @@ def health_check():
         'version': '1.0.0'
     }), 200
 
+@app.route('/api/metrics', methods=['GET'])
+@limiter.exempt
+def metrics_endpoint():
+    """Prometheus text exposition of request, database, section and queue metrics"""
+    try:
+        expected = os.environ.get('METRICS_TOKEN')
+        if expected and request.headers.get('Authorization', '') != f'Bearer {expected}':
+            return jsonify({'message': 'Metrics token is missing or invalid'}), 401
+        
+        queue_depth = metrics.Gauge('job_queue_depth', 'Jobs waiting to run')
+        jobs = metrics.Gauge('jobs', 'Queued and running jobs by kind', ('kind', 'status'))
+        task_last = metrics.Gauge('scheduled_task_last_run', 'Last run of each scheduled task',
+                                  ('task', 'field'))
+        with db.connection() as conn:
+            queue_depth.set(job_queue.depth(conn))
+            for task in task_scheduler.status(conn):
+                for field, key in (('started_timestamp', 'lastStarted'), ('duration_seconds', 'lastDuration'),
+                                   ('rows', 'lastRows')):
+                    if task[key] is not None:
+                        task_last.set(task[key], task=task['name'], field=field)
+            for kind, status, count in conn.execute('''
+                SELECT kind, status, COUNT(*) FROM jobs
+                WHERE status IN ('queued', 'running')
+                GROUP BY kind, status
+            ''').fetchall():
+                jobs.set(count, kind=kind, status=status)
+        
+        return Response(metrics.registry.render(extra=[queue_depth, jobs, task_last]),
+                        mimetype='text/plain; version=0.0.4')
+        
+    except Exception as e:
+        logger.error(f"Metrics error: {e}")
+        return jsonify({'message': 'Internal server error'}), 500
+
+@app.route('/api/health/startup', methods=['GET'])
+def startup_health():
+    """Cold-start timings and memory of the worker serving this request"""
+    return jsonify(startup_report.snapshot()), 200
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -735,24 +2112,24 @@ def internal_error(error):
 def ratelimit_handler(e):
     return jsonify({'message': 'Rate limit exceeded'}), 429
 
+startup_report.mark('app_ready')
+logger.info(f"App ready {startup_report.events['app_ready']}s after process start")
+
 if __name__ == '__main__':
     # Initialize database
     init_database()
     
     # Create demo user if not exists
     try:
-        conn = sqlite3.connect('tender_management.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM users WHERE email = ?', ('demo@example.com',))
-        if not cursor.fetchone():
-            password_hash = bcrypt.hashpw('demo123'.encode('utf-8'), bcrypt.gensalt())
-            cursor.execute('''
-                INSERT INTO users (name, email, password_hash, company)
-                VALUES (?, ?, ?, ?)
-            ''', ('Demo User', 'demo@example.com', password_hash, 'Demo Company'))
-            conn.commit()
-            logger.info("Demo user created")
-        conn.close()
+        with db.connection() as conn:
+            if not conn.execute('SELECT id FROM users WHERE email = ?', ('demo@example.com',)).fetchone():
+                password_hash = bcrypt.hashpw('demo123'.encode('utf-8'), bcrypt.gensalt())
+                conn.execute('''
+                    INSERT INTO users (name, email, password_hash, company)
+                    VALUES (?, ?, ?, ?)
+                ''', ('Demo User', 'demo@example.com', password_hash, 'Demo Company'))
+                conn.commit()
+                logger.info("Demo user created")
     except Exception as e:
         logger.error(f"Error creating demo user: {e}")
     
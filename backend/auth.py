@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Authentication helpers for the Tender Management System
+Cached JWT decoding and password hashing on a bounded worker pool
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+import jwt
+import bcrypt
+
+from cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class HasherBusy(Exception):
+    """Raised when too many password checks are already waiting, or one waited too long"""
+
+
+class PasswordHasher:
+    """bcrypt on a small thread pool
+
+    bcrypt releases the GIL, so a handful of threads hash in parallel while
+    request threads that don't need it keep running; capping queued work
+    turns a login flood into fast 503s instead of a stalled worker.
+    """
+
+    def __init__(self, workers=None, max_pending=None, timeout=None):
+        self.workers = workers if workers is not None else int(os.environ.get('BCRYPT_WORKERS', 2))
+        self.max_pending = max_pending or int(os.environ.get('BCRYPT_MAX_PENDING', 64))
+        self.timeout = timeout or float(os.environ.get('BCRYPT_TIMEOUT', 10))
+        self._executor = None
+        self._pid = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _run(self, fn, *args):
+        if self.workers < 1:
+            return fn(*args)
+        with self._lock:
+            if self._pid != os.getpid():
+                # Pools don't survive fork; each gunicorn worker gets its own
+                self._pid = os.getpid()
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+                self._pending = 0
+            if self._pending >= self.max_pending:
+                raise HasherBusy()
+            self._pending += 1
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._done(None)
+            raise
+        # The slot is held until bcrypt finishes, even if this request gave up waiting
+        future.add_done_callback(self._done)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy()
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password):
+        return self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()))
+
+    def check(self, password, password_hash):
+        if isinstance(password_hash, str):
+            password_hash = password_hash.encode('utf-8')
+        return self._run(bcrypt.checkpw, password.encode('utf-8'), password_hash)
+
+
+class TokenDecoder:
+    """jwt.decode with the verified claims cached per token until they expire"""
+
+    def __init__(self, secret_key, ttl=None, maxsize=10000):
+        self.secret_key = secret_key
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl if ttl is not None else float(os.environ.get('AUTH_TOKEN_CACHE_TTL', 300)))
+
+    def decode(self, token):
+        """Claims of a valid token; raises jwt.ExpiredSignatureError / jwt.InvalidTokenError"""
+        claims = self.cache.get(token)
+        if claims is not None:
+            if claims.get('exp', float('inf')) > time.time():
+                return claims
+            self.cache.pop(token)
+            raise jwt.ExpiredSignatureError('Signature has expired')
+        claims = jwt.decode(token, self.secret_key, algorithms=['HS256'])
+        self.cache.set(token, claims)
+        return claims
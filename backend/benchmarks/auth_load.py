@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the authentication hot path
+
+    python benchmarks/auth_load.py --compare
+
+Runs login and /api/auth/me under concurrent clients against a throwaway
+SQLite database, with the auth caches and bcrypt pool enabled ("after") or
+disabled ("before"). The mixed scenario measures /auth/me latency while a
+login storm is running, i.e. how much bcrypt starves other requests.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BASELINE_ENV = {
+    'BCRYPT_WORKERS': '0',
+    'AUTH_TOKEN_CACHE_TTL': '0',
+    'AUTH_USER_CACHE_TTL': '0',
+}
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def summarize(latencies, elapsed):
+    return {
+        'requests': len(latencies),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'p50Ms': round(percentile(latencies, 50) * 1000, 2),
+        'p95Ms': round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+def run_clients(app, concurrency, duration, request):
+    """Call request(client, i) from `concurrency` threads for `duration` seconds"""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(index):
+        client = app.test_client()
+        local = []
+        i = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = request(client, index, i)
+            local.append(time.perf_counter() - started)
+            assert response.status_code < 400, response.get_data(as_text=True)
+            i += 1
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='auth-bench-')
+    os.chdir(workdir)
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{workdir}/bench.db')
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as backend
+    backend.app.config['RATELIMIT_ENABLED'] = False
+    backend.limiter.enabled = False
+    backend.init_database()
+
+    client = backend.app.test_client()
+    tokens = []
+    for n in range(args.users):
+        response = client.post('/api/auth/register', json={
+            'name': f'Bench User {n}', 'email': f'bench{n}@example.com', 'password': 'bench-password'
+        })
+        tokens.append(response.get_json()['token'])
+
+    def login(client, index, i):
+        return client.post('/api/auth/login', json={
+            'email': f'bench{(index + i) % args.users}@example.com', 'password': 'bench-password'
+        })
+
+    def me(client, index, i):
+        return client.get('/api/auth/me', headers={'Authorization': f'Bearer {tokens[(index + i) % args.users]}'})
+
+    results = {}
+    results['login'] = summarize(*run_clients(backend.app, args.concurrency, args.duration, login))
+    results['me'] = summarize(*run_clients(backend.app, args.concurrency, args.duration, me))
+
+    # /auth/me latency while half the clients hammer login
+    storm = threading.Thread(target=run_clients, args=(backend.app, args.concurrency, args.duration, login))
+    storm.start()
+    results['meDuringLoginStorm'] = summarize(*run_clients(backend.app, args.concurrency, args.duration, me))
+    storm.join()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--baseline', action='store_true', help='disable auth caches and the bcrypt pool')
+    parser.add_argument('--compare', action='store_true', help='run baseline and current configurations')
+    args = parser.parse_args()
+
+    if args.compare:
+        report = {}
+        for label, extra_env in (('before', BASELINE_ENV), ('after', {})):
+            command = [sys.executable, os.path.abspath(__file__), '--users', str(args.users),
+                       '--concurrency', str(args.concurrency), '--duration', str(args.duration)]
+            output = subprocess.run(command, env={**os.environ, **extra_env},
+                                    capture_output=True, text=True, check=True).stdout
+            report[label] = json.loads(output.strip().splitlines()[-1])
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.baseline:
+        os.environ.update(BASELINE_ENV)
+    print(json.dumps(run(args)))
+
+
+if __name__ == '__main__':
+    main()
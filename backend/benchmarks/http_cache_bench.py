@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+HTTP caching benchmark
+
+    python benchmarks/http_cache_bench.py --users 5 --tenders 500
+
+Seeds data the same way as suite.py, then for each polled read endpoint
+reports the bytes and mean latency of a plain response, a gzip response
+and a 304 revalidation (If-None-Match with the ETag from the first fetch).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import suite
+
+ENDPOINTS = ['/api/tenders?limit=50', '/api/tenders?limit=200', '/api/tenders/{tender}',
+             '/api/dashboard/stats', '/api/auth/me']
+
+
+def measure(client, path, headers, requests):
+    timings = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        timings.append(time.perf_counter() - started)
+    return response, round(statistics.mean(timings) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--tenders', type=int, default=500, help='tenders per user')
+    parser.add_argument('--requests', type=int, default=200, help='requests per endpoint and variant')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    # seed() also reads these suite options
+    args.documents, args.pages, args.clients = 3, 1, 40
+
+    workdir = tempfile.mkdtemp(prefix='http-cache-bench-')
+    os.chdir(workdir)
+    os.environ['DATABASE_URL'] = f'sqlite:///{workdir}/bench.db'
+    sys.path.insert(0, suite.BACKEND_DIR)
+
+    import app as backend
+    backend.app.config['RATELIMIT_ENABLED'] = False
+    backend.limiter.enabled = False
+    backend.init_database()
+    users, seeded = suite.seed(backend, args, random.Random(args.seed))
+    user = users[0]
+    client = backend.app.test_client()
+
+    report = {'seed': seeded, 'compressMinBytes': backend.http_cache.COMPRESS_MIN_BYTES, 'endpoints': {}}
+    for template in ENDPOINTS:
+        path = template.format(tender=user['tenders'][0])
+        plain, plain_ms = measure(client, path, user['headers'], args.requests)
+        gzipped, gzip_ms = measure(client, path, {**user['headers'], 'Accept-Encoding': 'gzip'}, args.requests)
+        revalidated, revalidate_ms = measure(
+            client, path, {**user['headers'], 'If-None-Match': plain.headers['ETag']}, args.requests)
+        report['endpoints'][template] = {
+            'identity': {'status': plain.status_code, 'bytes': len(plain.data), 'meanMs': plain_ms},
+            'gzip': {'status': gzipped.status_code, 'bytes': len(gzipped.data), 'meanMs': gzip_ms,
+                     'encoding': gzipped.headers.get('Content-Encoding')},
+            'notModified': {'status': revalidated.status_code, 'bytes': len(revalidated.data),
+                            'meanMs': revalidate_ms},
+            'gzipSavedPercent': round(100 * (1 - len(gzipped.data) / len(plain.data)), 1),
+        }
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
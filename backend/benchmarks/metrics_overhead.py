@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Overhead benchmark for request metrics
+
+    python benchmarks/metrics_overhead.py
+
+Times cheap requests (health check, cached /auth/me, tender list) in
+processes started with METRICS_ENABLED=0 and =1 against a throwaway SQLite
+database, so the cost of the per-request hooks and the database call hook
+shows up against the smallest possible request.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def time_requests(client, path, headers, requests):
+    client.get(path, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return round((time.perf_counter() - started) / requests * 1e6, 1)
+
+
+def run(args):
+    workdir = tempfile.mkdtemp(prefix='metrics-bench-')
+    os.chdir(workdir)
+    os.environ.setdefault('DATABASE_URL', f'sqlite:///{workdir}/bench.db')
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as backend
+    backend.app.config['RATELIMIT_ENABLED'] = False
+    backend.limiter.enabled = False
+    backend.init_database()
+
+    client = backend.app.test_client()
+    response = client.post('/api/auth/register', json={
+        'name': 'Bench User', 'email': 'bench@example.com', 'password': 'bench-password'
+    })
+    headers = {'Authorization': f"Bearer {response.get_json()['token']}"}
+    for n in range(20):
+        client.post('/api/tenders', headers=headers, json={
+            'title': f'Tender {n}', 'client': 'Bench Client', 'value': 100000 + n,
+            'deadline': '2030-01-01', 'category': 'construction'
+        })
+
+    return {
+        'health': time_requests(client, '/api/health', {}, args.requests),
+        'authMe': time_requests(client, '/api/auth/me', headers, args.requests),
+        'tenders': time_requests(client, '/api/tenders', headers, args.requests),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--run', action='store_true', help='measure this process only')
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args)))
+        return
+
+    report = {'microsecondsPerRequest': {}}
+    for label, enabled in (('disabled', '0'), ('enabled', '1')):
+        command = [sys.executable, os.path.abspath(__file__), '--run', '--requests', str(args.requests)]
+        output = subprocess.run(command, env={**os.environ, 'METRICS_ENABLED': enabled},
+                                capture_output=True, text=True, check=True).stdout
+        report['microsecondsPerRequest'][label] = json.loads(output.strip().splitlines()[-1])
+
+    disabled = report['microsecondsPerRequest']['disabled']
+    enabled = report['microsecondsPerRequest']['enabled']
+    report['overheadPercent'] = {
+        name: round((enabled[name] - disabled[name]) / disabled[name] * 100, 1) for name in disabled
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
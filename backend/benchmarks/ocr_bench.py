@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+OCR benchmark: pages per second on CPU
+
+    python benchmarks/ocr_bench.py --pages 10 --drawing-size 12000x9000
+
+Generates skewed A4 scans at 300 DPI plus one large drawing with known
+words, then for each engine that is installed (fast: Tesseract, accurate:
+EasyOCR) reports pages/second, peak RSS and word recall for three paths:
+
+    raw          the unprocessed image straight to the engine (earlier behaviour)
+    preprocessed deskewed and binarized, one call per image
+    tiled        preprocessed, large images read in overlapping tiles
+
+Preprocessing time is reported on its own as well; it needs only OpenCV.
+Each path runs in a fresh process so peak memory is its own.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import resource
+import tempfile
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORDS = ['tender', 'supply', 'install', 'contract', 'bridge', 'steel', 'concrete', 'section', 'drawing',
+         'schedule', 'client', 'council', 'survey', 'budget', 'phase', 'north', 'south', 'pump', 'valve']
+
+
+def make_scans(workdir, pages, drawing_size, seed):
+    """Write the test images; returns [(path, [words])]"""
+    import cv2
+    import numpy as np
+
+    rng = random.Random(seed)
+    images = []
+    for number in range(pages):
+        page = np.full((3508, 2480), 255, np.uint8)
+        words = []
+        for line in range(40):
+            text = ' '.join(rng.choice(WORDS) for _ in range(6))
+            cv2.putText(page, text, (150, 200 + line * 78), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 0, 3)
+            words += text.split()
+        angle = rng.uniform(-4, 4)
+        matrix = cv2.getRotationMatrix2D((1240, 1754), angle, 1.0)
+        page = cv2.warpAffine(page, matrix, (2480, 3508), borderValue=255)
+        path = os.path.join(workdir, f'page-{number}.png')
+        cv2.imwrite(path, page)
+        images.append((path, words))
+
+    width, height = drawing_size
+    drawing = np.full((height, width), 255, np.uint8)
+    words = []
+    for _ in range(width * height // 400_000):
+        word = rng.choice(WORDS)
+        x, y = rng.randrange(0, width - 400), rng.randrange(60, height - 20)
+        cv2.putText(drawing, word, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.4, 0, 3)
+        words.append(word)
+    for _ in range(200):
+        cv2.line(drawing, (rng.randrange(width), rng.randrange(height)),
+                 (rng.randrange(width), rng.randrange(height)), 0, 2)
+    path = os.path.join(workdir, 'drawing.png')
+    cv2.imwrite(path, drawing)
+    images.append((path, words))
+    return images
+
+
+def recall(expected, text):
+    found = text.lower().split()
+    counts = {}
+    for word in found:
+        counts[word] = counts.get(word, 0) + 1
+    hits = 0
+    for word in expected:
+        if counts.get(word, 0):
+            counts[word] -= 1
+            hits += 1
+    return hits / len(expected) if expected else 1.0
+
+
+def run_path(engine, path_name, images):
+    """One benchmark path in this process; prints a JSON result"""
+    sys.path.insert(0, BACKEND_DIR)
+    import ocr
+
+    if path_name != 'tiled':
+        ocr.TILE_ABOVE = float('inf')
+    results = []
+    started = time.perf_counter()
+    for image_path, expected in images:
+        image_started = time.perf_counter()
+        gray, _ = ocr.load_image(image_path)
+        if path_name == 'preprocess':
+            ocr.preprocess(gray)
+            text = ''
+        elif path_name == 'raw':
+            text = ocr.recognize(gray, engine)
+        else:
+            text = ocr.recognize(ocr.preprocess(gray), engine)
+        results.append({'image': os.path.basename(image_path), 'seconds': round(time.perf_counter() - image_started, 3),
+                        'recall': round(recall(expected, text), 3) if path_name != 'preprocess' else None})
+    elapsed = time.perf_counter() - started
+    print(json.dumps({
+        'pagesPerSecond': round(len(images) / elapsed, 3),
+        'peakRssMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        'images': results,
+    }))
+
+
+def engine_available(engine):
+    try:
+        if engine == 'fast':
+            import pytesseract
+            pytesseract.get_tesseract_version()
+        else:
+            import easyocr  # noqa: F401
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=10, help='A4 scans to generate')
+    parser.add_argument('--drawing-size', default='12000x9000', help='large drawing, WIDTHxHEIGHT px')
+    parser.add_argument('--engines', default='fast,accurate')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--run', nargs=3, metavar=('ENGINE', 'PATH', 'IMAGES_JSON'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        engine, path_name, images_json = args.run
+        with open(images_json) as f:
+            run_path(engine, path_name, json.load(f))
+        return
+
+    workdir = tempfile.mkdtemp(prefix='ocr-bench-')
+    width, height = (int(side) for side in args.drawing_size.lower().split('x'))
+    images = make_scans(workdir, args.pages, (width, height), args.seed)
+    images_json = os.path.join(workdir, 'images.json')
+    with open(images_json, 'w') as f:
+        json.dump(images, f)
+
+    def run(engine, path_name):
+        output = subprocess.run([sys.executable, __file__, '--run', engine, path_name, images_json],
+                                capture_output=True, text=True, check=True).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    report = {'cpus': os.cpu_count(), 'pages': args.pages, 'drawing': args.drawing_size,
+              'preprocess': run('fast', 'preprocess'), 'engines': {}}
+    for engine in args.engines.split(','):
+        missing = engine_available(engine)
+        if missing:
+            report['engines'][engine] = {'skipped': missing}
+            continue
+        report['engines'][engine] = {path_name: run(engine, path_name) for path_name in ('raw', 'preprocessed', 'tiled')}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the shared rate limit storage
+
+    python benchmarks/ratelimit_bench.py
+
+Measures the cost of one limiter check against the in-memory storage and
+the SQLite storage, and checks that several processes hitting the same key
+are admitted exactly `limit` times between them.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from limits import parse
+from limits.storage import MemoryStorage
+from limits.strategies import FixedWindowRateLimiter, MovingWindowRateLimiter
+
+from ratelimit import SQLiteStorage
+
+
+def time_checks(limiter, item, checks, keys):
+    started = time.perf_counter()
+    for i in range(checks):
+        limiter.hit(item, f'client-{i % keys}')
+    return round((time.perf_counter() - started) / checks * 1e6, 1)
+
+
+def contend(uri, limit, attempts, queue):
+    limiter = MovingWindowRateLimiter(SQLiteStorage(uri))
+    item = parse(f'{limit} per minute')
+    queue.put(sum(limiter.hit(item, 'shared') for _ in range(attempts)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=20000)
+    parser.add_argument('--keys', type=int, default=500)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--limit', type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='ratelimit-bench-')
+    item = parse('50 per hour')
+    report = {'microsecondsPerCheck': {}}
+    for name, storage in (('memory', MemoryStorage()),
+                          ('sqlite', SQLiteStorage(f'sqlite:///{workdir}/bench.db'))):
+        report['microsecondsPerCheck'][name] = {
+            'moving-window': time_checks(MovingWindowRateLimiter(storage), item, args.checks, args.keys),
+            'fixed-window': time_checks(FixedWindowRateLimiter(storage), item, args.checks, args.keys),
+        }
+
+    # Several processes share one limit: admissions must add up to exactly the limit
+    uri = f'sqlite:///{workdir}/contention.db'
+    SQLiteStorage(uri)
+    queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=contend, args=(uri, args.limit, args.limit, queue))
+               for _ in range(args.processes)]
+    for worker in workers:
+        worker.start()
+    admitted = sum(queue.get() for _ in workers)
+    for worker in workers:
+        worker.join()
+    report['crossProcess'] = {
+        'processes': args.processes,
+        'limit': args.limit,
+        'attempts': args.processes * args.limit,
+        'admitted': admitted,
+        'exact': admitted == args.limit,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Deadline score refresh benchmark
+
+    python benchmarks/score_refresh_bench.py --users 10 --tenders 10000
+
+Seeds tenders the same way as suite.py, then times the scheduled refresh
+(refresh_deadline_scores) for:
+
+    steady      nothing changed since the import scored every row
+    next-day    every deadline moved one day closer, as after midnight
+    next-week   seven days closer
+
+and, for comparison, re-scoring every tender of every user with
+rescore_user_tenders (what a blanket nightly job would do).
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import suite
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    rows = function(*args)
+    return {'rows': rows, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--tenders', type=int, default=10000, help='tenders per user')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    # seed() also reads these suite options
+    args.documents, args.pages, args.clients = 0, 1, 40
+
+    workdir = tempfile.mkdtemp(prefix='score-refresh-bench-')
+    os.chdir(workdir)
+    os.environ['DATABASE_URL'] = f'sqlite:///{workdir}/bench.db'
+    os.environ['SCHEDULER_ENABLED'] = '0'
+    sys.path.insert(0, suite.BACKEND_DIR)
+
+    import app as backend
+    backend.init_database()
+    users, seeded = suite.seed(backend, args, random.Random(args.seed))
+
+    report = {'seed': seeded, 'buckets': backend.training.DEADLINE_BUCKET_EDGES}
+    with backend.db.connection() as conn:
+        def open_tenders():
+            return conn.execute("SELECT COUNT(*) FROM tenders WHERE status IN ('active', 'pending')").fetchone()[0]
+
+        def shift(days):
+            conn.execute(f"UPDATE tenders SET deadline = DATE(deadline, '-{days} day')")
+            conn.commit()
+
+        # The first run expires past-due tenders; later ones start from the same state
+        report['first'] = timed(backend.refresh_deadline_scores, conn)
+        report['openTenders'] = open_tenders()
+        report['steady'] = timed(backend.refresh_deadline_scores, conn)
+        shift(1)
+        report['nextDay'] = timed(backend.refresh_deadline_scores, conn)
+        shift(7)
+        report['nextWeek'] = timed(backend.refresh_deadline_scores, conn)
+        report['rescoreAll'] = timed(lambda: sum(backend.rescore_user_tenders(conn, user['id']) for user in users))
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
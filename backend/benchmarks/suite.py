@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Benchmark and load-test suite for the backend
+
+    python benchmarks/suite.py --output before.json
+    python benchmarks/suite.py --output after.json --compare before.json
+
+Seeds a throwaway SQLite database with users, tenders and documents
+(generated PDFs and PNG scans), then runs each scenario with concurrent
+clients and writes a JSON report with throughput and latency percentiles.
+Seeding is deterministic for a given --seed, so reports from different
+commits are comparable; --compare exits with status 1 when a scenario's
+p95 latency or throughput is more than --threshold percent worse.
+
+By default requests go through the Flask test client in this process. With
+--url they are sent to a running server instead; start it against the
+database given by --database-url and from the same working directory, with
+RATELIMIT_ENABLED=0, so seeding and the server see the same data and files:
+
+    RATELIMIT_ENABLED=0 DATABASE_URL=sqlite:////tmp/bench.db gunicorn -c gunicorn.conf.py app:app
+    python benchmarks/suite.py --url http://127.0.0.1:5000 --database-url sqlite:////tmp/bench.db
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+import http.client
+from datetime import date, datetime, timedelta
+from urllib.parse import urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASSWORD = 'bench-password'
+CATEGORIES = ['construction', 'technology', 'healthcare', 'education', 'infrastructure', 'consulting']
+STATUSES = ['active', 'won', 'lost', 'pending']
+SCENARIOS = ['login', 'get_tenders', 'get_tender_detail', 'get_dashboard_stats',
+             'create_tender', 'upload_document', 'generate_report']
+
+
+# Transports: same call shape for the in-process test client and a real server
+class TestClientTransport:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json_body=None, files=None, headers=None):
+        data = None
+        if files:
+            data = {name: (io.BytesIO(content), filename) for name, (filename, content) in files.items()}
+        response = self.client.open(path, method=method, json=json_body, data=data, headers=headers or {})
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTransport:
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=120)
+
+    def request(self, method, path, json_body=None, files=None, headers=None):
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif files:
+            boundary = uuid.uuid4().hex
+            parts = []
+            for name, (filename, content) in files.items():
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                             f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode())
+                parts.append(content + b'\r\n')
+            parts.append(f'--{boundary}--\r\n'.encode())
+            body = b''.join(parts)
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        try:
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            # Server closed the keep-alive connection; retry once on a fresh one
+            self.connection.close()
+            self.connection.request(method, path, body=body, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        try:
+            return response.status, json.loads(payload)
+        except ValueError:
+            return response.status, None
+
+
+# Generated documents
+def make_pdf(rng, pages, scanned=False):
+    """A text PDF, or an image-only one that needs OCR when scanned=True"""
+    import fitz
+    doc = fitz.open()
+    for number in range(pages):
+        text = f'Tender specification page {number + 1}\n' + ' '.join(
+            rng.choice(['bridge', 'supply', 'network', 'hospital', 'road', 'software', 'audit', 'clause'])
+            for _ in range(120))
+        page = doc.new_page()
+        if scanned:
+            image = make_png(text)
+            page.insert_image(page.rect, stream=image)
+        else:
+            page.insert_textbox(fitz.Rect(50, 50, 550, 800), text, fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def make_png(text):
+    """A rendered page of text, like a phone scan of a printed notice"""
+    import fitz
+    doc = fitz.open()
+    page = doc.new_page(width=420, height=300)
+    page.insert_textbox(fitz.Rect(20, 20, 400, 280), text[:600], fontsize=9)
+    data = page.get_pixmap(dpi=100).tobytes('png')
+    doc.close()
+    return data
+
+
+# Seeding
+def seed(backend, args, rng):
+    """Users, tenders and documents written straight to the database"""
+    import jwt
+    import bulk
+
+    started = time.perf_counter()
+    password_hash = backend.password_hasher.hash(PASSWORD)
+    users = []
+    with backend.db.connection() as conn:
+        for n in range(args.users):
+            email = f'bench{n}@example.com'
+            row = conn.execute('SELECT id FROM users WHERE email = ?', (email,)).fetchone()
+            user_id = row[0] if row else conn.insert(
+                'INSERT INTO users (name, email, password_hash, company) VALUES (?, ?, ?, ?)',
+                (f'Bench User {n}', email, password_hash, 'Bench Ltd'))
+            token = jwt.encode({'user_id': user_id, 'exp': datetime.utcnow() + timedelta(days=1)},
+                               backend.app.config['SECRET_KEY'], algorithm='HS256')
+            users.append({'id': user_id, 'email': email, 'headers': {'Authorization': f'Bearer {token}'}})
+        conn.commit()
+
+        today = date.today()
+        for user in users:
+            records = ((number, {
+                'title': f'Tender {number} for user {user["id"]}',
+                'description': f'Supply and installation lot {number}',
+                'client': f'Client {rng.randrange(args.clients)}',
+                'value': round(rng.uniform(10_000, 5_000_000), 2),
+                'deadline': (today + timedelta(days=rng.randrange(-180, 365))).isoformat(),
+                'status': rng.choice(STATUSES),
+                'category': rng.choice(CATEGORIES),
+                'submissionDate': (today - timedelta(days=rng.randrange(0, 730))).isoformat(),
+            }) for number in range(args.tenders))
+            importer = bulk.TenderImporter(conn, user['id'], backend.ml_models.predict_many, backend.TENDER_STATUSES)
+            importer.run(records)
+            backend.analytics.refresh_user(conn, user['id'])
+            user['tenders'] = [row[0] for row in conn.execute(
+                'SELECT id FROM tenders WHERE user_id = ? ORDER BY id', (user['id'],)).fetchall()]
+
+        documents = 0
+        for user in users:
+            for number in range(args.documents):
+                if number % 3 == 2:
+                    filename, content = f'scan-{number}.png', make_png(f'Notice {user["id"]}-{number}')
+                else:
+                    filename, content = f'spec-{number}.pdf', make_pdf(rng, args.pages)
+                sha256, size = backend.blob_store.save(io.BytesIO(content))
+                backend.blob_store.register(conn, sha256, size)
+                document_id = conn.insert('''
+                    INSERT INTO documents (tender_id, filename, original_filename, file_size, file_type,
+                                           status, blob_sha256)
+                    VALUES (?, ?, ?, ?, ?, 'ready', ?)
+                ''', (rng.choice(user['tenders']), backend.blob_store.key(sha256), filename, size,
+                      filename.rsplit('.', 1)[1], sha256))
+                conn.execute('INSERT INTO document_texts (document_id, text) VALUES (?, ?)',
+                             (document_id, f'Seeded document {number}'))
+                documents += 1
+        conn.commit()
+
+    return users, {
+        'users': len(users),
+        'tenders': sum(len(user['tenders']) for user in users),
+        'documents': documents,
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+
+
+# Scenarios: each returns the response status of one timed operation
+def build_scenarios(users, args, rng):
+    uploads = [make_pdf(rng, args.pages, scanned=bool(n % 2)) for n in range(4)]
+
+    def user_for(worker, i):
+        return users[(worker + i * args.concurrency) % len(users)]
+
+    def login(transport, worker, i):
+        user = user_for(worker, i)
+        return transport.request('POST', '/api/auth/login', {'email': user['email'], 'password': PASSWORD})[0]
+
+    def get_tenders(transport, worker, i):
+        user = user_for(worker, i)
+        return transport.request('GET', '/api/tenders?limit=50', headers=user['headers'])[0]
+
+    def get_tender_detail(transport, worker, i):
+        user = user_for(worker, i)
+        tender_id = user['tenders'][(i * 7919 + worker) % len(user['tenders'])]
+        return transport.request('GET', f'/api/tenders/{tender_id}', headers=user['headers'])[0]
+
+    def get_dashboard_stats(transport, worker, i):
+        user = user_for(worker, i)
+        return transport.request('GET', '/api/dashboard/stats', headers=user['headers'])[0]
+
+    def create_tender(transport, worker, i):
+        user = user_for(worker, i)
+        return transport.request('POST', '/api/tenders', {
+            'title': f'Load test tender {worker}-{i}',
+            'description': 'Created by the benchmark suite',
+            'client': f'Client {i % args.clients}',
+            'value': 250_000 + i,
+            'deadline': (date.today() + timedelta(days=30 + i % 300)).isoformat(),
+            'category': CATEGORIES[i % len(CATEGORIES)],
+        }, headers=user['headers'])[0]
+
+    def upload_document(transport, worker, i):
+        user = user_for(worker, i)
+        # A unique trailer defeats content-hash dedupe so every upload is new work
+        content = uploads[i % len(uploads)] + f'\n% {uuid.uuid4().hex}\n'.encode()
+        return transport.request('POST', f'/api/tenders/{user["tenders"][0]}/documents',
+                                 files={'file': (f'upload-{worker}-{i}.pdf', content)},
+                                 headers=user['headers'])[0]
+
+    def generate_report(transport, worker, i):
+        # End to end: queue a render for new data and poll until the PDF is ready
+        user = user_for(worker, i)
+        status, body = transport.request('POST', '/api/reports/generate', {'type': 'detailed'},
+                                         headers=user['headers'])
+        if status not in (200, 202):
+            return status
+        report_id = body['report']['id']
+        deadline = time.perf_counter() + args.report_timeout
+        while body['report']['status'] == 'processing' and time.perf_counter() < deadline:
+            time.sleep(0.05)
+            status, body = transport.request('GET', f'/api/reports/{report_id}', headers=user['headers'])
+        return status if body['report']['status'] == 'ready' else 504
+
+    return {
+        'login': (login, args.login_requests),
+        'get_tenders': (get_tenders, args.requests),
+        'get_tender_detail': (get_tender_detail, args.requests),
+        'get_dashboard_stats': (get_dashboard_stats, args.requests),
+        'create_tender': (create_tender, args.write_requests),
+        'upload_document': (upload_document, args.write_requests),
+        'generate_report': (generate_report, args.report_requests),
+    }
+
+
+def touch_report_data(backend, users):
+    """Bump every user's data version so generate_report renders instead of hitting the cache"""
+    with backend.db.connection() as conn:
+        conn.executemany('UPDATE tender_stats SET version = version + 1 WHERE user_id = ?',
+                         [(user['id'],) for user in users])
+        conn.commit()
+
+
+def wait_for_jobs(backend, timeout):
+    """Let background work from the previous scenario finish so it doesn't skew the next one"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        with backend.db.connection() as conn:
+            pending = conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+        if not pending:
+            return 0
+        time.sleep(0.2)
+    return pending
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def run_scenario(make_transport, operation, requests, concurrency):
+    """Split `requests` operations across `concurrency` threads, each with its own transport"""
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+
+    def worker(index):
+        transport = make_transport()
+        local, local_statuses = [], {}
+        barrier.wait()
+        for i in range(index, requests, concurrency):
+            started = time.perf_counter()
+            status = operation(transport, index, i // concurrency)
+            local.append(time.perf_counter() - started)
+            local_statuses[status] = local_statuses.get(status, 0) + 1
+        with lock:
+            latencies.extend(local)
+            for status, count in local_statuses.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 2)
+    return {
+        'requests': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status >= 400),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'meanMs': ms(sum(latencies) / len(latencies)),
+        'p50Ms': ms(percentile(latencies, 50)),
+        'p95Ms': ms(percentile(latencies, 95)),
+        'p99Ms': ms(percentile(latencies, 99)),
+        'maxMs': ms(latencies[-1]),
+    }
+
+
+def compare(report, baseline, threshold):
+    """Per-scenario change against a baseline report; flags regressions beyond threshold percent"""
+    change = lambda new, old: round((new - old) / old * 100, 1) if old else None
+    result = {}
+    for name, current in report['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        throughput = change(current['throughput'], previous['throughput'])
+        p95 = change(current['p95Ms'], previous['p95Ms'])
+        result[name] = {
+            'throughputChangePercent': throughput,
+            'p95ChangePercent': p95,
+            'regressed': (throughput is not None and throughput < -threshold)
+                         or (p95 is not None and p95 > threshold)
+                         or current['errors'] > previous['errors'],
+        }
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tenders', type=int, default=500, help='tenders per user')
+    parser.add_argument('--documents', type=int, default=6, help='documents per user')
+    parser.add_argument('--pages', type=int, default=3, help='pages per generated PDF')
+    parser.add_argument('--clients', type=int, default=40, help='distinct tender clients')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='requests per read scenario')
+    parser.add_argument('--login-requests', type=int, default=100)
+    parser.add_argument('--write-requests', type=int, default=200, help='requests per create/upload scenario')
+    parser.add_argument('--report-requests', type=int, default=20)
+    parser.add_argument('--report-timeout', type=float, default=120)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS), help='comma-separated subset to run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--url', help='benchmark a running server instead of the in-process test client')
+    parser.add_argument('--database-url', help='database to seed (default: a new temporary SQLite file)')
+    parser.add_argument('--output', help='write the JSON report here as well as to stdout')
+    parser.add_argument('--compare', help='baseline JSON report to compare against')
+    parser.add_argument('--threshold', type=float, default=20, help='regression threshold in percent')
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(',')) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+    workdir = tempfile.mkdtemp(prefix='bench-suite-')
+    if not args.url:
+        os.chdir(workdir)
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{workdir}/bench.db'
+    sys.path.insert(0, BACKEND_DIR)
+
+    import app as backend
+    backend.app.config['RATELIMIT_ENABLED'] = False
+    backend.limiter.enabled = False
+    backend.init_database()
+
+    rng = random.Random(args.seed)
+    users, seeded = seed(backend, args, rng)
+    scenarios = build_scenarios(users, args, rng)
+    if args.url:
+        make_transport = lambda: HttpTransport(args.url)
+    else:
+        make_transport = lambda: TestClientTransport(backend.app)
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'startedAt': datetime.utcnow().isoformat(),
+            'target': args.url or 'test-client',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'config': {name: value for name, value in vars(args).items()
+                       if name not in ('output', 'compare', 'url', 'database_url')},
+        },
+        'seed': seeded,
+        'scenarios': {},
+    }
+    for name in SCENARIOS:
+        if name not in args.scenarios.split(','):
+            continue
+        operation, requests = scenarios[name]
+        if name == 'generate_report':
+            touch_report_data(backend, users)
+        report['scenarios'][name] = run_scenario(make_transport, operation, requests, args.concurrency)
+        # Uploads queue extraction jobs; drain them before timing anything else
+        report['scenarios'][name]['jobsLeftPending'] = wait_for_jobs(backend, args.report_timeout)
+
+    exit_code = 0
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        report['comparison'] = {
+            'baselineCommit': baseline.get('meta', {}).get('commit'),
+            'thresholdPercent': args.threshold,
+            'scenarios': compare(report, baseline, args.threshold),
+        }
+        if any(result['regressed'] for result in report['comparison']['scenarios'].values()):
+            exit_code = 1
+
+    output = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, 'w') as f:
+            f.write(output + '\n')
+    print(output)
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Training pipeline benchmark
+
+    python benchmarks/training_bench.py --tenders 1000000
+
+Fills a throwaway SQLite database with decided (won/lost) tenders whose
+outcome depends on client, value and lead time, then reports feature-build
+and fit time for a full training run and for an incremental (warm-start)
+update after a batch of new outcomes.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = ['Construction', 'Technology', 'Healthcare', 'Infrastructure', 'Education']
+
+
+def seed_tenders(conn, user_ids, tenders, clients, rng, status_for):
+    today = date.today()
+    chunk = []
+    for n in range(tenders):
+        client = rng.randrange(clients)
+        value = rng.uniform(10_000, 10_000_000)
+        lead = rng.randrange(5, 120)
+        submitted = today - timedelta(days=rng.randrange(30, 1500))
+        # Each client belongs to one user's pipeline, so client history builds up
+        chunk.append((user_ids[client % len(user_ids)], f'Tender {n}', f'Client {client}', value,
+                      (submitted + timedelta(days=lead)).isoformat(), status_for(client, value, lead),
+                      rng.choice(CATEGORIES), submitted.isoformat()))
+        if len(chunk) == 50_000:
+            _insert(conn, chunk)
+            chunk = []
+    _insert(conn, chunk)
+
+
+def _insert(conn, rows):
+    conn.executemany('''
+        INSERT INTO tenders (user_id, title, client, value, deadline, status, category, submission_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tenders', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--new-outcomes', type=int, default=20_000)
+    parser.add_argument('--jobs', type=int, default=-1, help='n_jobs for the forest')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='training-bench-')
+    os.chdir(workdir)
+    os.environ['DATABASE_URL'] = f'sqlite:///{workdir}/bench.db'
+    os.environ['MODEL_PATH'] = os.path.join(workdir, 'models')
+    os.environ['ML_RETRAIN_THRESHOLD'] = '0'
+
+    import app as backend
+    import training
+    backend.init_database()
+    backend.ml_models.ensure_loaded()  # bootstrap version the trained models build on
+    registry = backend.ml_models.registry
+
+    rng = random.Random(args.seed)
+    strength = [rng.random() for _ in range(args.clients)]
+    def status_for(client, value, lead):
+        p_win = 0.15 + 0.6 * strength[client] - 0.1 * (value > 5_000_000) + 0.1 * (lead > 30)
+        return 'won' if rng.random() < p_win else 'lost'
+
+    report = {'tenders': args.tenders, 'newOutcomes': args.new_outcomes, 'cpus': os.cpu_count(), 'jobs': args.jobs}
+    started = time.perf_counter()
+    with backend.db.connection() as conn:
+        user_ids = [conn.insert('INSERT INTO users (name, email, password_hash) VALUES (?, ?, ?)',
+                                (f'User {n}', f'user{n}@example.com', 'x')) for n in range(args.users)]
+        conn.commit()
+        seed_tenders(conn, user_ids, args.tenders, args.clients, rng, status_for)
+    report['seedSeconds'] = round(time.perf_counter() - started, 1)
+
+    with backend.db.connection() as conn:
+        started = time.perf_counter()
+        frame = training.load_outcomes(conn)
+        report['loadSeconds'] = round(time.perf_counter() - started, 3)
+        started = time.perf_counter()
+        training.build_features(frame)
+        report['featureBuildSeconds'] = round(time.perf_counter() - started, 3)
+        del frame
+
+        full = training.train(conn, registry, 'full', n_jobs=args.jobs)
+        report['full'] = {key: full[key] for key in ('samples', 'trees', 'featureSeconds', 'trainSeconds', 'holdout')}
+        report['full']['artifactMB'] = round(os.path.getsize(
+            os.path.join(registry.path(full['version']), 'risk_model.joblib')) / 1e6, 1)
+
+        # A batch of outcomes arrives after training (trigger stamps outcome_at)
+        time.sleep(1.1)
+        seed_tenders(conn, user_ids, args.new_outcomes, args.clients, rng, lambda *a: 'active')
+        conn.execute('''
+            UPDATE tenders SET status = CASE WHEN id % 2 = 0 THEN 'won' ELSE 'lost' END
+            WHERE status = 'active'
+        ''')
+        conn.commit()
+        incremental = training.train(conn, registry, 'incremental', n_jobs=args.jobs)
+        report['incremental'] = {key: incremental[key] for key in ('samples', 'trees', 'featureSeconds', 'trainSeconds')}
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Bulk tender import and export for the Tender Management System
+Streams CSV/JSONL in both directions; imports are scored and inserted in chunks
+"""
+
+import io
+import csv
+import json
+import math
+import logging
+from datetime import date
+
+from training import deadline_bucket
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('csv', 'jsonl')
+IMPORT_CHUNK = 1000
+EXPORT_CHUNK = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def detect_format(name, content_type=''):
+    """csv/jsonl from an explicit name, file extension or content type"""
+    name = (name or '').lower()
+    if name in FORMATS:
+        return name
+    if name.endswith(('.jsonl', '.ndjson')) or 'ndjson' in content_type or 'jsonl' in content_type:
+        return 'jsonl'
+    if name.endswith('.csv') or 'csv' in content_type:
+        return 'csv'
+    return None
+
+
+def iter_records(stream, fmt):
+    """Yield (row_number, record dict or error) from a binary stream without reading it whole"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        for number, record in enumerate(csv.DictReader(text), start=1):
+            yield number, record
+        return
+    for number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f'Invalid JSON: {e}')
+            continue
+        yield number, record if isinstance(record, dict) else ValueError('Expected a JSON object')
+
+
+def parse_value(value):
+    """Tender value as a non-negative float, or ValueError"""
+    if isinstance(value, bool):
+        raise ValueError('value must be a number')
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError('value must be a number')
+    if not math.isfinite(value) or value < 0:
+        raise ValueError('value must be a non-negative number')
+    return value
+
+
+def _parse_date(value, field):
+    if value in (None, ''):
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        raise ValueError(f'{field} must be YYYY-MM-DD')
+
+
+class TenderImporter:
+    """Validate, score and insert tender records for one user in chunked transactions"""
+
+    def __init__(self, conn, user_id, predict, statuses, history=None, chunk_size=IMPORT_CHUNK):
+        self.conn = conn
+        self.user_id = user_id
+        self.predict = predict
+        self.statuses = statuses
+        self.history = history
+        self.chunk_size = chunk_size
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.earliest = None
+
+    def validate(self, record):
+        """Row tuple for INSERT (without scores) or ValueError"""
+        if isinstance(record, Exception):
+            raise record
+        def get(*names):
+            value = next((record[n] for n in names if record.get(n) not in (None, '')), None)
+            # JSONL objects and arrays cannot be bound as column values
+            if not isinstance(value, (str, int, float, type(None))):
+                raise ValueError(f'{names[0]} must be a string, number or null')
+            return value
+
+        title, client = get('title'), get('client')
+        if not title or not client:
+            raise ValueError('title and client are required')
+        value = parse_value(get('value'))
+        deadline = _parse_date(get('deadline'), 'deadline')
+        if deadline is None:
+            raise ValueError('deadline is required')
+        # Unknown for many historical rows; left empty rather than dated today
+        submission_date = _parse_date(get('submissionDate', 'submission_date'), 'submissionDate')
+        status = get('status') or 'active'
+        if status not in self.statuses:
+            raise ValueError(f"status must be one of {', '.join(self.statuses)}")
+
+        return (str(title), get('description'), str(client), value, deadline.isoformat(),
+                status, get('category') or 'Other', submission_date and submission_date.isoformat())
+
+    def run(self, records):
+        chunk = []
+        for number, record in records:
+            try:
+                chunk.append(self.validate(record))
+            except ValueError as e:
+                self.failed += 1
+                if len(self.errors) < MAX_REPORTED_ERRORS:
+                    self.errors.append({'row': number, 'message': str(e)})
+                continue
+            if len(chunk) >= self.chunk_size:
+                self._insert(chunk)
+                chunk = []
+        self._insert(chunk)
+        return self
+
+    def _insert(self, rows):
+        if not rows:
+            return
+        today = date.today()
+        values = [row[3] for row in rows]
+        days = [(date.fromisoformat(row[4]) - today).days for row in rows]
+        categories = [row[6] for row in rows]
+        client_history = self.history([row[2] for row in rows]) if self.history else None
+        risk_scores, profit_predictions, model_version = self.predict(values, days, categories, client_history)
+        buckets = deadline_bucket(days).tolist()
+
+        self.conn.executemany('''
+            INSERT INTO tenders (user_id, title, description, client, value, deadline, status,
+                                 category, submission_date, risk_score, profit_prediction, model_version,
+                                 deadline_bucket)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(self.user_id, *row, float(risk), float(profit), model_version, bucket)
+              for row, risk, profit, bucket in zip(rows, risk_scores, profit_predictions, buckets)])
+        self.conn.commit()
+
+        self.imported += len(rows)
+        # Rows without a submission date fall in today's buckets (analytics uses created_at)
+        dates = [row[7] for row in rows if row[7]]
+        if dates:
+            earliest = min(dates)
+            self.earliest = min(self.earliest or earliest, earliest)
+
+    def summary(self):
+        return {
+            'imported': self.imported,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errorsTruncated': self.failed > len(self.errors)
+        }
+
+
+def export_tenders(db, user_id, fmt, fields, chunk_size=EXPORT_CHUNK):
+    """Yield a user's tenders as CSV or JSONL text, one keyset page at a time"""
+    names = list(fields)
+    columns = ', '.join(fields[name] for name in names)
+    if fmt == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(names)
+        yield buffer.getvalue()
+
+    last_id = None
+    # Own connection: the generator outlives the request's pooled connection
+    with db.connection() as conn:
+        while True:
+            # Keyset on id without assuming its type (integer or UUID)
+            after = '' if last_id is None else ' AND id > ?'
+            rows = conn.execute(f'''
+                SELECT id, {columns} FROM tenders
+                WHERE user_id = ?{after}
+                ORDER BY id
+                LIMIT ?
+            ''', (user_id, *([] if last_id is None else [last_id]), chunk_size)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if fmt == 'csv':
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(row[1:] for row in rows)
+                yield buffer.getvalue()
+            else:
+                yield ''.join(json.dumps(dict(zip(names, row[1:])), default=str) + '\n' for row in rows)
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Client statistics for the Tender Management System
+Per (user, client) bid/win counters kept current by triggers; source of the ML client_history feature
+"""
+
+import logging
+from datetime import date
+
+from cache import TTLCache
+import training
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_CHUNK = 500
+COLUMNS = ('client', 'bids', 'wins', 'losses', 'value_sum', 'last_submission')
+
+
+def _delta_sql(row, sign):
+    """Trigger statement adding (+) or removing (-) one tender row from client_stats"""
+    return f'''
+        UPDATE client_stats SET
+            bids = bids {sign} 1,
+            wins = wins {sign} (CASE WHEN {row}.status = 'won' THEN 1 ELSE 0 END),
+            losses = losses {sign} (CASE WHEN {row}.status = 'lost' THEN 1 ELSE 0 END),
+            value_sum = value_sum {sign} COALESCE({row}.value, 0)
+        WHERE user_id = {row}.user_id AND client = COALESCE({row}.client, '');'''
+
+
+# Rows are created on first sight and only ever move forward in last_submission
+_UPSERT_NEW = '''
+    INSERT INTO client_stats (user_id, client, last_submission)
+    VALUES (NEW.user_id, COALESCE(NEW.client, ''), COALESCE(NEW.submission_date, DATE(NEW.created_at)))
+    ON CONFLICT (user_id, client) DO UPDATE SET
+        last_submission = CASE
+            WHEN client_stats.last_submission IS NULL OR excluded.last_submission > client_stats.last_submission
+            THEN excluded.last_submission ELSE client_stats.last_submission END;'''
+
+
+def ensure_schema(conn):
+    """client_stats table and its maintenance triggers (SQLite; see supabase/migrations for PostgreSQL)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS client_stats (
+            user_id INTEGER NOT NULL,
+            client TEXT NOT NULL,
+            bids INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            value_sum REAL NOT NULL DEFAULT 0,
+            last_submission DATE,
+            PRIMARY KEY (user_id, client)
+        )
+    ''')
+    if not conn.execute('SELECT 1 FROM client_stats LIMIT 1').fetchone():
+        rebuild(conn)
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_client_stats_insert AFTER INSERT ON tenders BEGIN
+            {_UPSERT_NEW}
+            {_delta_sql('NEW', '+')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_client_stats_update
+        AFTER UPDATE OF user_id, client, status, value, submission_date ON tenders BEGIN
+            {_delta_sql('OLD', '-')}
+            {_UPSERT_NEW}
+            {_delta_sql('NEW', '+')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_client_stats_delete AFTER DELETE ON tenders BEGIN
+            {_delta_sql('OLD', '-')}
+        END
+    ''')
+
+
+def rebuild(conn):
+    """Recompute every client's counters in one grouped pass over tenders"""
+    conn.execute('DELETE FROM client_stats')
+    conn.execute('''
+        INSERT INTO client_stats (user_id, client, bids, wins, losses, value_sum, last_submission)
+        SELECT user_id,
+               COALESCE(client, ''),
+               COUNT(*),
+               SUM(CASE WHEN status = 'won' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status = 'lost' THEN 1 ELSE 0 END),
+               COALESCE(SUM(value), 0),
+               MAX(COALESCE(submission_date, DATE(created_at)))
+        FROM tenders
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id, COALESCE(client, '')
+    ''')
+
+
+def payload(stats, today=None):
+    """API shape of one client's stats"""
+    today = today or date.today()
+    last = stats['last_submission']
+    return {
+        'client': stats['client'],
+        'bids': stats['bids'],
+        'wins': stats['wins'],
+        'losses': stats['losses'],
+        'winRate': round(stats['wins'] / (stats['wins'] + stats['losses']), 4)
+                   if stats['wins'] + stats['losses'] else None,
+        'clientHistory': round(win_history(stats), 4),
+        'averageValue': round(stats['value_sum'] / stats['bids'], 2) if stats['bids'] else None,
+        'lastSubmission': str(last)[:10] if last else None,
+        'daysSinceLastBid': (today - date.fromisoformat(str(last)[:10])).days if last else None,
+    }
+
+
+def win_history(stats):
+    """The model's client_history feature: smoothed win rate (0.5 with no decided bids)"""
+    if not stats:
+        return training.history_rate(0, 0)
+    return training.history_rate(stats['wins'], stats['wins'] + stats['losses'])
+
+
+class ClientStatsStore:
+    """Per-user cache in front of client_stats
+
+    Each user's entry maps client -> stats (None for unknown clients) and is
+    filled lazily, one IN query for all missing clients. Writes in this
+    process drop the user's entry; the TTL bounds staleness across workers.
+    """
+
+    def __init__(self, ttl=30.0, maxsize=10000):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def lookup(self, conn, user_id, clients, cached=True):
+        """client -> stats dict (or None) for each requested client"""
+        clients = [client or '' for client in clients]
+        known = self.cache.get(user_id) if cached else None
+        if known is None:
+            known = {}
+            if cached:
+                self.cache.set(user_id, known)
+        missing = list({client for client in clients if client not in known})
+        for start in range(0, len(missing), LOOKUP_CHUNK):
+            chunk = missing[start:start + LOOKUP_CHUNK]
+            placeholders = ', '.join('?' for _ in chunk)
+            found = {row[0]: dict(zip(COLUMNS, row)) for row in conn.execute(f'''
+                SELECT {', '.join(COLUMNS)} FROM client_stats
+                WHERE user_id = ? AND client IN ({placeholders})
+            ''', (user_id, *chunk)).fetchall()}
+            for client in chunk:
+                known[client] = found.get(client)
+        return {client: known[client] for client in clients}
+
+    def history(self, conn, user_id, clients, cached=True):
+        """client_history feature for each client, in order"""
+        stats = self.lookup(conn, user_id, clients, cached)
+        return [win_history(stats[client or '']) for client in clients]
+
+    def invalidate(self, user_id):
+        self.cache.pop(user_id)
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Database access layer for the Tender Management System
+Bounded connection pool with pluggable SQLite/PostgreSQL backends
+"""
+
+import os
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import contextmanager
+
+from flask import g
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATABASE_URL = 'sqlite:///tender_management.db'
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes available in time"""
+
+
+# Backends
+class SQLiteBackend:
+    """SQLite backend tuned for concurrent readers and a single writer"""
+
+    name = 'sqlite'
+    IntegrityError = sqlite3.IntegrityError
+
+    def __init__(self, path):
+        self.path = path
+        self.pragmas = {
+            'journal_mode': 'WAL',
+            'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+            'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+            'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),  # KiB when negative
+            'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+            'temp_store': 'MEMORY',
+            'foreign_keys': 'ON',
+        }
+
+    def connect(self):
+        """Open a new connection with the tuned pragmas applied"""
+        conn = sqlite3.connect(
+            self.path,
+            timeout=self.pragmas['busy_timeout'] / 1000,
+            check_same_thread=False,  # connections move between threads via the pool
+            cached_statements=256,  # prepared statements are reused per connection
+        )
+        for pragma, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        return conn
+
+    def translate(self, sql):
+        return sql
+
+    def insert(self, cursor, sql, params):
+        cursor.execute(sql, params)
+        return cursor.lastrowid
+
+
+class PostgresBackend:
+    """PostgreSQL backend targeting the schema in supabase/migrations"""
+
+    name = 'postgresql'
+
+    def __init__(self, dsn):
+        try:
+            import psycopg2
+        except ImportError as e:
+            raise RuntimeError('psycopg2 is required for PostgreSQL DATABASE_URL') from e
+        self.psycopg2 = psycopg2
+        self.dsn = dsn
+        self.IntegrityError = psycopg2.IntegrityError
+
+    def connect(self):
+        """Open a new connection"""
+        return self.psycopg2.connect(self.dsn)
+
+    def translate(self, sql):
+        """Convert qmark placeholders to the pyformat style psycopg2 expects"""
+        return sql.replace('%', '%%').replace('?', '%s')
+
+    def insert(self, cursor, sql, params):
+        cursor.execute(sql.rstrip().rstrip(';') + ' RETURNING id', params)
+        return cursor.fetchone()[0]
+
+
+def create_backend(url):
+    """Pick a backend from a DATABASE_URL"""
+    if url.startswith('sqlite:///'):
+        return SQLiteBackend(url[len('sqlite:///'):])
+    if url.startswith(('postgres://', 'postgresql://')):
+        return PostgresBackend(url)
+    raise ValueError(f'Unsupported DATABASE_URL: {url}')
+
+
+# Connections
+class Connection:
+    """Pooled connection wrapper that speaks qmark SQL on every backend"""
+
+    # Optional callable(seconds) invoked after every database call (metrics)
+    observer = None
+
+    def __init__(self, raw, backend):
+        self.raw = raw
+        self.backend = backend
+
+    def _observed(self, call, *args):
+        if Connection.observer is None:
+            return call(*args)
+        started = time.perf_counter()
+        try:
+            return call(*args)
+        finally:
+            Connection.observer(time.perf_counter() - started)
+
+    def execute(self, sql, params=()):
+        cursor = self.raw.cursor()
+        self._observed(cursor.execute, self.backend.translate(sql), params)
+        return cursor
+
+    def executemany(self, sql, seq_of_params):
+        cursor = self.raw.cursor()
+        self._observed(cursor.executemany, self.backend.translate(sql), seq_of_params)
+        return cursor
+
+    def insert(self, sql, params=()):
+        """Run an INSERT and return the new row id"""
+        return self._observed(self.backend.insert, self.raw.cursor(), self.backend.translate(sql), params)
+
+    def commit(self):
+        self._observed(self.raw.commit)
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def close(self):
+        self.raw.close()
+
+
+class ConnectionPool:
+    """Bounded LIFO pool; connections are opened lazily up to max_size"""
+
+    def __init__(self, backend, max_size=10, timeout=10.0):
+        self.backend = backend
+        self.max_size = max_size
+        self.timeout = timeout
+        self._reset()
+
+    def _reset(self):
+        self._idle = queue.LifoQueue(maxsize=self.max_size)
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    def checkout(self):
+        """Borrow a connection, opening a new one if the pool is not full"""
+        if self._pid != os.getpid():
+            # Never share connections across a fork (e.g. gunicorn --preload)
+            self._reset()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.max_size:
+                self._opened += 1
+                try:
+                    return Connection(self.backend.connect(), self.backend)
+                except Exception:
+                    self._opened -= 1
+                    raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise PoolTimeout(f'No database connection available after {self.timeout}s')
+
+    def release(self, conn):
+        """Return a connection, discarding any uncommitted work"""
+        if self._pid != os.getpid():
+            return
+        try:
+            conn.rollback()
+        except Exception as e:
+            logger.warning(f"Discarding broken database connection: {e}")
+            conn.close()
+            with self._lock:
+                self._opened -= 1
+            return
+        self._idle.put_nowait(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+class Database:
+    """Application-wide entry point to the pooled database"""
+
+    def __init__(self, url=None, pool_size=None, pool_timeout=None):
+        self.url = url or os.environ.get('DATABASE_URL', DEFAULT_DATABASE_URL)
+        self.backend = create_backend(self.url)
+        self.IntegrityError = self.backend.IntegrityError
+        self.pool = ConnectionPool(
+            self.backend,
+            max_size=pool_size or int(os.environ.get('DB_POOL_SIZE', 10)),
+            timeout=pool_timeout or float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        )
+
+    def init_app(self, app):
+        """Return the request's connection to the pool when the app context ends"""
+        app.teardown_appcontext(self._teardown)
+
+    def _teardown(self, exc):
+        conn = g.pop('db_conn', None)
+        if conn is not None:
+            self.pool.release(conn)
+
+    def get(self):
+        """Connection checked out for the current request"""
+        if 'db_conn' not in g:
+            g.db_conn = self.pool.checkout()
+        return g.db_conn
+
+    @contextmanager
+    def connection(self):
+        """Checkout/return a connection outside of a request (CLI, workers)"""
+        conn = self.pool.checkout()
+        try:
+            yield conn
+        finally:
+            self.pool.release(conn)
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Document processing for the Tender Management System
+Text extraction from PDFs and scanned images, run by the background job queue
+"""
+
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from startup import lazy_import
+import metrics
+import ocr
+import search
+
+fitz = lazy_import('fitz')  # PyMuPDF
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+IMAGE_TYPES = ['jpg', 'jpeg', 'png', 'tiff']
+
+# PDFs with at least this many pages are split into page ranges across a process pool
+PDF_PARALLEL_PAGES = int(os.environ.get('PDF_PARALLEL_PAGES', 50))
+PDF_PAGE_BATCH = int(os.environ.get('PDF_PAGE_BATCH', 25))
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', min(4, os.cpu_count() or 1)))
+# Page batches submitted ahead of the one being yielded, per worker
+PDF_BATCHES_IN_FLIGHT = 2
+# Pages with less text than this are treated as scans and OCR'd
+OCR_MIN_CHARS = int(os.environ.get('OCR_MIN_CHARS', 20))
+OCR_DPI = 200
+# Bump whenever extraction output changes so cached results are not reused
+EXTRACTOR_VERSION = 'pymupdf-ocr-3'
+
+
+def extractor_version(engine=None):
+    """Extraction cache key: the same file read by another OCR engine is a different result"""
+    return f'{EXTRACTOR_VERSION}-{engine or ocr.DEFAULT_ENGINE}'
+
+
+def ensure_schema(conn):
+    """Per-page extraction results, written as pages complete, and the assembled full text"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS document_pages (
+            document_id INTEGER NOT NULL,
+            page_number INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            method TEXT NOT NULL,
+            PRIMARY KEY (document_id, page_number),
+            FOREIGN KEY (document_id) REFERENCES documents (id)
+        )
+    ''')
+    # Full text (for search) kept apart from the documents row, so metadata reads stay small
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS document_texts (
+            document_id INTEGER PRIMARY KEY,
+            text TEXT NOT NULL,
+            FOREIGN KEY (document_id) REFERENCES documents (id)
+        )
+    ''')
+    if 'extracted_text' in [row[1] for row in conn.execute('PRAGMA table_info(documents)').fetchall()]:
+        # Earlier schema: move the text out. The search index and its triggers read
+        # the old column; search.ensure_schema rebuilds them over document_texts
+        conn.execute('''
+            INSERT INTO document_texts (document_id, text)
+            SELECT id, extracted_text FROM documents WHERE extracted_text IS NOT NULL
+            ON CONFLICT (document_id) DO NOTHING
+        ''')
+        search.drop_document_index(conn)
+        conn.execute('ALTER TABLE documents DROP COLUMN extracted_text')
+    # Finished extractions by content hash: the document holding the result
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS extraction_cache (
+            sha256 TEXT NOT NULL,
+            extractor_version TEXT NOT NULL,
+            document_id INTEGER NOT NULL,
+            page_count INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (sha256, extractor_version),
+            FOREIGN KEY (document_id) REFERENCES documents (id)
+        )
+    ''')
+
+
+def pdf_page_count(file_path):
+    with fitz.open(file_path) as doc:
+        return doc.page_count
+
+
+def extract_page_range(file_path, start, stop):
+    """Text layer of pages [start, stop); runs in extraction worker processes"""
+    pages = []
+    with fitz.open(file_path) as doc:
+        for number in range(start, min(stop, doc.page_count)):
+            page = doc.load_page(number)
+            pages.append((number, page.get_text(), bool(page.get_images())))
+    return pages
+
+
+class DocumentProcessor:
+    def iter_pdf_pages(self, file_path, pages=None, ocr=True, engine=None):
+        """Yield (page_number, text, method) for a PDF, one page at a time
+
+        Large documents are split into page ranges extracted in parallel;
+        pages without a usable text layer fall back to OCR. ``pages``
+        restricts extraction to the given page numbers (used to resume);
+        ``engine`` picks the OCR engine (see ocr.ENGINES).
+        """
+        if pages is None:
+            pages = range(pdf_page_count(file_path))
+        pages = sorted(pages)
+        
+        for number, text, has_images in self._iter_text_layer(file_path, pages):
+            if ocr and has_images and len(text.strip()) < OCR_MIN_CHARS:
+                ocr_text = self.ocr_pdf_page(file_path, number, engine)
+                if ocr_text.strip():
+                    yield number, ocr_text, 'ocr'
+                    continue
+            yield number, text, 'text'
+    
+    def _iter_text_layer(self, file_path, pages):
+        batches = [pages[i:i + PDF_PAGE_BATCH] for i in range(0, len(pages), PDF_PAGE_BATCH)]
+        if len(pages) < PDF_PARALLEL_PAGES or PDF_WORKERS < 2:
+            for batch in batches:
+                for page in extract_page_range(file_path, batch[0], batch[-1] + 1):
+                    if page[0] in batch:
+                        yield page
+            return
+        
+        # Each worker opens the file itself; results are yielded in page order.
+        # Only a window of batches is in flight, and the next one is submitted
+        # as each is taken, so memory holds at most that many batches of text
+        with ProcessPoolExecutor(max_workers=PDF_WORKERS,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = iter(batches)
+            window = deque()
+            def submit_next():
+                batch = next(pending, None)
+                if batch is not None:
+                    window.append((batch, executor.submit(extract_page_range, file_path, batch[0], batch[-1] + 1)))
+            for _ in range(PDF_BATCHES_IN_FLIGHT * PDF_WORKERS):
+                submit_next()
+            while window:
+                batch, future = window.popleft()
+                result = future.result()
+                submit_next()
+                wanted = set(batch)
+                for page in result:
+                    if page[0] in wanted:
+                        yield page
+    
+    def ocr_pdf_page(self, file_path, page_number, engine=None):
+        """OCR a single rendered PDF page (for scanned pages with no text layer)"""
+        with fitz.open(file_path) as doc:
+            pixmap = doc.load_page(page_number).get_pixmap(dpi=OCR_DPI, colorspace=fitz.csGRAY)
+        gray = np.frombuffer(pixmap.samples, dtype=np.uint8).reshape(pixmap.height, pixmap.stride)[:, :pixmap.width]
+        return ocr.ocr_image(gray, engine)
+    
+    def extract_text_from_pdf(self, file_path, raise_errors=False):
+        """Extract text from PDF using PyMuPDF"""
+        try:
+            return "".join(text for _, text, _ in self.iter_pdf_pages(file_path, ocr=False))
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF: {e}")
+            if raise_errors:
+                raise
+            return ""
+    
+    def extract_text_from_image(self, file_path, raise_errors=False, engine=None):
+        """Extract text from a scanned image (preprocessed, tiled when large)"""
+        try:
+            return ocr.ocr_file(file_path, engine)
+        except Exception as e:
+            logger.error(f"Error extracting text from image: {e}")
+            if raise_errors:
+                raise
+            return ""
+    
+    def process_document(self, file_path, file_type, raise_errors=False, engine=None):
+        """Process document and extract text"""
+        if file_type.lower() == 'pdf':
+            return self.extract_text_from_pdf(file_path, raise_errors)
+        elif file_type.lower() in IMAGE_TYPES:
+            return self.extract_text_from_image(file_path, raise_errors, engine)
+        else:
+            return ""
+
+
+_processor = None
+
+def get_processor():
+    """Per-process DocumentProcessor, created on first use"""
+    global _processor
+    if _processor is None:
+        _processor = DocumentProcessor()
+    return _processor
+
+
+def get_pages(conn, document_id, start=0, limit=100):
+    """Extracted pages of a document in order; available while extraction runs"""
+    rows = conn.execute('''
+        SELECT page_number, text, method FROM document_pages
+        WHERE document_id = ? AND page_number >= ?
+        ORDER BY page_number
+        LIMIT ?
+    ''', (document_id, start, limit)).fetchall()
+    return [{'page': row[0] + 1, 'text': row[1], 'method': row[2]} for row in rows]
+
+
+def iter_text(db, document_id, start=0, stop=None, batch=PDF_PAGE_BATCH):
+    """Yield extracted text of pages [start, stop), fetching `batch` pages per query
+
+    Pages are separated by a form feed. Documents extracted before text was
+    stored per page have no pages; their full text is yielded whole.
+    """
+    where = 'document_id = ? AND page_number >= ?'
+    if stop is not None:
+        where += f' AND page_number < {int(stop)}'
+    next_page = start
+    separator = ''
+    # Own connection: the generator outlives the request's pooled connection
+    with db.connection() as conn:
+        while True:
+            rows = conn.execute(f'''
+                SELECT page_number, text FROM document_pages WHERE {where}
+                ORDER BY page_number
+                LIMIT ?
+            ''', (document_id, next_page, batch)).fetchall()
+            for _, text in rows:
+                yield separator + text
+                separator = '\f'
+            if len(rows) < batch:
+                break
+            next_page = rows[-1][0] + 1
+        if not separator and start == 0:
+            row = conn.execute('SELECT text FROM document_texts WHERE document_id = ?', (document_id,)).fetchone()
+            if row:
+                yield row[0]
+
+
+def _save_text(conn, document_id, text_sql, params):
+    conn.execute(f'''
+        INSERT INTO document_texts (document_id, text) VALUES (?, {text_sql})
+        ON CONFLICT (document_id) DO UPDATE SET text = excluded.text
+    ''', (document_id, *params))
+
+
+def _assemble_text(conn, document_id):
+    # Concatenate in the database so the full text is never rebuilt in Python
+    if conn.backend.name == 'postgresql':
+        aggregate = "SELECT string_agg(text, '' ORDER BY page_number) FROM document_pages WHERE document_id = ?"
+    else:
+        aggregate = '''SELECT group_concat(text, '') FROM (
+            SELECT text FROM document_pages WHERE document_id = ? ORDER BY page_number)'''
+    _save_text(conn, document_id, f"coalesce(({aggregate}), '')", (document_id,))
+    conn.execute("UPDATE documents SET status = 'ready' WHERE id = ?", (document_id,))
+
+
+def reuse_extraction(conn, sha256, document_id, engine=None):
+    """Copy a cached extraction of identical content onto a document; True on a hit"""
+    row = conn.execute('''
+        SELECT c.document_id, c.page_count
+        FROM extraction_cache c
+        JOIN documents d ON d.id = c.document_id
+        WHERE c.sha256 = ? AND c.extractor_version = ? AND d.status = 'ready'
+    ''', (sha256, extractor_version(engine))).fetchone()
+    if not row or row[0] == document_id:
+        return False
+    source_id, page_count = row
+    conn.execute('''
+        INSERT INTO document_pages (document_id, page_number, text, method)
+        SELECT ?, page_number, text, method FROM document_pages WHERE document_id = ?
+        ON CONFLICT (document_id, page_number) DO NOTHING
+    ''', (document_id, source_id))
+    _save_text(conn, document_id, "coalesce((SELECT text FROM document_texts WHERE document_id = ?), '')",
+               (source_id,))
+    conn.execute("UPDATE documents SET page_count = ?, status = 'ready' WHERE id = ?", (page_count, document_id))
+    return True
+
+
+def record_extraction(conn, sha256, document_id, page_count=None, engine=None):
+    conn.execute('''
+        INSERT INTO extraction_cache (sha256, extractor_version, document_id, page_count)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT (sha256, extractor_version) DO NOTHING
+    ''', (sha256, extractor_version(engine), document_id, page_count))
+
+
+# Job handlers (run inside job queue worker processes)
+def process_document_job(ctx, payload):
+    """Extract text for an uploaded document and mark it ready"""
+    document_id = payload['document_id']
+    sha256 = payload.get('sha256')
+    engine = payload.get('ocr_engine')
+    if sha256:
+        # An identical file may have finished extracting since this job was queued
+        with ctx.db.connection() as conn:
+            if reuse_extraction(conn, sha256, document_id, engine):
+                conn.commit()
+                return
+    
+    if payload['file_type'].lower() != 'pdf':
+        with metrics.timed('image_extraction'):
+            extracted_text = get_processor().process_document(
+                payload['file_path'], payload['file_type'], raise_errors=True, engine=engine
+            )
+        # An image is a single page, so the pages and text endpoints serve it like a PDF
+        with ctx.db.connection() as conn:
+            method = 'ocr' if payload['file_type'].lower() in IMAGE_TYPES else 'text'
+            _save_pages(conn, [(document_id, 0, extracted_text, method)])
+            _save_text(conn, document_id, '?', (extracted_text,))
+            conn.execute("UPDATE documents SET page_count = 1, status = 'ready' WHERE id = ?", (document_id,))
+            if sha256:
+                record_extraction(conn, sha256, document_id, 1, engine)
+            conn.commit()
+        return
+    
+    # PDFs are stored page by page as they complete; a retried job skips
+    # pages that an earlier attempt already saved
+    total = pdf_page_count(payload['file_path'])
+    with ctx.db.connection() as conn:
+        done = {row[0] for row in conn.execute(
+            'SELECT page_number FROM document_pages WHERE document_id = ?', (document_id,)
+        ).fetchall()}
+        conn.execute('UPDATE documents SET page_count = ? WHERE id = ?', (total, document_id))
+        conn.commit()
+    remaining = [number for number in range(total) if number not in done]
+    
+    with ctx.db.connection() as conn, metrics.timed('pdf_extraction'):
+        pending = []
+        for number, text, method in get_processor().iter_pdf_pages(payload['file_path'], remaining, engine=engine):
+            pending.append((document_id, number, text, method))
+            if len(pending) >= PDF_PAGE_BATCH:
+                _save_pages(conn, pending)
+                done.update(page[1] for page in pending)
+                pending = []
+                ctx.progress(len(done) / total)
+        _save_pages(conn, pending)
+        _assemble_text(conn, document_id)
+        if sha256:
+            record_extraction(conn, sha256, document_id, total, engine)
+        conn.commit()
+
+
+def _save_pages(conn, pages):
+    if not pages:
+        return
+    conn.executemany('''
+        INSERT INTO document_pages (document_id, page_number, text, method) VALUES (?, ?, ?, ?)
+        ON CONFLICT (document_id, page_number) DO UPDATE SET text = excluded.text, method = excluded.method
+    ''', pages)
+    conn.commit()
+
+
+def process_document_failed(conn, payload, error):
+    """Mark a document failed once its job has exhausted its retries"""
+    conn.execute("UPDATE documents SET status = 'failed' WHERE id = ?", (payload['document_id'],))
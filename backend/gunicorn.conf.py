@@ -0,0 +1,28 @@
+# Gunicorn configuration for the Tender Management System backend
+#
+#   PRELOAD_MODELS=1 gunicorn -c gunicorn.conf.py app:app
+#
+# With preload_app the app (and, with PRELOAD_MODELS=1, the ML models) is
+# imported once in the master; forked workers then share those pages
+# copy-on-write instead of each loading their own copy.
+
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+timeout = 60
+
+
+def on_starting(server):
+    # Make sure the schema exists before any worker serves traffic
+    from app import init_database
+    init_database()
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far out of the GC's reach so collections in
+    # workers don't touch (and therefore copy) the shared pages
+    gc.freeze()
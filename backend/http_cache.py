@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+HTTP caching for the Tender Management System
+Per-user data versions behind ETag/Last-Modified, conditional GETs and response compression
+"""
+
+import os
+import gzip
+import hashlib
+import logging
+from datetime import datetime, timezone
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# JSON bodies at least this large are compressed when the client accepts it (0 disables)
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', 6))
+COMPRESS_TYPES = ('application/json', 'text/plain', 'text/csv')
+
+# brotli is optional; without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Strong ETags differ per content coding; suffixes mark the encoded variants
+ENCODING_SUFFIXES = {'br': '-br', 'gzip': '-gz'}
+
+not_modified = metrics.registry.register(metrics.Counter(
+    'http_not_modified_total', '304 responses to conditional GETs', ('route',)))
+compressed_bytes = metrics.registry.register(metrics.Counter(
+    'http_compression_bytes_total', 'Response bytes before (identity) and after compression', ('encoding', 'stage')))
+
+
+def _bump_sql(user_id):
+    return f'''
+        INSERT INTO data_versions (user_id, version, updated_at) VALUES ({user_id}, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT (user_id) DO UPDATE SET version = data_versions.version + 1, updated_at = CURRENT_TIMESTAMP;'''
+
+
+def ensure_schema(conn):
+    """data_versions table and the triggers that bump it (SQLite; see supabase/migrations for PostgreSQL)
+
+    One counter per user covers everything the versioned endpoints return:
+    tenders, their documents and the profile.
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS data_versions (
+            user_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO data_versions (user_id, version) SELECT id, 1 FROM users')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_user_insert AFTER INSERT ON users BEGIN
+            {_bump_sql('NEW.id')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_user_update AFTER UPDATE ON users BEGIN
+            {_bump_sql('NEW.id')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_tender_insert
+        AFTER INSERT ON tenders WHEN NEW.user_id IS NOT NULL BEGIN
+            {_bump_sql('NEW.user_id')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_tender_update
+        AFTER UPDATE ON tenders WHEN NEW.user_id IS NOT NULL BEGIN
+            {_bump_sql('NEW.user_id')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_tender_moved
+        AFTER UPDATE OF user_id ON tenders WHEN OLD.user_id IS NOT NULL AND OLD.user_id IS NOT NEW.user_id BEGIN
+            {_bump_sql('OLD.user_id')}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_data_version_tender_delete
+        AFTER DELETE ON tenders WHEN OLD.user_id IS NOT NULL BEGIN
+            {_bump_sql('OLD.user_id')}
+        END
+    ''')
+    owner = '(SELECT user_id FROM tenders WHERE id = {row}.tender_id)'
+    for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_data_version_document_{event.lower()}
+            AFTER {event} ON documents WHEN {owner.format(row=row)} IS NOT NULL BEGIN
+                {_bump_sql(owner.format(row=row))}
+            END
+        ''')
+
+
+def data_version(conn, user_id):
+    """(version, last modified as an aware UTC datetime or None) for one user"""
+    row = conn.execute('SELECT version, updated_at FROM data_versions WHERE user_id = ?', (user_id,)).fetchone()
+    if not row:
+        return 0, None
+    version, updated_at = row
+    if isinstance(updated_at, str):
+        updated_at = datetime.fromisoformat(updated_at)
+    if updated_at is not None and updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return version, updated_at
+
+
+def make_etag(user_id, version, resource):
+    """Strong ETag for one resource (path and query) of one user at one data version"""
+    return hashlib.sha1(f'{user_id}:{version}:{resource}'.encode('utf-8')).hexdigest()[:20]
+
+
+def _base_tag(tag):
+    for suffix in ENCODING_SUFFIXES.values():
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def matching_etag(request, etag):
+    """ETag to send with a 304 if the conditional GET matches, else None
+
+    Only If-None-Match is honoured: updated_at has one-second resolution, so
+    two writes within a second could make If-Modified-Since answer 304 for
+    stale data; the version in the ETag changes on every write. Tags are
+    compared weakly and without encoding suffix, so a representation a proxy
+    re-encoded (nginx weakens the ETag when it gzips) still validates; the
+    client's own tag is echoed back.
+    """
+    if request.if_none_match:
+        if request.if_none_match.star_tag:
+            return etag
+        for tag in request.if_none_match.as_set(include_weak=True):
+            if _base_tag(tag) == etag:
+                return tag
+    return None
+
+
+def negotiate(request):
+    """Best content coding the client accepts, or None"""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def compress_response(request, response):
+    """Compress a large text/JSON response in place (after_request hook)"""
+    if (not COMPRESS_MIN_BYTES or response.direct_passthrough or response.is_streamed or response.status_code != 200
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESS_TYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request)
+    if encoding is None:
+        return response
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+    if encoding == 'br':
+        encoded = brotli.compress(body, quality=min(COMPRESS_LEVEL, 11))
+    else:
+        encoded = gzip.compress(body, compresslevel=COMPRESS_LEVEL, mtime=0)
+    response.set_data(encoded)
+    response.headers['Content-Encoding'] = encoding
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(etag + ENCODING_SUFFIXES[encoding], weak)
+    compressed_bytes.inc(len(body), encoding=encoding, stage='identity')
+    compressed_bytes.inc(len(encoded), encoding=encoding, stage='encoded')
+    return response
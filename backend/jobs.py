@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Background job queue for the Tender Management System
+SQLite-backed queue table drained by a per-process dispatcher into a worker pool
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from db import Database
+
+logger = logging.getLogger(__name__)
+
+
+class JobContext:
+    """Handed to job handlers inside worker processes"""
+
+    def __init__(self, job_id, db):
+        self.job_id = job_id
+        self.db = db
+
+    def progress(self, fraction):
+        """Record progress (0..1) so status endpoints can report it"""
+        with self.db.connection() as conn:
+            conn.execute('UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?',
+                         (float(fraction), time.time(), self.job_id))
+            conn.commit()
+
+
+_worker_db = None
+
+def _run_job(handler, job_id, payload):
+    """Entry point executed in the worker pool"""
+    global _worker_db
+    if _worker_db is None:
+        _worker_db = Database()
+    handler(JobContext(job_id, _worker_db), payload)
+
+
+class JobQueue:
+    """Durable job queue with bounded concurrency and retry with backoff"""
+
+    def __init__(self, db, concurrency=None, max_attempts=None, retry_delay=None,
+                 executor=None, poll_interval=None, stale_after=None):
+        self.db = db
+        self.concurrency = concurrency or int(os.environ.get('JOB_CONCURRENCY', 2))
+        self.max_attempts = max_attempts or int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+        self.retry_delay = retry_delay or float(os.environ.get('JOB_RETRY_DELAY', 5))
+        self.executor_kind = executor or os.environ.get('JOB_EXECUTOR', 'process')
+        self.poll_interval = poll_interval or float(os.environ.get('JOB_POLL_INTERVAL', 1))
+        self.stale_after = stale_after or float(os.environ.get('JOB_STALE_AFTER', 900))
+        self.handlers = {}
+        self._pid = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._inflight = 0
+
+    def register(self, kind, handler, on_failure=None):
+        """Register a module-level handler(ctx, payload) for a job kind"""
+        self.handlers[kind] = (handler, on_failure)
+
+    def ensure_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL DEFAULT 3,
+                progress REAL NOT NULL DEFAULT 0,
+                error TEXT,
+                run_after REAL NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after, id)')
+
+    # Producer side
+    def enqueue(self, conn, kind, payload, max_attempts=None):
+        """Insert a job in the caller's transaction; call notify() after commit"""
+        if kind not in self.handlers:
+            raise ValueError(f'Unknown job kind: {kind}')
+        now = time.time()
+        return conn.insert('''
+            INSERT INTO jobs (kind, payload, max_attempts, run_after, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (kind, json.dumps(payload), max_attempts or self.max_attempts, now, now, now))
+
+    def notify(self):
+        self.ensure_started()
+        self._wake.set()
+
+    def get(self, conn, job_id):
+        row = conn.execute(
+            'SELECT id, kind, status, attempts, max_attempts, progress, error FROM jobs WHERE id = ?', (job_id,)
+        ).fetchone()
+        if not row:
+            return None
+        return {
+            'id': row[0],
+            'kind': row[1],
+            'status': row[2],
+            'attempts': row[3],
+            'maxAttempts': row[4],
+            'progress': row[5],
+            'error': row[6]
+        }
+
+    def depth(self, conn):
+        """Number of jobs waiting to run"""
+        return conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    # Dispatcher side
+    def ensure_started(self):
+        """Start the dispatcher once per process (safe to call on every request)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._inflight = 0
+            self._new_executor()
+            threading.Thread(target=self._dispatch_loop, name='job-dispatcher', daemon=True).start()
+
+    def _new_executor(self):
+        if self.executor_kind == 'thread':
+            self.executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        else:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+
+    def _dispatch_loop(self):
+        self._requeue_stale()
+        while True:
+            try:
+                free = self.concurrency - self._inflight
+                claimed = self._claim(free) if free > 0 else []
+                for job_id, kind, payload in claimed:
+                    self._submit(job_id, kind, payload)
+                if not claimed:
+                    self._wake.wait(self.poll_interval)
+                    self._wake.clear()
+            except Exception as e:
+                logger.error(f"Job dispatcher error: {e}")
+                time.sleep(self.poll_interval)
+
+    def _requeue_stale(self):
+        """Recover jobs left running by a crashed process"""
+        with self.db.connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND updated_at < ?",
+                (time.time() - self.stale_after,)
+            )
+            conn.commit()
+
+    def _claim(self, limit):
+        claimed = []
+        now = time.time()
+        with self.db.connection() as conn:
+            candidates = conn.execute('''
+                SELECT id, kind, payload FROM jobs
+                WHERE status = 'queued' AND run_after <= ?
+                ORDER BY run_after, id
+                LIMIT ?
+            ''', (now, limit)).fetchall()
+            for job_id, kind, payload in candidates:
+                # Conditional update makes the claim atomic across processes
+                cursor = conn.execute('''
+                    UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ?
+                    WHERE id = ? AND status = 'queued'
+                ''', (now, job_id))
+                if cursor.rowcount == 1:
+                    claimed.append((job_id, kind, json.loads(payload)))
+            conn.commit()
+        return claimed
+
+    def _submit(self, job_id, kind, payload):
+        handler, _ = self.handlers[kind]
+        with self._lock:
+            self._inflight += 1
+        try:
+            future = self.executor.submit(_run_job, handler, job_id, payload)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM during OCR); replace the pool and carry on
+            logger.warning("Job worker pool broken, starting a new one")
+            self._new_executor()
+            future = self.executor.submit(_run_job, handler, job_id, payload)
+        future.add_done_callback(lambda f: self._finish(job_id, kind, payload, f))
+
+    def _finish(self, job_id, kind, payload, future):
+        with self._lock:
+            self._inflight -= 1
+        error = future.exception()
+        try:
+            with self.db.connection() as conn:
+                if error is None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'done', progress = 1, error = NULL, updated_at = ? WHERE id = ?",
+                        (time.time(), job_id)
+                    )
+                else:
+                    attempts, max_attempts = conn.execute(
+                        'SELECT attempts, max_attempts FROM jobs WHERE id = ?', (job_id,)
+                    ).fetchone()
+                    if attempts < max_attempts:
+                        logger.warning(f"Job {job_id} ({kind}) failed, retrying: {error}")
+                        conn.execute(
+                            "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                            (str(error), time.time() + self.retry_delay * 2 ** (attempts - 1), time.time(), job_id)
+                        )
+                    else:
+                        logger.error(f"Job {job_id} ({kind}) failed permanently: {error}")
+                        conn.execute(
+                            "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                            (str(error), time.time(), job_id)
+                        )
+                        _, on_failure = self.handlers[kind]
+                        if on_failure:
+                            on_failure(conn, payload, error)
+                conn.commit()
+        except Exception as e:
+            logger.error(f"Error recording result of job {job_id}: {e}")
+        self._wake.set()
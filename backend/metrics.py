@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Metrics for the Tender Management System
+In-process counters and histograms rendered in the Prometheus text format
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+# With several worker processes, each one writes snapshots here and /api/metrics sums them
+METRICS_DIR = os.environ.get('METRICS_DIR')
+FLUSH_INTERVAL = float(os.environ.get('METRICS_FLUSH_INTERVAL', 5))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SECTION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Per-request breakdown (query count/time, time spent in timed sections)
+current_request = contextvars.ContextVar('current_request', default=None)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def empty(self):
+        return type(self)(self.name, self.help, self.labelnames)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _labels(self, key, extra=()):
+        pairs = list(zip(self.labelnames, key)) + list(extra)
+        if not pairs:
+            return ''
+        escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def merge(self, key, state):
+        self.values[key] = self.values.get(key, 0.0) + state
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield f'{self.name}{self._labels(key)} {value}'
+
+
+class Gauge(Metric):
+    """Point-in-time value computed at scrape time (never aggregated)"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        self.values[self._key(labels)] = value
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield f'{self.name}{self._labels(key)} {value}'
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def empty(self):
+        return Histogram(self.name, self.help, self.labelnames, self.buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts, then sum and count
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def merge(self, key, state):
+        current = self.values.get(key)
+        if current is None:
+            self.values[key] = list(state)
+        else:
+            self.values[key] = [a + b for a, b in zip(current, state)]
+
+    def samples(self):
+        for key, state in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                yield f'{self.name}_bucket{self._labels(key, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{self._labels(key)} {state[-2]}'
+            yield f'{self.name}_count{self._labels(key)} {state[-1]}'
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        data = {}
+        for name, metric in self.metrics.items():
+            with metric.lock:
+                data[name] = [[list(key), state if metric.kind == 'counter' else list(state)]
+                              for key, state in metric.values.items()]
+        return data
+
+    # Cross-process aggregation
+    def ensure_flushing(self):
+        """Start this process's snapshot writer (no-op without METRICS_DIR)"""
+        if not METRICS_DIR or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked: the parent's numbers belong to the parent's snapshot
+                for metric in self.metrics.values():
+                    metric.values = {}
+            self._pid = os.getpid()
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            threading.Thread(target=self._flush_loop, name='metrics-flush', daemon=True).start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Metrics flush error: {e}")
+
+    def flush(self):
+        path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+        with open(f'{path}.tmp', 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(f'{path}.tmp', path)
+
+    def collect(self):
+        """Metrics to render: this process, or every process's snapshot when shared"""
+        if not METRICS_DIR:
+            return self.metrics.values()
+        self.flush()
+        merged = {name: metric.empty() for name, metric in self.metrics.items()}
+        for filename in os.listdir(METRICS_DIR):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(METRICS_DIR, filename)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            for name, entries in snapshot.items():
+                if name in merged:
+                    for key, state in entries:
+                        merged[name].merge(tuple(key), state)
+        return merged.values()
+
+    def render(self, extra=()):
+        lines = []
+        for metric in list(self.collect()) + list(extra):
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency by route', ('method', 'route', 'status')))
+request_db_queries = registry.register(Histogram(
+    'http_request_db_queries', 'Database queries per request', ('route',), COUNT_BUCKETS))
+db_query_seconds = registry.register(Counter(
+    'db_query_seconds_total', 'Time spent in database calls', ('route',)))
+db_queries = registry.register(Counter(
+    'db_queries_total', 'Database calls', ('route',)))
+section_seconds = registry.register(Histogram(
+    'section_duration_seconds', 'Time in instrumented sections (OCR, PDF extraction, ML inference, reports)',
+    ('section',), SECTION_BUCKETS))
+
+
+def start_request():
+    """Begin a per-request breakdown; returns the token for end_request"""
+    registry.ensure_flushing()
+    return current_request.set({'started': time.perf_counter(), 'queries': 0, 'db': 0.0, 'sections': {}})
+
+
+def end_request(token, method, route, status):
+    """Record the request and return its breakdown"""
+    stats = current_request.get()
+    current_request.reset(token)
+    elapsed = time.perf_counter() - stats['started']
+    request_duration.observe(elapsed, method=method, route=route, status=status)
+    request_db_queries.observe(stats['queries'], route=route)
+    if stats['queries']:
+        db_queries.inc(stats['queries'], route=route)
+        db_query_seconds.inc(stats['db'], route=route)
+    stats['elapsed'] = elapsed
+    return stats
+
+
+def observe_query(seconds):
+    """Database call hook (see db.Connection.observer)"""
+    stats = current_request.get()
+    if stats is not None:
+        stats['queries'] += 1
+        stats['db'] += seconds
+
+
+@contextmanager
+def timed(section):
+    """Time a block as section_duration_seconds{section=...}"""
+    if not ENABLED:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        registry.ensure_flushing()
+        section_seconds.observe(elapsed, section=section)
+        stats = current_request.get()
+        if stats is not None:
+            stats['sections'][section] = stats['sections'].get(section, 0.0) + elapsed
+
+
+def describe(stats):
+    """One-line breakdown for the slow request log"""
+    parts = [f"db {stats['queries']} queries {stats['db'] * 1000:.1f} ms"]
+    parts += [f"{name} {seconds * 1000:.1f} ms" for name, seconds in stats['sections'].items()]
+    return ', '.join(parts)
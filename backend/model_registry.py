@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Model registry for the Tender Management System
+Versioned joblib artifacts under models/<version>/ and an atomically switched ACTIVE pointer
+
+    python model_registry.py list
+    python model_registry.py activate <version>
+
+Running workers notice a new ACTIVE version within ML_RELOAD_INTERVAL
+seconds and swap it in without a restart.
+"""
+
+import os
+import sys
+import json
+import pickle
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+ARTIFACTS = ('scaler', 'risk_model', 'profit_model')
+ACTIVE_FILE = 'ACTIVE'
+# Pickles written by earlier releases straight into models/
+LEGACY_FILES = {'scaler': 'scaler.pkl', 'risk_model': 'risk_model.pkl', 'profit_model': 'profit_model.pkl'}
+
+
+class ModelRegistry:
+    """Immutable model versions on disk plus the name of the active one"""
+
+    def __init__(self, root='models'):
+        self.root = root
+
+    def path(self, version):
+        return os.path.join(self.root, version)
+
+    def metadata(self, version):
+        """Version metadata, or None if the version doesn't exist (or is still being written)"""
+        if not version or os.sep in version or version.startswith('.'):
+            return None
+        try:
+            with open(os.path.join(self.path(version), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def versions(self):
+        """Metadata for every complete version, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = [self.metadata(name) for name in os.listdir(self.root)]
+        return sorted((meta for meta in found if meta), key=lambda meta: meta['createdAt'])
+
+    def active(self):
+        try:
+            with open(os.path.join(self.root, ACTIVE_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(self, artifacts, metadata=None, version=None):
+        """Write a new version; it becomes visible in one rename, once complete"""
+        import joblib
+
+        version = version or datetime.utcnow().strftime('%Y%m%d-%H%M%S-%f')
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = tempfile.mkdtemp(prefix=f'.{version}.', dir=self.root)
+        for name in ARTIFACTS:
+            # Uncompressed: loading skips decompression
+            joblib.dump(artifacts[name], os.path.join(tmp_dir, f'{name}.joblib'))
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({'version': version, 'createdAt': datetime.utcnow().isoformat(), **(metadata or {})}, f)
+        os.rename(tmp_dir, self.path(version))
+        logger.info(f"Saved model version {version}")
+        return version
+
+    def activate(self, version):
+        """Point ACTIVE at an existing version (atomic replace)"""
+        if self.metadata(version) is None:
+            raise ValueError(f'Unknown model version: {version}')
+        tmp_path = os.path.join(self.root, f'.{ACTIVE_FILE}.{os.getpid()}')
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, ACTIVE_FILE))
+        logger.info(f"Activated model version {version}")
+
+    def load(self, version):
+        """Artifacts of one version"""
+        import joblib
+
+        if self.metadata(version) is None:
+            raise ValueError(f'Unknown model version: {version}')
+        return {name: joblib.load(os.path.join(self.path(version), f'{name}.joblib'))
+                for name in ARTIFACTS}
+
+    def import_legacy(self):
+        """Register pre-registry pickles in models/ as version 'legacy'; returns it, or None"""
+        paths = {name: os.path.join(self.root, filename) for name, filename in LEGACY_FILES.items()}
+        if not all(os.path.exists(path) for path in paths.values()):
+            return None
+        if self.metadata('legacy'):
+            return 'legacy'
+        artifacts = {}
+        for name, path in paths.items():
+            with open(path, 'rb') as f:
+                artifacts[name] = pickle.load(f)
+        return self.save(artifacts, {'source': 'legacy pickle import'}, version='legacy')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage ML model versions')
+    parser.add_argument('--root', default=os.environ.get('MODEL_PATH', 'models'))
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('list', help='list versions')
+    activate = commands.add_parser('activate', help='make a version active in every worker')
+    activate.add_argument('version')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == 'list':
+        active = registry.active()
+        for meta in registry.versions():
+            marker = '*' if meta['version'] == active else ' '
+            print(f"{marker} {meta['version']}  {json.dumps({k: v for k, v in meta.items() if k != 'version'})}")
+        return
+    try:
+        registry.activate(args.version)
+    except ValueError as e:
+        sys.exit(str(e))
+    print(f'Active model version: {args.version}')
+
+
+if __name__ == '__main__':
+    main()
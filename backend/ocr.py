@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+OCR for the Tender Management System
+Scan preprocessing (downscale, grayscale, deskew, binarize) and tiled recognition with a fast or accurate engine
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from startup import lazy_import, report as startup_report
+import metrics
+
+np = lazy_import('numpy')
+
+logger = logging.getLogger(__name__)
+
+# fast: Tesseract via pytesseract; accurate: EasyOCR
+ENGINES = ('fast', 'accurate')
+DEFAULT_ENGINE = os.environ.get('OCR_ENGINE', 'accurate')
+# Scans above this resolution are downscaled to it before recognition
+TARGET_DPI = int(os.environ.get('OCR_TARGET_DPI', 300))
+# Without DPI metadata the scale is unknown; the longer side is capped at this many px
+# instead (about A2 at 300 DPI)
+MAX_SIDE = int(os.environ.get('OCR_MAX_SIDE', 7000))
+BINARIZE = os.environ.get('OCR_BINARIZE', '1') == '1'
+# Images with a side longer than TILE_ABOVE px are recognized in overlapping tiles;
+# the overlap must exceed the tallest line of text
+TILE_ABOVE = int(os.environ.get('OCR_TILE_ABOVE', 4000))
+TILE_SIZE = int(os.environ.get('OCR_TILE_SIZE', 2048))
+TILE_OVERLAP = int(os.environ.get('OCR_TILE_OVERLAP', 200))
+# Tesseract runs as a subprocess per tile, so tiles scale across cores. EasyOCR runs
+# on torch, which already spreads one tile across all cores
+WORKERS = {
+    'fast': int(os.environ.get('OCR_FAST_WORKERS', os.cpu_count() or 1)),
+    'accurate': int(os.environ.get('OCR_ACCURATE_WORKERS', 1)),
+}
+# Skew below this (degrees) is left alone; above MAX_DESKEW the estimate is not trusted
+MIN_DESKEW = 0.3
+MAX_DESKEW = 15.0
+
+_reader = None
+_reader_lock = threading.Lock()
+
+
+def easyocr_reader():
+    """Per-process EasyOCR reader, loaded on first use (seconds and hundreds of MB)"""
+    global _reader
+    if _reader is None:
+        with _reader_lock:
+            if _reader is None:
+                with startup_report.timed('ocr_reader_load'):
+                    import easyocr
+                    _reader = easyocr.Reader(['en'])
+    return _reader
+
+
+def load_image(file_path):
+    """(grayscale array, DPI or None) for an image file, downscaled to TARGET_DPI
+
+    Images without DPI metadata are downscaled to MAX_SIDE px on the longer
+    side instead. JPEGs are decoded at reduced size (draft mode), so a huge
+    scan is never held in memory at full resolution.
+    """
+    from PIL import Image
+
+    with Image.open(file_path) as image:
+        dpi = image.info.get('dpi')
+        dpi = float(dpi[0]) if dpi and dpi[0] else None
+        if dpi:
+            scale = TARGET_DPI / dpi if dpi > TARGET_DPI else 1.0
+        else:
+            scale = min(1.0, MAX_SIDE / max(image.width, image.height))
+        size = (round(image.width * scale), round(image.height * scale))
+        if scale < 1:
+            image.draft('L', size)
+        gray = np.asarray(image.convert('L'))
+    if gray.shape[::-1] != size:
+        import cv2
+        gray = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+    return gray, (TARGET_DPI if dpi and scale < 1 else dpi)
+
+
+def skew_angle(gray):
+    """Estimated rotation of the text in degrees (counter-clockwise positive), from a reduced copy"""
+    import cv2
+
+    factor = 1500 / max(gray.shape)
+    small = cv2.resize(gray, None, fx=factor, fy=factor, interpolation=cv2.INTER_AREA) if factor < 1 else gray
+    _, ink = cv2.threshold(small, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+    points = cv2.findNonZero(ink)
+    if points is None or len(points) < 100:
+        return 0.0
+    angle = cv2.minAreaRect(points)[2]
+    # minAreaRect reports [0, 90); fold into (-45, 45]
+    if angle > 45:
+        angle -= 90
+    return -angle
+
+
+def preprocess(gray):
+    """Deskew and binarize a grayscale scan"""
+    import cv2
+
+    angle = skew_angle(gray)
+    if MIN_DESKEW <= abs(angle) <= MAX_DESKEW:
+        height, width = gray.shape
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), -angle, 1.0)
+        gray = cv2.warpAffine(gray, matrix, (width, height), flags=cv2.INTER_LINEAR,
+                              borderMode=cv2.BORDER_CONSTANT, borderValue=255)
+    if BINARIZE:
+        _, gray = cv2.threshold(cv2.GaussianBlur(gray, (3, 3), 0), 0, 255,
+                                cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return gray
+
+
+def _tile_starts(length):
+    if length <= TILE_SIZE:
+        return [0]
+    step = TILE_SIZE - TILE_OVERLAP
+    starts = list(range(0, length - TILE_SIZE, step))
+    return starts + [length - TILE_SIZE]
+
+
+def _cuts(starts):
+    """Ownership boundaries between consecutive tiles: the middle of each overlap"""
+    middles = [(start + previous + TILE_SIZE) / 2 for previous, start in zip(starts, starts[1:])]
+    return [float('-inf')] + middles + [float('inf')]
+
+
+def tiles(image):
+    """(x, y, x-range owned, y-range owned) for each tile of an image
+
+    Tiles overlap by TILE_OVERLAP so text cut by one tile's edge is whole in
+    its neighbour. A word is kept only by the tile owning its centre, which
+    drops the duplicate read from the overlap.
+    """
+    height, width = image.shape[:2]
+    xs, ys = _tile_starts(width), _tile_starts(height)
+    x_cuts, y_cuts = _cuts(xs), _cuts(ys)
+    return [(x, y, (x_cuts[i], x_cuts[i + 1]), (y_cuts[j], y_cuts[j + 1]))
+            for j, y in enumerate(ys) for i, x in enumerate(xs)]
+
+
+def _read_fast(image):
+    import pytesseract
+
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    return [(left, top, left + width, top + height, text.strip())
+            for left, top, width, height, text, conf in zip(
+                data['left'], data['top'], data['width'], data['height'], data['text'], data['conf'])
+            if text.strip() and float(conf) >= 0]
+
+
+def _read_accurate(image):
+    words = []
+    for box, text, _ in easyocr_reader().readtext(image):
+        xs, ys = [point[0] for point in box], [point[1] for point in box]
+        words.append((min(xs), min(ys), max(xs), max(ys), text))
+    return words
+
+
+READERS = {'fast': _read_fast, 'accurate': _read_accurate}
+
+
+def reading_order(words):
+    """Join (x0, y0, x1, y1, text) boxes into lines, top to bottom and left to right"""
+    lines = []
+    for word in sorted(words, key=lambda word: (word[1] + word[3]) / 2):
+        centre, height = (word[1] + word[3]) / 2, word[3] - word[1]
+        if lines and abs(centre - lines[-1]['centre']) <= max(height, lines[-1]['height']) / 2:
+            line = lines[-1]
+            line['words'].append(word)
+            line['centre'] += (centre - line['centre']) / len(line['words'])
+        else:
+            lines.append({'words': [word], 'centre': centre, 'height': height})
+    return '\n'.join(' '.join(word[4] for word in sorted(line['words'])) for line in lines)
+
+
+def recognize(image, engine=None):
+    """Text of a preprocessed image; large images are read tile by tile on a thread pool"""
+    engine = engine or DEFAULT_ENGINE
+    read = READERS[engine]
+    if max(image.shape[:2]) <= TILE_ABOVE:
+        return reading_order(read(image))
+
+    def read_tile(tile):
+        x, y, (x_lo, x_hi), (y_lo, y_hi) = tile
+        words = []
+        for x0, y0, x1, y1, text in read(image[y:y + TILE_SIZE, x:x + TILE_SIZE]):
+            x0, y0, x1, y1 = x0 + x, y0 + y, x1 + x, y1 + y
+            if x_lo <= (x0 + x1) / 2 < x_hi and y_lo <= (y0 + y1) / 2 < y_hi:
+                words.append((x0, y0, x1, y1, text))
+        return words
+
+    grid = tiles(image)
+    with ThreadPoolExecutor(max_workers=max(1, min(WORKERS[engine], len(grid)))) as executor:
+        return reading_order([word for words in executor.map(read_tile, grid) for word in words])
+
+
+def ocr_image(gray, engine=None):
+    """Preprocess and recognize a grayscale page image"""
+    with metrics.timed('ocr_preprocess'):
+        image = preprocess(gray)
+    with metrics.timed('ocr'):
+        return recognize(image, engine)
+
+
+def ocr_file(file_path, engine=None):
+    """Text of a scanned image file"""
+    with metrics.timed('ocr_preprocess'):
+        gray, _ = load_image(file_path)
+    return ocr_image(gray, engine)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Rate limit storage for the Tender Management System
+SQLite-backed flask_limiter storage shared by every worker process on a host
+"""
+
+import os
+import time
+import random
+import sqlite3
+import logging
+import threading
+
+from limits.storage import Storage, MovingWindowSupport
+
+from db import SQLiteBackend
+
+logger = logging.getLogger(__name__)
+
+# Fraction of writes that also purge every expired row, not just the key's own
+PURGE_PROBABILITY = 0.001
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Counters and moving-window entries in a SQLite file
+
+    Each check is one short BEGIN IMMEDIATE transaction, so increments are
+    atomic across processes. Use ``sqlite:///ratelimits.db`` as the
+    Limiter storage_uri (four slashes for an absolute path).
+    """
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri=None, wrap_exceptions=False, **options):
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+        self.path = uri[len('sqlite:///'):] if uri else 'ratelimits.db'
+        self._local = threading.local()
+        self._pid = os.getpid()
+        with self._transaction() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_counters (
+                    key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS rate_window_entries (
+                    key TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_window_key ON rate_window_entries (key, expires_at)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_window_expires ON rate_window_entries (expires_at)')
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _connection(self):
+        # One connection per thread; connections are never carried across fork
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._local = threading.local()
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = SQLiteBackend(self.path).connect()
+            conn.isolation_level = None  # explicit BEGIN IMMEDIATE below
+            # Counters are disposable; losing the last writes on power failure is fine
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute('PRAGMA foreign_keys = OFF')
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        return _Transaction(self._connection())
+
+    def _maybe_purge(self, conn, now):
+        if random.random() < PURGE_PROBABILITY:
+            conn.execute('DELETE FROM rate_counters WHERE expires_at <= ?', (now,))
+            conn.execute('DELETE FROM rate_window_entries WHERE expires_at <= ?', (now,))
+
+    # Fixed window
+    def incr(self, key, expiry, amount=1, elastic_expiry=False):
+        now = time.time()
+        with self._transaction() as conn:
+            self._maybe_purge(conn, now)
+            row = conn.execute('''
+                INSERT INTO rate_counters (key, count, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    count = CASE WHEN expires_at <= ? THEN excluded.count ELSE count + excluded.count END,
+                    expires_at = CASE WHEN expires_at <= ? OR ? THEN excluded.expires_at ELSE expires_at END
+                RETURNING count
+            ''', (key, amount, now + expiry, now, now, int(elastic_expiry))).fetchone()
+        return row[0]
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT count FROM rate_counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get_expiry(self, key):
+        row = self._connection().execute(
+            'SELECT expires_at FROM rate_counters WHERE key = ? AND expires_at > ?', (key, time.time())
+        ).fetchone()
+        return row[0] if row else time.time()
+
+    # Moving (sliding) window
+    def acquire_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+        now = time.time()
+        with self._transaction() as conn:
+            self._maybe_purge(conn, now)
+            count = conn.execute(
+                'SELECT COUNT(*) FROM rate_window_entries WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()[0]
+            if count + amount > limit:
+                return False
+            conn.execute('DELETE FROM rate_window_entries WHERE key = ? AND expires_at <= ?', (key, now))
+            conn.executemany(
+                'INSERT INTO rate_window_entries (key, expires_at) VALUES (?, ?)',
+                [(key, now + expiry)] * amount
+            )
+        return True
+
+    def get_moving_window(self, key, limit, expiry):
+        now = time.time()
+        oldest, count = self._connection().execute(
+            'SELECT MIN(expires_at), COUNT(*) FROM rate_window_entries WHERE key = ? AND expires_at > ?',
+            (key, now)
+        ).fetchone()
+        if not count:
+            return now, 0
+        return oldest - expiry, count
+
+    # Maintenance
+    def check(self):
+        try:
+            self._connection().execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        with self._transaction() as conn:
+            cleared = conn.execute('DELETE FROM rate_counters').rowcount
+            cleared += conn.execute('DELETE FROM rate_window_entries').rowcount
+        return cleared
+
+    def clear(self, key):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM rate_counters WHERE key = ?', (key,))
+            conn.execute('DELETE FROM rate_window_entries WHERE key = ?', (key,))
+
+
+class _Transaction:
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on error"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute('BEGIN IMMEDIATE')
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+PDF reports for the Tender Management System
+Rendered by the background job queue from chunked queries and cached on disk per data version
+"""
+
+import os
+import logging
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import metrics
+from startup import lazy_import
+
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+REPORT_TYPES = ('summary', 'detailed')
+FETCH_CHUNK = 500
+# One Table per chunk: a single huge Table is measured and split as a whole on every page
+TABLE_CHUNK = 250
+TOP_RISK_LIMIT = 20
+# Same thresholds as the ML recommendations: < 0.3, < 0.6, above
+RISK_BANDS = ['Low (< 0.3)', 'Moderate (0.3 - 0.6)', 'High (>= 0.6)']
+
+
+def ensure_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS reports (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            report_type TEXT NOT NULL,
+            data_version INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'processing',
+            job_id INTEGER,
+            file_path TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+    ''')
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_user_type_version
+        ON reports (user_id, report_type, data_version)
+    ''')
+
+
+def data_version(conn, user_id):
+    """data_versions.version, bumped by triggers on every write to the user's profile, tenders or documents
+
+    Reports print the owner's name and company, so profile edits must
+    invalidate them too (tender_stats.version only follows tenders).
+    """
+    row = conn.execute('SELECT version FROM data_versions WHERE user_id = ?', (user_id,)).fetchone()
+    return row[0] if row else 0
+
+
+def report_path(folder, user_id, report_type, version):
+    return os.path.abspath(os.path.join(folder, str(user_id), f'{report_type}-v{version}.pdf'))
+
+
+def find_report(conn, user_id, report_id=None, report_type=None, version=None):
+    """A report row by id, or by (type, data version), scoped to the user"""
+    if report_id is not None:
+        where, params = 'id = ?', (report_id,)
+    else:
+        where, params = 'report_type = ? AND data_version = ?', (report_type, version)
+    row = conn.execute(f'''
+        SELECT id, report_type, data_version, status, job_id, file_path, created_at
+        FROM reports WHERE user_id = ? AND {where}
+    ''', (user_id,) + params).fetchone()
+    if not row:
+        return None
+    return {
+        'id': row[0],
+        'type': row[1],
+        'dataVersion': row[2],
+        'status': row[3],
+        'jobId': row[4],
+        'filePath': row[5],
+        'createdAt': row[6]
+    }
+
+
+def iter_rows(cursor, size=FETCH_CHUNK):
+    """Yield rows from a cursor without fetching the whole result"""
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def _number(value):
+    """Stored number as a float; None when missing or text written before values were validated"""
+    value = pd.to_numeric(value, errors='coerce')
+    return None if pd.isna(value) else float(value)
+
+
+def _money(value):
+    return f"${_number(value) or 0:,.0f}"
+
+
+def _percent(value):
+    value = _number(value)
+    return f"{value * 100:.1f}%" if value is not None else '-'
+
+
+def _score(value):
+    value = _number(value)
+    return f"{value:.2f}" if value is not None else '-'
+
+
+def _table(rows, widths=None):
+    from reportlab.lib import colors
+    from reportlab.platypus import Table, TableStyle
+
+    table = Table(rows, colWidths=widths, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')]),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#d1d5db')),
+        ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
+    ]))
+    return table
+
+
+def _chunked_tables(rows, header, widths=None):
+    """Tables of TABLE_CHUNK rows each from a row iterator"""
+    chunk = [header]
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) > TABLE_CHUNK:
+            yield _table(chunk, widths)
+            chunk = [header]
+    if len(chunk) > 1:
+        yield _table(chunk, widths)
+
+
+def build_story(conn, user_id, report_type):
+    """Platypus flowables for a user's report"""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, Spacer
+
+    styles = getSampleStyleSheet()
+    story = []
+
+    user = conn.execute('SELECT name, company FROM users WHERE id = ?', (user_id,)).fetchone()
+    story.append(Paragraph("Tender Management Report", styles['Title']))
+    owner = ' - '.join(escape(part) for part in (user or ()) if part)
+    story.append(Paragraph(f"{owner}<br/>Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}", styles['Normal']))
+    story.append(Spacer(1, 12))
+
+    # Executive summary from the trigger-maintained stats row
+    stats = conn.execute('''
+        SELECT total_tenders, active_tenders, won_tenders, won_value, profit_sum, profit_count
+        FROM tender_stats WHERE user_id = ?
+    ''', (user_id,)).fetchone() or (0, 0, 0, 0, 0, 0)
+    total, active, won, won_value, profit_sum, profit_count = stats
+    decided = conn.execute(
+        "SELECT COUNT(*) FROM tenders WHERE user_id = ? AND status IN ('won', 'lost')", (user_id,)
+    ).fetchone()[0]
+    story.append(Paragraph("Executive Summary", styles['Heading1']))
+    story.append(_table([
+        ['Metric', 'Value'],
+        ['Total tenders', f"{total:,}"],
+        ['Active tenders', f"{active:,}"],
+        ['Won tenders', f"{won:,}"],
+        ['Win rate (decided bids)', _percent(won / decided if decided else None)],
+        ['Value won', _money(won_value)],
+        ['Average predicted margin', _percent(profit_sum / profit_count if profit_count else None)],
+    ], widths=[220, 160]))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Pipeline by Status", styles['Heading2']))
+    rows = conn.execute('''
+        SELECT status, COUNT(*), SUM(value) FROM tenders
+        WHERE user_id = ? GROUP BY status ORDER BY COUNT(*) DESC
+    ''', (user_id,)).fetchall()
+    story.append(_table([['Status', 'Tenders', 'Value']] +
+                        [[status or '-', f"{count:,}", _money(value)] for status, count, value in rows],
+                        widths=[160, 100, 120]))
+    story.append(Spacer(1, 12))
+
+    story.append(Paragraph("Performance by Category", styles['Heading2']))
+    rows = conn.execute('''
+        SELECT category, COUNT(*),
+               SUM(CASE WHEN status = 'won' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN status IN ('won', 'lost') THEN 1 ELSE 0 END),
+               SUM(value)
+        FROM tenders WHERE user_id = ? GROUP BY category ORDER BY COUNT(*) DESC
+    ''', (user_id,)).fetchall()
+    story.append(_table([['Category', 'Tenders', 'Won', 'Win rate', 'Value']] +
+                        [[category or 'Uncategorised', f"{count:,}", f"{won_count:,}",
+                          _percent(won_count / decided_count if decided_count else None), _money(value)]
+                         for category, count, won_count, decided_count, value in rows],
+                        widths=[140, 70, 60, 70, 100]))
+    story.append(Spacer(1, 12))
+
+    # Risk breakdown over scored tenders
+    story.append(Paragraph("Risk Breakdown", styles['Heading2']))
+    counts = {band: (count, value) for band, count, value in conn.execute('''
+        SELECT CASE WHEN risk_score < 0.3 THEN 0 WHEN risk_score < 0.6 THEN 1 ELSE 2 END AS band,
+               COUNT(*), SUM(value)
+        FROM tenders WHERE user_id = ? AND risk_score IS NOT NULL
+        GROUP BY band
+    ''', (user_id,)).fetchall()}
+    story.append(_table([['Risk band', 'Tenders', 'Value']] +
+                        [[name, f"{counts.get(i, (0, 0))[0]:,}", _money(counts.get(i, (0, 0))[1])]
+                         for i, name in enumerate(RISK_BANDS)],
+                        widths=[160, 100, 120]))
+    story.append(Spacer(1, 8))
+    cursor = conn.execute('''
+        SELECT title, client, value, deadline, risk_score FROM tenders
+        WHERE user_id = ? AND status = 'active' AND risk_score IS NOT NULL
+        ORDER BY risk_score DESC LIMIT ?
+    ''', (user_id, TOP_RISK_LIMIT))
+    top_risk = [[(title or '')[:50], (client or '')[:30], _money(value), deadline or '-', _score(risk)]
+                for title, client, value, deadline, risk in cursor.fetchall()]
+    if top_risk:
+        story.append(Paragraph("Highest-risk active tenders", styles['Heading3']))
+        story.append(_table([['Title', 'Client', 'Value', 'Deadline', 'Risk']] + top_risk,
+                            widths=[170, 110, 80, 70, 40]))
+
+    if report_type == 'detailed':
+        story.append(Spacer(1, 12))
+        story.append(Paragraph("All Tenders", styles['Heading1']))
+        cursor = conn.execute('''
+            SELECT title, client, category, status, value, deadline, risk_score, profit_prediction
+            FROM tenders WHERE user_id = ? ORDER BY created_at, id
+        ''', (user_id,))
+        rows = ([(title or '')[:40], (client or '')[:24], category or '-', status or '-', _money(value),
+                 deadline or '-', _score(risk), _percent(profit)]
+                for title, client, category, status, value, deadline, risk, profit in iter_rows(cursor))
+        story.extend(_chunked_tables(
+            rows, ['Title', 'Client', 'Category', 'Status', 'Value', 'Deadline', 'Risk', 'Margin'],
+            widths=[130, 80, 60, 45, 60, 55, 35, 45]
+        ))
+
+    return story
+
+
+def render_report(conn, user_id, report_type, file_path):
+    """Render a report straight to disk; the file appears atomically when complete"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    try:
+        doc = SimpleDocTemplate(tmp_path, pagesize=letter, title='Tender Management Report')
+        with metrics.timed('report_render'):
+            doc.build(build_story(conn, user_id, report_type))
+        os.replace(tmp_path, file_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+# Job handlers (run inside job queue worker processes)
+def generate_report_job(ctx, payload):
+    """Render a report and drop older renders of the same type"""
+    with ctx.db.connection() as conn:
+        render_report(conn, payload['user_id'], payload['report_type'], payload['file_path'])
+        conn.execute("UPDATE reports SET status = 'ready' WHERE id = ?", (payload['report_id'],))
+        stale = conn.execute('''
+            SELECT id, file_path FROM reports
+            WHERE user_id = ? AND report_type = ? AND data_version < ?
+        ''', (payload['user_id'], payload['report_type'], payload['data_version'])).fetchall()
+        for report_id, file_path in stale:
+            if os.path.exists(file_path):
+                os.remove(file_path)
+            conn.execute('DELETE FROM reports WHERE id = ?', (report_id,))
+        conn.commit()
+
+
+def generate_report_failed(conn, payload, error):
+    conn.execute("UPDATE reports SET status = 'failed' WHERE id = ?", (payload['report_id'],))
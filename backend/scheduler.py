@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Periodic tasks for the Tender Management System
+In-process interval scheduler; a lease row per task makes each run happen once across worker processes
+"""
+
+import os
+import time
+import logging
+import threading
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.environ.get('SCHEDULER_ENABLED', '1') == '1'
+POLL_INTERVAL = float(os.environ.get('SCHEDULER_POLL_INTERVAL', 30))
+
+run_seconds = metrics.registry.register(metrics.Histogram(
+    'scheduled_task_seconds', 'Duration of scheduled task runs', ('task', 'outcome'), metrics.SECTION_BUCKETS))
+rows_touched = metrics.registry.register(metrics.Counter(
+    'scheduled_task_rows_total', 'Rows updated by scheduled tasks', ('task',)))
+
+
+class Scheduler:
+    """Runs registered handler(conn) -> rows touched every `interval` seconds
+
+    Each process polls from a daemon thread. A task is claimed with a
+    conditional UPDATE on its scheduled_tasks row (as jobs are claimed), so
+    with several gunicorn workers only one of them runs it. The lease is
+    held for at most `lease` seconds, after which a crashed run is retried.
+    """
+
+    def __init__(self, db, poll_interval=None):
+        self.db = db
+        self.poll_interval = poll_interval or POLL_INTERVAL
+        self.tasks = {}
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def register(self, name, interval, handler, lease=None):
+        self.tasks[name] = (float(interval), handler, float(lease or max(interval, 600)))
+
+    def ensure_schema(self, conn):
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS scheduled_tasks (
+                name TEXT PRIMARY KEY,
+                next_run REAL NOT NULL DEFAULT 0,
+                lease_until REAL NOT NULL DEFAULT 0,
+                last_started REAL,
+                last_duration REAL,
+                last_rows INTEGER,
+                last_error TEXT,
+                runs INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+    def ensure_started(self):
+        """Start the polling thread once per process (safe to call on every request)"""
+        if not ENABLED or not self.tasks or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._loop, name='scheduler', daemon=True).start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.run_due()
+            except Exception as e:
+                logger.error(f"Scheduler error: {e}")
+            time.sleep(self.poll_interval)
+
+    def run_due(self):
+        """Run every task whose time has come and that no other process holds; returns their names"""
+        ran = []
+        for name in self.tasks:
+            if self._claim(name):
+                self._run(name)
+                ran.append(name)
+        return ran
+
+    def _claim(self, name):
+        interval, _, lease = self.tasks[name]
+        now = time.time()
+        with self.db.connection() as conn:
+            conn.execute('INSERT INTO scheduled_tasks (name) VALUES (?) ON CONFLICT (name) DO NOTHING', (name,))
+            cursor = conn.execute('''
+                UPDATE scheduled_tasks SET next_run = ?, lease_until = ?, last_started = ?
+                WHERE name = ? AND next_run <= ? AND lease_until <= ?
+            ''', (now + interval, now + lease, now, name, now, now))
+            conn.commit()
+            return cursor.rowcount == 1
+
+    def _run(self, name):
+        _, handler, _ = self.tasks[name]
+        started = time.perf_counter()
+        rows, error = 0, None
+        with self.db.connection() as conn:
+            try:
+                rows = handler(conn) or 0
+            except Exception as e:
+                conn.rollback()
+                error = str(e)
+                logger.error(f"Scheduled task {name} failed: {e}")
+            duration = time.perf_counter() - started
+            conn.execute('''
+                UPDATE scheduled_tasks SET lease_until = 0, last_duration = ?, last_rows = ?, last_error = ?,
+                       runs = runs + 1
+                WHERE name = ?
+            ''', (duration, rows, error, name))
+            conn.commit()
+        run_seconds.observe(duration, task=name, outcome='error' if error else 'ok')
+        rows_touched.inc(rows, task=name)
+        if not error:
+            logger.info(f"Scheduled task {name} touched {rows} rows in {duration:.2f}s")
+
+    def status(self, conn):
+        """Last run of each task, for /api/metrics"""
+        rows = conn.execute('''
+            SELECT name, next_run, last_started, last_duration, last_rows, last_error, runs FROM scheduled_tasks
+        ''').fetchall()
+        return [dict(zip(('name', 'nextRun', 'lastStarted', 'lastDuration', 'lastRows', 'lastError', 'runs'), row))
+                for row in rows]
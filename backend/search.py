@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Full-text search over tenders and extracted document text
+SQLite FTS5 external-content indexes (tsvector/GIN on PostgreSQL)
+"""
+
+import re
+import html
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_RESULTS = 50
+SNIPPET_START = '<mark>'
+SNIPPET_END = '</mark>'
+# The database marks matches with private-use characters; they become <mark>
+# tags only after the text around them has been HTML-escaped
+MATCH_START = '\ue000'
+MATCH_END = '\ue001'
+
+
+def ensure_schema(conn):
+    """Create the FTS5 indexes and the triggers that keep them in sync"""
+    existing = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('tenders_fts', 'documents_fts')"
+    ).fetchall()}
+
+    # External content: the index stores only tokens, text stays in the base tables
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS tenders_fts USING fts5(
+            title, description, client,
+            content='tenders', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    ''')
+    # Documents are indexed through a view: the text lives in document_texts
+    conn.execute('''
+        CREATE VIEW IF NOT EXISTS document_search AS
+        SELECT d.id, d.original_filename, x.text
+        FROM documents d LEFT JOIN document_texts x ON x.document_id = d.id
+    ''')
+    conn.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+            original_filename, text,
+            content='document_search', content_rowid='id',
+            tokenize='porter unicode61 remove_diacritics 2'
+        )
+    ''')
+
+    names = 'title, description, client'
+    new_values = 'NEW.title, NEW.description, NEW.client'
+    old_values = 'OLD.title, OLD.description, OLD.client'
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_tenders_fts_insert AFTER INSERT ON tenders BEGIN
+            INSERT INTO tenders_fts (rowid, {names}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_tenders_fts_delete AFTER DELETE ON tenders BEGIN
+            INSERT INTO tenders_fts (tenders_fts, rowid, {names}) VALUES ('delete', OLD.id, {old_values});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_tenders_fts_update AFTER UPDATE OF {names} ON tenders BEGIN
+            INSERT INTO tenders_fts (tenders_fts, rowid, {names}) VALUES ('delete', OLD.id, {old_values});
+            INSERT INTO tenders_fts (rowid, {names}) VALUES (NEW.id, {new_values});
+        END
+    ''')
+    _document_triggers(conn)
+
+    for fts in ('tenders_fts', 'documents_fts'):
+        if fts not in existing:
+            # Index rows that predate the FTS table
+            conn.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+
+def _document_triggers(conn):
+    """Keep documents_fts in step with both tables behind document_search
+
+    An external-content delete must repeat the values that were indexed, so
+    each trigger reads the other table's current value. Text rows outliving
+    their document are ignored: the document's delete already removed them.
+    """
+    text_of = '(SELECT text FROM document_texts WHERE document_id = {id})'
+    name_of = '(SELECT original_filename FROM documents WHERE id = {id})'
+
+    def delete(id_sql, name_sql, text_sql):
+        return (f"INSERT INTO documents_fts (documents_fts, rowid, original_filename, text) "
+                f"VALUES ('delete', {id_sql}, {name_sql}, {text_sql});")
+
+    def insert(id_sql, name_sql, text_sql):
+        return f"INSERT INTO documents_fts (rowid, original_filename, text) VALUES ({id_sql}, {name_sql}, {text_sql});"
+
+    triggers = {
+        'trg_documents_fts_insert': ('AFTER INSERT ON documents',
+                                     insert('NEW.id', 'NEW.original_filename', text_of.format(id='NEW.id'))),
+        'trg_documents_fts_delete': ('AFTER DELETE ON documents',
+                                     delete('OLD.id', 'OLD.original_filename', text_of.format(id='OLD.id'))),
+        'trg_documents_fts_update': ('AFTER UPDATE OF original_filename ON documents',
+                                     delete('OLD.id', 'OLD.original_filename', text_of.format(id='OLD.id'))
+                                     + insert('NEW.id', 'NEW.original_filename', text_of.format(id='NEW.id'))),
+    }
+    exists = 'WHEN EXISTS (SELECT 1 FROM documents WHERE id = {row}.document_id)'
+    name = name_of.format(id='NEW.document_id')
+    triggers.update({
+        'trg_document_texts_fts_insert': (f"AFTER INSERT ON document_texts {exists.format(row='NEW')}",
+                                          delete('NEW.document_id', name, 'NULL')
+                                          + insert('NEW.document_id', name, 'NEW.text')),
+        'trg_document_texts_fts_update': (f"AFTER UPDATE OF text ON document_texts {exists.format(row='NEW')}",
+                                          delete('NEW.document_id', name, 'OLD.text')
+                                          + insert('NEW.document_id', name, 'NEW.text')),
+        'trg_document_texts_fts_delete': (f"AFTER DELETE ON document_texts {exists.format(row='OLD')}",
+                                          delete('OLD.document_id', name_of.format(id='OLD.document_id'), 'OLD.text')
+                                          + insert('OLD.document_id', name_of.format(id='OLD.document_id'), 'NULL')),
+    })
+    for trigger, (event, body) in triggers.items():
+        conn.execute(f'CREATE TRIGGER IF NOT EXISTS {trigger} {event} BEGIN {body} END')
+
+
+def drop_document_index(conn):
+    """Drop documents_fts and its triggers; ensure_schema recreates and rebuilds them"""
+    for trigger in ('trg_documents_fts_insert', 'trg_documents_fts_delete', 'trg_documents_fts_update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS documents_fts')
+
+
+def build_match_query(text):
+    """Turn free text into a safe FTS5 query: all terms required, last one as a prefix"""
+    terms = re.findall(r'\w+', text)
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(conn, user_id, text, limit=20, offset=0):
+    """Ranked tender and document hits for one user; returns (results, has_more)"""
+    limit = min(max(limit, 1), MAX_RESULTS)
+    if conn.backend.name == 'postgresql':
+        rows = _search_postgres(conn, user_id, text, limit + 1, offset)
+    else:
+        match = build_match_query(text)
+        if match is None:
+            return [], False
+        rows = _search_sqlite(conn, user_id, match, limit + 1, offset)
+
+    results = [{
+        'type': row[0],
+        'id': row[1],
+        'tenderId': row[2],
+        'title': row[3],
+        'snippet': render_snippet(row[4]),
+        'score': round(abs(row[5]), 6)
+    } for row in rows[:limit]]
+    return results, len(rows) > limit
+
+
+def render_snippet(snippet):
+    """Snippet as HTML: text escaped, matched terms wrapped in <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_END, SNIPPET_END)
+
+
+def _search_sqlite(conn, user_id, match, limit, offset):
+    # bm25() is lower-is-better; titles weigh more than descriptions and body text
+    return conn.execute(f'''
+        SELECT 'tender', t.id, t.id, t.title,
+               snippet(tenders_fts, -1, '{MATCH_START}', '{MATCH_END}', '…', 16),
+               bm25(tenders_fts, 10.0, 2.0, 5.0) AS rank
+        FROM tenders_fts
+        JOIN tenders t ON t.id = tenders_fts.rowid
+        WHERE tenders_fts MATCH ? AND t.user_id = ?
+        UNION ALL
+        SELECT 'document', d.id, d.tender_id, d.original_filename,
+               snippet(documents_fts, 1, '{MATCH_START}', '{MATCH_END}', '…', 16),
+               bm25(documents_fts, 5.0, 1.0) AS rank
+        FROM documents_fts
+        JOIN documents d ON d.id = documents_fts.rowid
+        JOIN tenders t ON t.id = d.tender_id
+        WHERE documents_fts MATCH ? AND t.user_id = ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    ''', (match, user_id, match, user_id, limit, offset)).fetchall()
+
+
+def _search_postgres(conn, user_id, text, limit, offset):
+    # search_vector columns and GIN indexes come from supabase/migrations
+    options = f'StartSel={MATCH_START}, StopSel={MATCH_END}, MaxWords=16, MinWords=8'
+    return conn.execute(f'''
+        SELECT 'tender', t.id, t.id, t.title,
+               ts_headline('english', concat_ws(' ', t.title, t.description, t.client), q, '{options}'),
+               ts_rank(t.search_vector, q) AS rank
+        FROM tenders t, websearch_to_tsquery('english', ?) q
+        WHERE t.user_id = ? AND t.search_vector @@ q
+        UNION ALL
+        SELECT 'document', d.id, d.tender_id, d.original_filename,
+               ts_headline('english', coalesce(x.text, ''), q, '{options}'),
+               ts_rank(d.search_vector, q) AS rank
+        FROM documents d
+        JOIN tenders t ON t.id = d.tender_id
+        LEFT JOIN document_texts x ON x.document_id = d.id
+        CROSS JOIN websearch_to_tsquery('english', ?) q
+        WHERE t.user_id = ? AND d.search_vector @@ q
+        ORDER BY rank DESC
+        LIMIT ? OFFSET ?
+    ''', (text, user_id, text, user_id, limit, offset)).fetchall()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup helpers for the Tender Management System
+Deferred imports and a cold-start/memory report per worker process
+"""
+
+import os
+import sys
+import time
+import logging
+import importlib.util
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+def lazy_import(name):
+    """Return a module that is only executed on first attribute access"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def process_uptime():
+    """Seconds since this process started (fork time for gunicorn workers), or None"""
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            system_uptime = float(f.read().split()[0])
+        return system_uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memory_usage():
+    """Resident memory split into shared (copy-on-write) and private MB"""
+    usage = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('Rss', 'Pss', 'Shared_Clean', 'Shared_Dirty', 'Private_Clean', 'Private_Dirty'):
+                    usage[key] = int(value.split()[0]) / 1024
+        return {
+            'rssMb': round(usage['Rss'], 1),
+            'pssMb': round(usage['Pss'], 1),
+            'sharedMb': round(usage['Shared_Clean'] + usage['Shared_Dirty'], 1),
+            'privateMb': round(usage['Private_Clean'] + usage['Private_Dirty'], 1)
+        }
+    except (OSError, KeyError, ValueError):
+        import resource
+        return {'maxRssMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)}
+
+
+class StartupReport:
+    """Timings of expensive initialisation steps in this process"""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.timings = {}
+        self.events = {}
+
+    def _check_fork(self):
+        if self.pid != os.getpid():
+            # Forked worker: keep what the master measured, time our own events afresh
+            self.pid = os.getpid()
+            self.timings = {f'master.{name}': value for name, value in self.timings.items()
+                            if not name.startswith('master.')}
+            self.events = {}
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._check_fork()
+            self.timings[name] = round(time.perf_counter() - started, 3)
+
+    def mark(self, name):
+        """Record a one-off event as seconds since process start"""
+        self._check_fork()
+        if name not in self.events:
+            self.events[name] = round(process_uptime() or 0.0, 3)
+
+    def snapshot(self):
+        self._check_fork()
+        return {
+            'pid': self.pid,
+            'uptime': round(process_uptime() or 0.0, 3),
+            'events': dict(self.events),
+            'timings': dict(self.timings),
+            'memory': memory_usage()
+        }
+
+
+report = StartupReport()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Content-addressed file storage for the Tender Management System
+Uploads are stored once per SHA-256 digest, however many documents use them
+"""
+
+import os
+import uuid
+import hashlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def ensure_schema(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS blobs (
+            sha256 TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+class BlobStore:
+    """Files named by their SHA-256 under root/blobs/ab/cd/<digest>"""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 'blobs')
+
+    def key(self, sha256):
+        """Path relative to the upload folder, as stored in documents.filename"""
+        return os.path.join('blobs', sha256[:2], sha256[2:4], sha256)
+
+    def path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def save(self, stream):
+        """Write a stream to the store, hashing as it is written; returns (sha256, size)"""
+        tmp_dir = os.path.join(self.root, 'tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        tmp_path = os.path.join(tmp_dir, uuid.uuid4().hex)
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            sha256 = digest.hexdigest()
+            self.adopt(tmp_path, sha256)
+            return sha256, size
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def adopt(self, file_path, sha256):
+        """Move an already hashed file (on the same filesystem) into the store"""
+        final_path = self.path(sha256)
+        if os.path.exists(final_path):
+            # Same content already stored; keep the existing copy
+            os.remove(file_path)
+        else:
+            os.makedirs(os.path.dirname(final_path), exist_ok=True)
+            os.replace(file_path, final_path)
+
+    def register(self, conn, sha256, size):
+        """Record a stored blob in the caller's transaction"""
+        conn.execute(
+            'INSERT INTO blobs (sha256, size) VALUES (?, ?) ON CONFLICT (sha256) DO NOTHING',
+            (sha256, size)
+        )
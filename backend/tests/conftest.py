@@ -0,0 +1,90 @@
+"""
+Test fixtures for the Tender Management System backend
+
+    cd backend && python -m pytest
+
+The app is imported once per session against a throwaway SQLite database
+in a temporary directory; each test registers its own user, so tests don't
+see each other's data.
+"""
+
+import os
+import sys
+import uuid
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORKDIR = tempfile.mkdtemp(prefix='tender-tests-')
+
+# Before the app is imported: it reads its configuration at import time
+os.environ.update({
+    'DATABASE_URL': f'sqlite:///{WORKDIR}/test.db',
+    'RATELIMIT_ENABLED': '0',
+    'RATELIMIT_STORAGE_URI': f'sqlite:///{WORKDIR}/ratelimits.db',
+    'SCHEDULER_ENABLED': '0',
+    'JOB_EXECUTOR': 'thread',
+    'JOB_POLL_INTERVAL': '0.1',
+    'MODEL_PATH': os.path.join(WORKDIR, 'models'),
+    'REPORT_FOLDER': os.path.join(WORKDIR, 'reports'),
+})
+os.environ.pop('METRICS_DIR', None)
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope='session')
+def backend():
+    """The imported app module, with its schema created"""
+    os.chdir(WORKDIR)  # uploads/ is relative to the working directory
+    import app as backend_app
+    backend_app.init_database()
+    return backend_app
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+@pytest.fixture
+def register(client):
+    """register() -> (user id, auth headers) for a new user"""
+    def register_user(name='Test User'):
+        response = client.post('/api/auth/register', json={
+            'name': name, 'email': f'{uuid.uuid4().hex}@example.com', 'password': 'secret123'
+        })
+        assert response.status_code == 201, response.get_json()
+        data = response.get_json()
+        return data['user']['id'], {'Authorization': f"Bearer {data['token']}"}
+    return register_user
+
+
+@pytest.fixture
+def auth(register):
+    """Auth headers of a fresh user"""
+    return register()[1]
+
+
+@pytest.fixture
+def create_tender(client):
+    """create_tender(headers, **fields) -> new tender id"""
+    def create(headers, **fields):
+        body = {'title': 'Bridge repair', 'client': 'City Council', 'value': 250000,
+                'deadline': '2030-06-30', 'category': 'Construction', **fields}
+        response = client.post('/api/tenders', headers=headers, json=body)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['tender_id']
+    return create
+
+
+@pytest.fixture
+def legacy_value(backend, create_tender):
+    """legacy_value(headers) -> id of a tender whose value was stored as text before validation"""
+    def make(headers):
+        tender_id = create_tender(headers, value=1000)
+        with backend.db.connection() as conn:
+            conn.execute("UPDATE tenders SET value = '1,000' WHERE id = ?", (tender_id,))
+            conn.commit()
+        return tender_id
+    return make
@@ -0,0 +1,11 @@
+"""Analytics rollups over rows with malformed stored values"""
+
+
+def test_rollups_refresh_despite_text_value(client, auth, create_tender, legacy_value):
+    legacy_value(auth)
+    # Each write refreshes the month's rollups, which now include the text value
+    create_tender(auth, value=500)
+    create_tender(auth, value=700)
+    response = client.get('/api/analytics', headers=auth)
+    assert response.status_code == 200
+    assert response.get_json()['summary']['totalBids'] == 3
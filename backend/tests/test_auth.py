@@ -0,0 +1,46 @@
+"""Password hashing pool"""
+
+import time
+import threading
+
+import pytest
+
+from auth import PasswordHasher, HasherBusy
+
+
+def test_hash_and_check():
+    hasher = PasswordHasher(workers=1)
+    password_hash = hasher.hash('secret')
+    assert hasher.check('secret', password_hash)
+    assert not hasher.check('wrong', password_hash)
+
+
+def test_timeout_is_busy_and_keeps_its_slot():
+    hasher = PasswordHasher(workers=1, max_pending=2, timeout=0.1)
+    release = threading.Event()
+
+    with pytest.raises(HasherBusy):
+        hasher._run(release.wait, 5)
+    # The timed-out hash is still running and still counts against max_pending
+    with pytest.raises(HasherBusy):
+        hasher._run(release.wait, 5)
+    with pytest.raises(HasherBusy):
+        hasher._run(lambda: None)
+
+    release.set()
+    deadline = time.monotonic() + 5
+    while hasher._pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hasher._run(lambda: 'done') == 'done'
+
+
+def test_login_with_slow_hasher_is_503(backend, client, monkeypatch):
+    client.post('/api/auth/register', json={'name': 'Slow', 'email': 'slow@example.com', 'password': 'secret123'})
+    release = threading.Event()
+    monkeypatch.setattr(backend.password_hasher, 'timeout', 0.1)
+    monkeypatch.setattr('auth.bcrypt.checkpw', lambda *args: release.wait(5))
+    try:
+        response = client.post('/api/auth/login', json={'email': 'slow@example.com', 'password': 'secret123'})
+    finally:
+        release.set()
+    assert response.status_code == 503
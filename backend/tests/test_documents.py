@@ -0,0 +1,47 @@
+"""Page-parallel PDF text extraction"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import documents
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    import fitz
+
+    doc = fitz.open()
+    for number in range(40):
+        doc.new_page().insert_text((72, 72), f'Page {number}')
+    path = tmp_path / 'spec.pdf'
+    doc.save(str(path))
+    return str(path)
+
+
+def test_parallel_extraction_keeps_a_bounded_window(pdf, monkeypatch):
+    submitted = []
+
+    class Executor(ThreadPoolExecutor):
+        def __init__(self, max_workers, mp_context=None):
+            super().__init__(max_workers)
+
+        def submit(self, fn, *args):
+            submitted.append(args[1])
+            return super().submit(fn, *args)
+
+    monkeypatch.setattr(documents, 'ProcessPoolExecutor', Executor)
+    monkeypatch.setattr(documents, 'PDF_PARALLEL_PAGES', 10)
+    monkeypatch.setattr(documents, 'PDF_PAGE_BATCH', 2)
+    monkeypatch.setattr(documents, 'PDF_WORKERS', 2)
+    window = documents.PDF_BATCHES_IN_FLIGHT * 2
+
+    pages = documents.DocumentProcessor().iter_pdf_pages(pdf, ocr=False)
+    seen = []
+    for number, text, method in pages:
+        # Batches handed out so far: the one being read, plus at most a window ahead of it
+        assert len(submitted) <= number // 2 + 1 + window
+        seen.append(number)
+        assert text.strip() == f'Page {number}'
+    assert seen == list(range(40))
+    assert len(submitted) == 20
@@ -0,0 +1,59 @@
+"""ETags and conditional GETs of the versioned read endpoints"""
+
+import pytest
+
+VERSIONED = ['/api/tenders', '/api/dashboard/stats', '/api/auth/me']
+
+
+@pytest.mark.parametrize('path', VERSIONED)
+def test_matching_etag_returns_304(client, auth, create_tender, path):
+    create_tender(auth)
+    first = client.get(path, headers=auth)
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+
+    again = client.get(path, headers={**auth, 'If-None-Match': etag})
+    assert again.status_code == 304
+    assert again.data == b''
+    assert again.headers['ETag'] == etag
+    assert 'private' in again.headers['Cache-Control']
+
+
+def test_write_changes_etag(client, auth, create_tender):
+    tender_id = create_tender(auth)
+    etag = client.get('/api/tenders', headers=auth).headers['ETag']
+
+    client.put(f'/api/tenders/{tender_id}', headers=auth, json={'status': 'won'})
+    response = client.get('/api/tenders', headers={**auth, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+    assert response.get_json()['tenders'][0]['status'] == 'won'
+
+
+def test_profile_edit_changes_etag(client, auth):
+    etag = client.get('/api/auth/me', headers=auth).headers['ETag']
+    client.put('/api/auth/me', headers=auth, json={'company': 'Acme'})
+    response = client.get('/api/auth/me', headers={**auth, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['user']['company'] == 'Acme'
+
+
+def test_if_modified_since_alone_never_returns_304(client, auth, create_tender):
+    tender_id = create_tender(auth)
+    first = client.get('/api/tenders', headers=auth)
+    last_modified = first.headers['Last-Modified']
+
+    # A second write within the same second keeps Last-Modified unchanged
+    client.put(f'/api/tenders/{tender_id}', headers=auth, json={'status': 'lost'})
+    response = client.get('/api/tenders', headers={**auth, 'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+    assert response.get_json()['tenders'][0]['status'] == 'lost'
+
+
+def test_etag_is_per_user(client, register, create_tender):
+    _, first_user = register()
+    _, second_user = register()
+    create_tender(first_user)
+    etag = client.get('/api/tenders', headers=first_user).headers['ETag']
+    response = client.get('/api/tenders', headers={**second_user, 'If-None-Match': etag})
+    assert response.status_code == 200
@@ -0,0 +1,98 @@
+"""Bulk CSV/JSONL import"""
+
+import json
+
+
+def post_csv(client, headers, text):
+    return client.post('/api/tenders/import?format=csv', headers=headers, data=text.encode('utf-8'),
+                       content_type='text/csv')
+
+
+def test_invalid_rows_are_reported_and_valid_rows_imported(client, auth):
+    response = post_csv(client, auth, '\n'.join([
+        'title,client,value,deadline,status',
+        'Good one,Council,1000,2030-01-01,active',
+        ',Council,1000,2030-01-01,active',
+        'Bad value,Council,"1,000",2030-01-01,active',
+        'Bad deadline,Council,1000,01/01/2030,active',
+        'Bad status,Council,1000,2030-01-01,archived',
+        'Good two,Council,2000,2030-02-01,won',
+    ]) + '\n')
+
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['imported'] == 2
+    assert summary['failed'] == 4
+    assert [error['row'] for error in summary['errors']] == [2, 3, 4, 5]
+    assert summary['errors'][1]['message'] == 'value must be a number'
+    assert summary['errors'][2]['message'] == 'deadline must be YYYY-MM-DD'
+    assert summary['errorsTruncated'] is False
+
+
+def test_jsonl_reports_unparseable_lines(client, auth):
+    lines = [
+        json.dumps({'title': 'A', 'client': 'C', 'value': 5, 'deadline': '2030-01-01'}),
+        '{not json',
+        '[1, 2]',
+    ]
+    response = client.post('/api/tenders/import?format=jsonl', headers=auth,
+                           data='\n'.join(lines).encode('utf-8'), content_type='application/x-ndjson')
+    summary = response.get_json()
+    assert summary['imported'] == 1
+    assert [error['row'] for error in summary['errors']] == [2, 3]
+
+
+def test_missing_submission_date_stays_empty(client, auth):
+    post_csv(client, auth, 'title,client,value,deadline,submissionDate\n'
+                           'Dated,C,10,2030-01-01,2020-05-01\n'
+                           'Undated,C,10,2030-01-01,\n')
+    tenders = client.get('/api/tenders?fields=title,submissionDate', headers=auth).get_json()['tenders']
+    dates = {tender['title']: tender['submissionDate'] for tender in tenders}
+    assert dates == {'Dated': '2020-05-01', 'Undated': None}
+
+
+def test_unknown_format_is_rejected(client, auth):
+    response = client.post('/api/tenders/import', headers=auth, data=b'x', content_type='application/octet-stream')
+    assert response.status_code == 400
+
+
+def test_import_may_exceed_the_global_body_limit(backend, client, auth):
+    limit = backend.app.config['MAX_CONTENT_LENGTH']
+    row = 'Tender,Client,1000,2030-01-01,' + 'x' * 1000 + '\n'
+    text = 'title,client,value,deadline,description\n' + row * (limit // len(row) + 10)
+    assert len(text) > limit
+
+    response = post_csv(client, auth, text)
+    assert response.status_code == 200
+    assert response.get_json()['failed'] == 0
+
+
+def test_oversized_import_is_rejected(backend, client, auth, monkeypatch):
+    monkeypatch.setitem(backend.BODY_LIMITS, 'import_tenders', 100)
+    response = post_csv(client, auth, 'title,client,value,deadline\n' + 'T,C,1,2030-01-01\n' * 20)
+    assert response.status_code == 413
+
+
+def test_non_finite_values_are_row_errors(client, auth):
+    response = post_csv(client, auth, 'title,client,value,deadline,status\n'
+                                      'Infinite,C,inf,2030-01-01,won\n'
+                                      'Unknown,C,nan,2030-01-01,won\n'
+                                      'Finite,C,10,2030-01-01,won\n')
+    summary = response.get_json()
+    assert summary['imported'] == 1
+    assert [error['row'] for error in summary['errors']] == [1, 2]
+
+    stats = client.get('/api/dashboard/stats', headers=auth)
+    assert b'Infinity' not in stats.data
+    assert stats.get_json()['stats']['totalValue'] == 10
+
+
+def test_nested_jsonl_fields_are_row_errors(client, auth):
+    row = {'title': 'A', 'client': 'C', 'value': 5, 'deadline': '2030-01-01'}
+    lines = [json.dumps({**row, 'description': {'a': 1}}), json.dumps({**row, 'client': ['C']}), json.dumps(row)]
+    response = client.post('/api/tenders/import?format=jsonl', headers=auth,
+                           data='\n'.join(lines).encode('utf-8'), content_type='application/x-ndjson')
+    assert response.status_code == 200
+    summary = response.get_json()
+    assert summary['imported'] == 1
+    assert [error['row'] for error in summary['errors']] == [1, 2]
@@ -0,0 +1,47 @@
+"""Prediction input validation, and re-scoring over malformed stored values and failing rows"""
+
+import pytest
+
+
+def test_rescore_survives_text_value(client, auth, create_tender, legacy_value):
+    legacy_value(auth)
+    create_tender(auth)
+    response = client.post('/api/ml/rescore', headers=auth)
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 2
+
+
+def test_rescore_skips_only_the_failing_tender(backend, client, auth, create_tender, monkeypatch):
+    broken = create_tender(auth)
+    create_tender(auth)
+    score = backend.score_tender_rows
+    def failing(conn, rows, today, cached=True):
+        if any(row[0] == broken for row in rows):
+            raise RuntimeError('model failure')
+        return score(conn, rows, today, cached)
+    monkeypatch.setattr(backend, 'score_tender_rows', failing)
+
+    response = client.post('/api/ml/rescore', headers=auth)
+    assert response.status_code == 200
+    assert response.get_json()['updated'] == 1
+
+
+@pytest.mark.parametrize('fields', [
+    {'tenderValue': 'inf'},
+    {'tenderValue': 'nan'},
+    {'tenderValue': -1},
+    {'daysToDeadline': '-inf'},
+    {'clientHistory': 'nan'},
+    {'tenderValue': True},
+])
+def test_predict_rejects_non_finite_inputs(client, auth, fields):
+    body = {'tenderValue': 100000, 'daysToDeadline': 30, 'category': 'Construction', **fields}
+    assert client.post('/api/ml/predict', headers=auth, json=body).status_code == 400
+    assert client.post('/api/ml/predict', headers=auth, json={'tenders': [body]}).status_code == 400
+
+
+def test_predict_scores_finite_inputs(client, auth):
+    body = {'tenderValue': 100000, 'daysToDeadline': 30, 'category': 'Construction'}
+    response = client.post('/api/ml/predict', headers=auth, json=body)
+    assert response.status_code == 200
+    assert 0 <= response.get_json()['riskScore'] <= 1
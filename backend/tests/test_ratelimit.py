@@ -0,0 +1,37 @@
+"""Rate limit counters shared across app instances through the SQLite limiter storage"""
+
+import os
+import sys
+import json
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Registers `count` users from one address in a fresh app instance and prints the status codes
+REGISTER = '''
+import sys, json, uuid
+sys.path.insert(0, sys.argv[1])
+import app
+client = app.app.test_client()
+statuses = []
+for _ in range(int(sys.argv[2])):
+    response = client.post('/api/auth/register', environ_base={'REMOTE_ADDR': '203.0.113.7'}, json={
+        'name': 'Limited', 'email': f'{uuid.uuid4().hex}@example.com', 'password': 'secret123'
+    })
+    statuses.append(response.status_code)
+print(json.dumps(statuses))
+'''
+
+
+def register_from_new_instance(count):
+    env = {**os.environ, 'RATELIMIT_ENABLED': '1'}
+    result = subprocess.run([sys.executable, '-c', REGISTER, BACKEND_DIR, str(count)],
+                            env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_instances_share_one_limit(backend):
+    # Registration allows 5 per minute per address; the storage file is shared via RATELIMIT_STORAGE_URI
+    assert register_from_new_instance(3) == [201, 201, 201]
+    assert register_from_new_instance(3) == [201, 201, 429]
@@ -0,0 +1,21 @@
+"""PDF report rendering over rows with malformed stored values"""
+
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize('report_type', ['summary', 'detailed'])
+def test_report_renders_despite_text_values(backend, register, create_tender, tmp_path, report_type):
+    user_id, headers = register()
+    tender_id = create_tender(headers)
+    create_tender(headers)
+    with backend.db.connection() as conn:
+        # Written before values were validated
+        conn.execute("UPDATE tenders SET value = 'TBD', risk_score = 'high', profit_prediction = 'n/a' WHERE id = ?",
+                     (tender_id,))
+        conn.commit()
+
+        file_path = str(tmp_path / f'{report_type}.pdf')
+        backend.reports.render_report(conn, user_id, report_type, file_path)
+    assert os.path.getsize(file_path) > 0
@@ -0,0 +1,127 @@
+"""Scheduled deadline refresh and expiry, and the scheduler's run-once claim"""
+
+from datetime import date, timedelta
+
+import pytest
+
+
+def days_from_today(days):
+    return (date.today() + timedelta(days=days)).isoformat()
+
+
+@pytest.fixture
+def conn(backend):
+    with backend.db.connection() as connection:
+        yield connection
+
+
+def tender_row(conn, tender_id):
+    return conn.execute('''
+        SELECT status, deadline_bucket, risk_score, profit_prediction FROM tenders WHERE id = ?
+    ''', (tender_id,)).fetchone()
+
+
+def test_refresh_scores_open_tenders_and_expires_past_due(backend, conn, auth, create_tender):
+    upcoming = create_tender(auth, deadline=days_from_today(10))
+    past_due = create_tender(auth, deadline=days_from_today(5))
+    submitted = create_tender(auth, deadline=days_from_today(5))
+    conn.execute("UPDATE tenders SET deadline = ? WHERE id IN (?, ?)", (days_from_today(-2), past_due, submitted))
+    conn.execute("UPDATE tenders SET status = 'pending' WHERE id = ?", (submitted,))
+    conn.execute('UPDATE tenders SET deadline_bucket = NULL WHERE id = ?', (upcoming,))
+    conn.commit()
+
+    backend.refresh_deadline_scores(conn)
+
+    assert tender_row(conn, upcoming)[:2] == ('active', int(backend.training.deadline_bucket(10)))
+    assert tender_row(conn, past_due)[0] == 'expired'
+    # Pending tenders were already submitted; their deadline passing is expected
+    assert tender_row(conn, submitted)[0] == 'pending'
+
+
+def test_refresh_skips_tenders_already_in_their_bucket(backend, conn, auth, create_tender):
+    create_tender(auth, deadline=days_from_today(40))
+    backend.refresh_deadline_scores(conn)
+    assert backend.refresh_deadline_scores(conn) == 0
+
+
+def test_malformed_value_does_not_block_other_users(backend, conn, register, create_tender):
+    _, first_user = register()
+    _, second_user = register()
+    bad = create_tender(first_user, deadline=days_from_today(20))
+    good = create_tender(second_user, deadline=days_from_today(20))
+    # Written before values were validated
+    conn.execute("UPDATE tenders SET value = '1,000' WHERE id = ?", (bad,))
+    conn.execute('UPDATE tenders SET deadline_bucket = NULL WHERE id IN (?, ?)', (bad, good))
+    conn.commit()
+
+    backend.refresh_deadline_scores(conn)
+
+    assert tender_row(conn, good)[1] is not None
+    assert tender_row(conn, bad)[1] is not None
+
+
+def test_unscorable_tender_is_left_for_next_run(backend, conn, auth, create_tender, monkeypatch):
+    broken = create_tender(auth, deadline=days_from_today(20))
+    fine = create_tender(auth, deadline=days_from_today(20))
+    conn.execute('UPDATE tenders SET deadline_bucket = NULL WHERE id IN (?, ?)', (broken, fine))
+    conn.commit()
+
+    score = backend.score_tender_rows
+    def failing(conn, rows, today, cached=True):
+        if any(row[0] == broken for row in rows):
+            raise RuntimeError('model failure')
+        return score(conn, rows, today, cached)
+    monkeypatch.setattr(backend, 'score_tender_rows', failing)
+
+    backend.refresh_deadline_scores(conn)
+    assert tender_row(conn, fine)[1] is not None
+    assert tender_row(conn, broken)[1] is None
+
+
+def test_refresh_updates_analytics_rollups(backend, conn, register, create_tender):
+    user_id, headers = register()
+    tender_id = create_tender(headers, deadline=days_from_today(20))
+    conn.execute('UPDATE tenders SET deadline_bucket = NULL, profit_prediction = 5.0 WHERE id = ?', (tender_id,))
+    conn.commit()
+    backend.analytics.refresh_user(conn, user_id)
+
+    def profit_sum():
+        return conn.execute('''
+            SELECT SUM(metric_value) FROM analytics WHERE user_id = ? AND metric_name = 'month:profit_sum'
+        ''', (user_id,)).fetchone()[0]
+
+    assert profit_sum() == pytest.approx(5.0)
+    backend.refresh_deadline_scores(conn)
+    assert profit_sum() == pytest.approx(tender_row(conn, tender_id)[3])
+
+
+def test_task_runs_once_per_interval(backend):
+    scheduler = backend.Scheduler(backend.db)
+    runs = []
+    scheduler.register('test_task_runs_once', 3600, lambda conn: runs.append(1) or 1)
+
+    with backend.db.connection() as conn:
+        scheduler.ensure_schema(conn)
+        conn.commit()
+    assert scheduler.run_due() == ['test_task_runs_once']
+    # A second worker polling right after finds the task already claimed
+    assert backend.Scheduler(backend.db).run_due() == []
+    assert scheduler.run_due() == []
+    assert runs == [1]
+
+    with backend.db.connection() as conn:
+        status = {task['name']: task for task in scheduler.status(conn)}
+    assert status['test_task_runs_once']['runs'] == 1
+    assert status['test_task_runs_once']['lastRows'] == 1
+
+
+def test_failed_task_records_error(backend):
+    scheduler = backend.Scheduler(backend.db)
+    def broken(conn):
+        raise RuntimeError('boom')
+    scheduler.register('test_failed_task', 3600, broken)
+
+    assert scheduler.run_due() == ['test_failed_task']
+    with backend.db.connection() as conn:
+        status = {task['name']: task for task in scheduler.status(conn)}
+    assert status['test_failed_task']['lastError'] == 'boom'
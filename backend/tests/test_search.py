@@ -0,0 +1,10 @@
+"""Full-text search results"""
+
+
+def test_snippet_escapes_stored_html(client, auth, create_tender):
+    create_tender(auth, title='<img src=x onerror=alert(1)> Concrete & steel works')
+    response = client.get('/api/search?q=concrete', headers=auth)
+    assert response.status_code == 200
+    snippet = response.get_json()['results'][0]['snippet']
+
+    assert snippet == '&lt;img src=x onerror=alert(1)&gt; <mark>Concrete</mark> &amp; steel works'
@@ -0,0 +1,84 @@
+"""Tender writes and keyset-paginated listing"""
+
+import base64
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize('fields', [
+    {'value': '1,000'},
+    {'value': 'abc'},
+    {'value': -5},
+    {'value': True},
+    {'deadline': 'garbage'},
+    {'deadline': '30/06/2030'},
+    {'deadline': 20300630},
+])
+def test_create_rejects_malformed_value_and_deadline(client, auth, fields):
+    body = {'title': 'T', 'client': 'C', 'value': 1000, 'deadline': '2030-06-30', **fields}
+    response = client.post('/api/tenders', headers=auth, json=body)
+    assert response.status_code == 400
+
+
+def test_create_stores_value_as_number(client, auth, create_tender):
+    tender_id = create_tender(auth, value='2500.5', deadline='2030-6-5')
+    tender = client.get(f'/api/tenders/{tender_id}', headers=auth).get_json()['tender']
+    assert tender['value'] == 2500.5
+    assert tender['deadline'] == '2030-06-05'
+
+
+@pytest.mark.parametrize('fields', [{'value': '1,000'}, {'deadline': 'garbage'}, {'deadline': None}])
+def test_update_rejects_malformed_value_and_deadline(client, auth, create_tender, fields):
+    tender_id = create_tender(auth)
+    response = client.put(f'/api/tenders/{tender_id}', headers=auth, json=fields)
+    assert response.status_code == 400
+    tender = client.get(f'/api/tenders/{tender_id}', headers=auth).get_json()['tender']
+    assert tender['value'] == 250000
+    assert tender['deadline'] == '2030-06-30'
+
+
+def test_keyset_pages_cover_every_tender_once(client, auth, create_tender):
+    created = [create_tender(auth, title=f'Tender {i}') for i in range(7)]
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/tenders?limit=3&fields=title' + (f'&cursor={cursor}' if cursor else '')
+        page = client.get(url, headers=auth).get_json()
+        assert len(page['tenders']) <= 3
+        seen += [tender['id'] for tender in page['tenders']]
+        if not page['hasMore']:
+            assert page['nextCursor'] is None
+            break
+        cursor = page['nextCursor']
+
+    # Newest first, nothing repeated or skipped
+    assert seen == sorted(created, reverse=True)
+
+
+def test_keyset_pages_respect_filters(client, auth, create_tender):
+    for i in range(5):
+        create_tender(auth, value=1000 * (i + 1))
+    first = client.get('/api/tenders?limit=2&min_value=2500', headers=auth).get_json()
+    second = client.get(f"/api/tenders?limit=2&min_value=2500&cursor={first['nextCursor']}", headers=auth).get_json()
+    values = [t['value'] for t in first['tenders'] + second['tenders']]
+    assert values == [5000, 4000, 3000]
+    assert second['hasMore'] is False
+
+
+def test_invalid_cursor_is_rejected(client, auth):
+    bad = base64.urlsafe_b64encode(json.dumps(['2030-01-01', [1]]).encode()).decode()
+    assert client.get(f'/api/tenders?cursor={bad}', headers=auth).status_code == 400
+    assert client.get('/api/tenders?cursor=not-base64!', headers=auth).status_code == 400
+
+
+def test_unknown_projection_field_is_rejected(client, auth):
+    assert client.get('/api/tenders?fields=title,secret', headers=auth).status_code == 400
+
+
+def test_other_users_tender_is_not_found(client, register, create_tender):
+    _, owner = register()
+    _, other = register()
+    tender_id = create_tender(owner)
+    assert client.get(f'/api/tenders/{tender_id}', headers=other).status_code == 404
+    assert client.put(f'/api/tenders/{tender_id}', headers=other, json={'status': 'won'}).status_code == 404
@@ -0,0 +1,111 @@
+"""Resumable chunked uploads"""
+
+import os
+import hashlib
+
+import pytest
+
+CHUNK = 64 * 1024
+
+
+@pytest.fixture
+def payload():
+    """A small PDF padded with random bytes, so it spans several chunks"""
+    import fitz
+
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), 'Bill of quantities')
+    return doc.tobytes() + os.urandom(3 * CHUNK + 123)
+
+
+@pytest.fixture
+def open_upload(client, auth, create_tender):
+    """open_upload(payload, **fields) -> upload id on a new tender of the `auth` user"""
+    def start(payload, **fields):
+        tender_id = create_tender(auth)
+        body = {'filename': 'bill.pdf', 'size': len(payload), **fields}
+        response = client.post(f'/api/tenders/{tender_id}/uploads', headers=auth, json=body)
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()['upload']['id']
+    return start
+
+
+def put_chunk(client, headers, upload_id, offset, data, checksum=True):
+    chunk_headers = {**headers, 'Upload-Offset': str(offset), 'Content-Type': 'application/octet-stream'}
+    if checksum:
+        chunk_headers['X-Chunk-SHA256'] = hashlib.sha256(data).hexdigest()
+    return client.put(f'/api/uploads/{upload_id}', headers=chunk_headers, data=data)
+
+
+def test_upload_resumes_from_received_offset(client, auth, payload, open_upload):
+    upload_id = open_upload(payload, sha256=hashlib.sha256(payload).hexdigest())
+
+    assert put_chunk(client, auth, upload_id, 0, payload[:CHUNK]).get_json()['upload']['received'] == CHUNK
+    # The response to this chunk is "lost"; the client asks where to continue
+    put_chunk(client, auth, upload_id, CHUNK, payload[CHUNK:2 * CHUNK])
+    received = client.get(f'/api/uploads/{upload_id}', headers=auth).get_json()['upload']['received']
+    assert received == 2 * CHUNK
+
+    while received < len(payload):
+        response = put_chunk(client, auth, upload_id, received, payload[received:received + CHUNK])
+        assert response.status_code == 200
+        received = response.get_json()['upload']['received']
+
+    response = client.post(f'/api/uploads/{upload_id}/complete', headers=auth)
+    assert response.status_code in (201, 202)
+    document_id = response.get_json()['document']['id']
+    assert response.get_json()['upload']['status'] == 'complete'
+
+    download = client.get(f'/api/documents/{document_id}/download', headers=auth)
+    assert download.status_code == 200
+    assert download.data == payload
+
+
+def test_chunk_at_wrong_offset_reports_received(client, auth, payload, open_upload):
+    upload_id = open_upload(payload)
+    put_chunk(client, auth, upload_id, 0, payload[:CHUNK])
+
+    for offset in (0, 2 * CHUNK):
+        response = put_chunk(client, auth, upload_id, offset, payload[offset:offset + CHUNK])
+        assert response.status_code == 409
+        assert response.get_json()['received'] == CHUNK
+
+
+def test_corrupt_chunk_is_discarded(client, auth, payload, open_upload):
+    upload_id = open_upload(payload)
+    chunk_headers = {**auth, 'Upload-Offset': '0', 'X-Chunk-SHA256': '0' * 64,
+                     'Content-Type': 'application/octet-stream'}
+    response = client.put(f'/api/uploads/{upload_id}', headers=chunk_headers, data=payload[:CHUNK])
+    assert response.status_code == 400
+    assert client.get(f'/api/uploads/{upload_id}', headers=auth).get_json()['upload']['received'] == 0
+
+
+def test_incomplete_upload_cannot_complete(client, auth, payload, open_upload):
+    upload_id = open_upload(payload)
+    put_chunk(client, auth, upload_id, 0, payload[:CHUNK])
+    response = client.post(f'/api/uploads/{upload_id}/complete', headers=auth)
+    assert response.status_code == 409
+    assert response.get_json()['received'] == CHUNK
+
+
+def test_whole_file_checksum_mismatch_fails_upload(client, auth, open_upload):
+    data = b'0123456789'
+    upload_id = open_upload(data, sha256='a' * 64)
+    put_chunk(client, auth, upload_id, 0, data)
+    assert client.post(f'/api/uploads/{upload_id}/complete', headers=auth).status_code == 422
+    assert client.get(f'/api/uploads/{upload_id}', headers=auth).get_json()['upload']['status'] == 'failed'
+
+
+@pytest.mark.parametrize('sha256', [123, ['a'], {'x': 1}, 'A' * 64, 'abc'])
+def test_malformed_sha256_is_rejected(client, auth, create_tender, sha256):
+    tender_id = create_tender(auth)
+    response = client.post(f'/api/tenders/{tender_id}/uploads', headers=auth,
+                           json={'filename': 'a.pdf', 'size': 10, 'sha256': sha256})
+    assert response.status_code == 400
+
+
+def test_upload_is_private(client, register, payload, open_upload):
+    upload_id = open_upload(payload)
+    _, other = register()
+    assert client.get(f'/api/uploads/{upload_id}', headers=other).status_code == 404
+    assert put_chunk(client, other, upload_id, 0, payload[:CHUNK]).status_code == 404
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Model training for the Tender Management System
+Builds features from won/lost tenders and trains the risk model in a background job
+"""
+
+import os
+import time
+import logging
+import threading
+from datetime import timedelta
+
+from startup import lazy_import
+from model_registry import ModelRegistry
+
+np = lazy_import('numpy')
+pd = lazy_import('pandas')
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_MAP = {'Construction': 0, 'Technology': 1, 'Healthcare': 2, 'Infrastructure': 3, 'Education': 4}
+# When a tender's outcome became known: set on status change, else the row's creation
+OUTCOME_TIME_SQL = 'COALESCE(outcome_at, created_at)'
+
+TRAIN_JOBS = int(os.environ.get('ML_TRAIN_JOBS', -1))
+TREES = int(os.environ.get('ML_TREES', 100))
+TREES_PER_UPDATE = int(os.environ.get('ML_TREES_PER_UPDATE', 10))
+# Past this many trees an incremental update becomes a full retrain
+MAX_TREES = int(os.environ.get('ML_MAX_TREES', 300))
+# Rows drawn per tree; keeps fit time and model size flat on large tables
+MAX_SAMPLES_PER_TREE = int(os.environ.get('ML_MAX_SAMPLES_PER_TREE', 200000))
+MIN_SAMPLES = int(os.environ.get('ML_MIN_TRAINING_SAMPLES', 200))
+MIN_NEW_SAMPLES = int(os.environ.get('ML_MIN_INCREMENTAL_SAMPLES', 50))
+HOLDOUT_FRACTION = 0.1
+AUTO_ACTIVATE = os.environ.get('ML_AUTO_ACTIVATE', '1') == '1'
+HEARTBEAT_INTERVAL = 60
+# Days-to-deadline edges; a stored score is refreshed when its tender crosses one
+DEADLINE_BUCKET_EDGES = tuple(int(edge) for edge in os.environ.get(
+    'SCORE_REFRESH_BUCKETS', '0,7,14,30,60,90,180,365').split(','))
+
+
+def encode_categories(categories):
+    """Category names to model codes (unknown -> 0); case-insensitive"""
+    return [CATEGORY_MAP.get(str(category).strip().title(), 0) if category else 0 for category in categories]
+
+
+def deadline_bucket(days):
+    """Bucket index of days to deadline (0 = past due); scalar or array"""
+    return np.searchsorted(DEADLINE_BUCKET_EDGES, days, side='right')
+
+
+def deadline_bucket_range(bucket, today):
+    """[first, last) deadline dates of a bucket as of today; None for an open end"""
+    edges = (None, *DEADLINE_BUCKET_EDGES, None)
+    lo, hi = edges[bucket], edges[bucket + 1]
+    return (None if lo is None else today + timedelta(days=lo),
+            None if hi is None else today + timedelta(days=hi))
+
+
+def load_outcomes(conn):
+    """Every decided tender as a DataFrame, oldest submission first"""
+    rows = conn.execute(f'''
+        SELECT id, user_id, client, value, deadline, category, status,
+               COALESCE(submission_date, DATE(created_at)), {OUTCOME_TIME_SQL}
+        FROM tenders
+        WHERE status IN ('won', 'lost')
+    ''').fetchall()
+    frame = pd.DataFrame.from_records(rows, columns=[
+        'id', 'user_id', 'client', 'value', 'deadline', 'category', 'status', 'submission_date', 'outcome_at'
+    ])
+    frame['submission_date'] = pd.to_datetime(frame['submission_date'], errors='coerce')
+    return frame.sort_values(['submission_date', 'id'], kind='stable').reset_index(drop=True)
+
+
+def history_rate(wins, decided):
+    """Laplace-smoothed win rate; 0.5 with no decided bids (also the prediction-time default)"""
+    return (wins + 1) / (decided + 2)
+
+
+def client_win_history(frame):
+    """Per (user, client) win rate over outcomes submitted before each tender
+
+    Smoothed with history_rate, as client_stats does at prediction time.
+    Only earlier tenders count, so the feature never sees the outcome it is
+    used to predict.
+    """
+    keys = [frame['user_id'], frame['client'].fillna('')]
+    won = (frame['status'] == 'won').astype(float)
+    prior_wins = won.groupby(keys, sort=False).cumsum() - won
+    prior_count = won.groupby(keys, sort=False).cumcount()
+    return history_rate(prior_wins, prior_count)
+
+
+def build_features(frame):
+    """(X, y) for the risk model; y is 1 for a lost tender. Expects load_outcomes order"""
+    deadline = pd.to_datetime(frame['deadline'], errors='coerce')
+    X = np.column_stack([
+        pd.to_numeric(frame['value'], errors='coerce').fillna(0).to_numpy(dtype=float),
+        (deadline - frame['submission_date']).dt.days.fillna(0).to_numpy(dtype=float),
+        np.asarray(encode_categories(frame['category'].tolist()), dtype=float),
+        client_win_history(frame).to_numpy(dtype=float),
+    ])
+    y = (frame['status'] == 'lost').to_numpy(dtype=int)
+    return X, y
+
+
+def _forest(n_samples, n_jobs):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(
+        n_estimators=TREES,
+        min_samples_leaf=20,
+        max_samples=MAX_SAMPLES_PER_TREE if n_samples > MAX_SAMPLES_PER_TREE else None,
+        n_jobs=n_jobs,
+        warm_start=True,
+        random_state=42
+    )
+
+
+def _holdout_metrics(model, X, y):
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    if not len(y):
+        return None
+    probs = model.predict_proba(X)[:, 1]
+    result = {'samples': int(len(y)), 'accuracy': round(float(accuracy_score(y, probs >= 0.5)), 4)}
+    if len(set(y.tolist())) == 2:
+        result['rocAuc'] = round(float(roc_auc_score(y, probs)), 4)
+    return result
+
+
+def train(conn, registry, mode='full', n_jobs=TRAIN_JOBS):
+    """Train from outcomes and save a new version; returns its metadata, or None if skipped
+
+    full: a new forest on all outcomes but the most recent HOLDOUT_FRACTION.
+    incremental: TREES_PER_UPDATE trees fitted on outcomes that arrived since
+    the active version was trained, added to its forest (warm start).
+    """
+    base_version = registry.active()
+    if base_version is None:
+        # The profit model and scaler come from the active version (see below)
+        raise RuntimeError('No active model version to train from')
+    base = registry.load(base_version)
+    base_meta = registry.metadata(base_version)
+    if mode == 'incremental' and not (base_meta and base_meta.get('trainedThrough')):
+        logger.info("Active model was not trained on outcomes; running a full training instead")
+        mode = 'full'
+    if mode == 'incremental' and base['risk_model'].n_estimators + TREES_PER_UPDATE > MAX_TREES:
+        logger.info(f"Forest would exceed {MAX_TREES} trees; running a full training instead")
+        mode = 'full'
+
+    started = time.perf_counter()
+    frame = load_outcomes(conn)
+    X, y = build_features(frame)
+    feature_seconds = time.perf_counter() - started
+    trained_through = str(frame['outcome_at'].max()) if len(frame) else None
+
+    started = time.perf_counter()
+    if mode == 'full':
+        if len(y) < MIN_SAMPLES or len(set(y.tolist())) < 2:
+            logger.info(f"Not enough won/lost tenders to train ({len(y)}, need {MIN_SAMPLES} with both outcomes)")
+            return None
+        split = int(len(y) * (1 - HOLDOUT_FRACTION))
+        # Forests don't depend on feature scale, so the active scaler (and the
+        # profit model trained behind it) carry over unchanged
+        scaler = base['scaler']
+        risk_model = _forest(split, n_jobs)
+        risk_model.fit(scaler.transform(X[:split]), y[:split])
+        holdout = _holdout_metrics(risk_model, scaler.transform(X[split:]), y[split:])
+        samples = split
+    else:
+        new = (frame['outcome_at'].astype(str) > base_meta['trainedThrough']).to_numpy()
+        if new.sum() < MIN_NEW_SAMPLES or len(set(y[new].tolist())) < 2:
+            logger.info(f"Not enough new outcomes for an incremental update ({int(new.sum())})")
+            return None
+        scaler = base['scaler']
+        risk_model = base['risk_model']
+        risk_model.set_params(n_estimators=risk_model.n_estimators + TREES_PER_UPDATE, n_jobs=n_jobs,
+                              warm_start=True)
+        if risk_model.max_samples is not None and new.sum() <= risk_model.max_samples:
+            risk_model.set_params(max_samples=None)
+        risk_model.fit(scaler.transform(X[new]), y[new])
+        holdout = None
+        samples = int(new.sum())
+    train_seconds = time.perf_counter() - started
+
+    version = registry.save(
+        {'scaler': scaler, 'risk_model': risk_model, 'profit_model': base['profit_model']},
+        {
+            'source': 'outcomes',
+            'mode': mode,
+            'baseVersion': base_version,
+            'samples': samples,
+            'trees': risk_model.n_estimators,
+            'trainedThrough': trained_through,
+            'featureSeconds': round(feature_seconds, 3),
+            'trainSeconds': round(train_seconds, 3),
+            'holdout': holdout,
+            # No realized margins are recorded, so the profit model is carried over
+            'profitModel': f'carried over from {base_version}',
+        }
+    )
+    if AUTO_ACTIVATE:
+        registry.activate(version)
+    return registry.metadata(version)
+
+
+def new_outcomes(conn, since):
+    """Outcomes recorded after `since` (all of them when since is None)"""
+    return conn.execute(f'''
+        SELECT COUNT(*) FROM tenders
+        WHERE status IN ('won', 'lost') AND {OUTCOME_TIME_SQL} > ?
+    ''', (since or '1970-01-01',)).fetchone()[0]
+
+
+# Job handler (runs inside a job queue worker process)
+def train_job(ctx, payload):
+    """Train and save (and activate) a new model version"""
+    # Keep the job's updated_at fresh so a long fit isn't mistaken for a dead worker
+    stop = threading.Event()
+    def heartbeat():
+        while not stop.wait(HEARTBEAT_INTERVAL):
+            ctx.progress(0.5)
+    threading.Thread(target=heartbeat, name='train-heartbeat', daemon=True).start()
+    try:
+        registry = ModelRegistry(os.environ.get('MODEL_PATH', 'models'))
+        with ctx.db.connection() as conn:
+            meta = train(conn, registry, payload.get('mode', 'full'))
+        if meta:
+            logger.info(f"Trained model {meta['version']} ({meta['mode']}, {meta['samples']} samples, "
+                        f"features {meta['featureSeconds']}s, fit {meta['trainSeconds']}s)")
+    finally:
+        stop.set()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Resumable uploads for the Tender Management System
+Large files arrive in checksummed chunks written straight to disk; an interrupted upload resumes at the last stored byte
+"""
+
+import os
+import uuid
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+
+import metrics
+from storage import CHUNK_SIZE as READ_SIZE
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_SIZE = int(os.environ.get('UPLOAD_MAX_SIZE', 2 * 1024 ** 3))
+# Largest chunk per request; must stay below MAX_CONTENT_LENGTH
+MAX_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 8 * 1024 * 1024))
+# Unfinished sessions are discarded after this many hours without a chunk
+SESSION_TTL_HOURS = int(os.environ.get('UPLOAD_SESSION_TTL_HOURS', 24))
+CLEANUP_BATCH = 100
+
+
+class UploadError(Exception):
+    """A rejected chunk or session operation; carries the HTTP status"""
+
+    def __init__(self, message, status=400, **details):
+        super().__init__(message)
+        self.status = status
+        self.details = details
+
+
+def ensure_schema(conn):
+    """Upload sessions (SQLite; see supabase/migrations for PostgreSQL)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS upload_sessions (
+            id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            tender_id INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            received INTEGER NOT NULL DEFAULT 0,
+            sha256 TEXT,
+            ocr_engine TEXT,
+            status TEXT NOT NULL DEFAULT 'open',
+            document_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated ON upload_sessions (status, updated_at)')
+
+
+SESSION_COLUMNS = ('id', 'user_id', 'tender_id', 'filename', 'size', 'received', 'sha256', 'ocr_engine',
+                   'status', 'document_id')
+
+
+def payload(session):
+    """API shape of an upload session"""
+    return {
+        'id': session['id'],
+        'tenderId': session['tender_id'],
+        'filename': session['filename'],
+        'size': session['size'],
+        'received': session['received'],
+        'status': session['status'],
+        'chunkSize': MAX_CHUNK_SIZE,
+        'documentId': session['document_id'],
+    }
+
+
+class UploadStore:
+    """Partial files under root/sessions/<id>.part, tracked in upload_sessions"""
+
+    def __init__(self, root):
+        self.root = os.path.join(root, 'sessions')
+
+    def path(self, session_id):
+        return os.path.join(self.root, f'{session_id}.part')
+
+    def create(self, conn, user_id, tender_id, filename, size, sha256=None, ocr_engine=None):
+        """Open a session and its empty partial file"""
+        if size <= 0 or size > MAX_UPLOAD_SIZE:
+            raise UploadError(f'size must be between 1 and {MAX_UPLOAD_SIZE} bytes')
+        if sha256 is not None and not (isinstance(sha256, str) and len(sha256) == 64
+                                       and all(c in '0123456789abcdef' for c in sha256)):
+            raise UploadError('sha256 must be 64 lowercase hex digits')
+        session_id = uuid.uuid4().hex
+        os.makedirs(self.root, exist_ok=True)
+        open(self.path(session_id), 'wb').close()
+        conn.execute('''
+            INSERT INTO upload_sessions (id, user_id, tender_id, filename, size, sha256, ocr_engine)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (session_id, user_id, tender_id, filename, size, sha256, ocr_engine))
+        return self.get(conn, session_id, user_id)
+
+    def get(self, conn, session_id, user_id):
+        """The user's session, or None"""
+        row = conn.execute(f'''
+            SELECT {', '.join(SESSION_COLUMNS)} FROM upload_sessions WHERE id = ? AND user_id = ?
+        ''', (session_id, user_id)).fetchone()
+        return dict(zip(SESSION_COLUMNS, row)) if row else None
+
+    def write_chunk(self, conn, session, offset, stream, length, chunk_sha256=None):
+        """Append one chunk at `offset` and commit the new received count; returns it
+
+        Only the next expected offset is accepted (409 reports the current one,
+        so a client that lost a response can resynchronize). The chunk is
+        streamed to the partial file in READ_SIZE pieces and, when
+        chunk_sha256 is given, checked before it counts; a bad chunk is cut
+        off again. An exclusive lock on the partial file keeps concurrent
+        requests for one session, from any worker, from interleaving.
+        """
+        if length is None or length <= 0:
+            raise UploadError('Content-Length is required', 411)
+        if length > MAX_CHUNK_SIZE:
+            raise UploadError(f'Chunks are limited to {MAX_CHUNK_SIZE} bytes', 413)
+
+        with self._locked(session) as f:
+            # Re-read under the lock: another request may have just advanced it
+            status, received = self._state(conn, session)
+            if status != 'open':
+                raise UploadError(f'Upload is {status}', 409)
+            if offset != received:
+                raise UploadError('Chunk offset does not match the bytes received', 409, received=received)
+            if offset + length > session['size']:
+                raise UploadError('Chunk runs past the declared size', 400, received=received)
+
+            digest = hashlib.sha256()
+            written = 0
+            f.seek(offset)
+            f.truncate()
+            while written < length:
+                data = stream.read(min(READ_SIZE, length - written))
+                if not data:
+                    break
+                digest.update(data)
+                f.write(data)
+                written += len(data)
+            f.flush()
+            if written != length:
+                f.truncate(offset)
+                raise UploadError('Chunk ended early; resend it', 400, received=received)
+            if chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+                f.truncate(offset)
+                raise UploadError('Chunk checksum mismatch; resend it', 400, received=received)
+            os.fsync(f.fileno())
+
+            conn.execute('''
+                UPDATE upload_sessions SET received = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?
+            ''', (offset + length, session['id']))
+            conn.commit()
+        session['received'] = offset + length
+        return session['received']
+
+    def finish(self, conn, session, blob_store, create_document):
+        """Verify the whole file, move it into the blob store and create its document
+
+        The file is hashed in one sequential pass. On a mismatch with the
+        declared sha256 the session fails and its data is dropped, since the
+        bad chunk can't be told apart. create_document(sha256, size) returns
+        the new document's id; the session is completed under the same lock,
+        so a repeated request can't store the file twice.
+        """
+        with self._locked(session), metrics.timed('upload_finish'):
+            status, received = self._state(conn, session)
+            if status != 'open':
+                raise UploadError(f'Upload is {status}', 409)
+            if received != session['size']:
+                raise UploadError('Upload is not complete', 409, received=received)
+            path = self.path(session['id'])
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for data in iter(lambda: f.read(READ_SIZE), b''):
+                    digest.update(data)
+            sha256 = digest.hexdigest()
+            if session['sha256'] and sha256 != session['sha256']:
+                self.discard(conn, session, 'failed')
+                raise UploadError('File checksum mismatch; the upload must be restarted', 422)
+
+            document_id = create_document(sha256, session['size'])
+            blob_store.adopt(path, sha256)
+            conn.execute('''
+                UPDATE upload_sessions SET status = 'complete', document_id = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (document_id, session['id']))
+            conn.commit()
+        session.update(status='complete', received=received, document_id=document_id)
+        return document_id
+
+    @contextmanager
+    def _locked(self, session):
+        """The session's partial file, exclusively locked across processes"""
+        try:
+            f = open(self.path(session['id']), 'r+b')
+        except FileNotFoundError:
+            raise UploadError('Upload is no longer open', 409)
+        with f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                raise UploadError('Another request for this upload is in progress', 409)
+            yield f
+
+    def _state(self, conn, session):
+        return conn.execute('SELECT status, received FROM upload_sessions WHERE id = ?',
+                            (session['id'],)).fetchone()
+
+    def abort(self, conn, session):
+        """Abandon an open upload; a chunk still being written makes this a 409"""
+        with self._locked(session):
+            status, _ = self._state(conn, session)
+            if status != 'open':
+                raise UploadError(f'Upload is {status}', 409)
+            self.discard(conn, session)
+
+    def discard(self, conn, session, status='aborted'):
+        """End a session and delete its partial file"""
+        conn.execute('UPDATE upload_sessions SET status = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?',
+                     (status, session['id']))
+        conn.commit()
+        session['status'] = status
+        try:
+            os.remove(self.path(session['id']))
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self, conn):
+        """Expire open sessions idle for SESSION_TTL_HOURS; returns how many"""
+        if conn.backend.name == 'sqlite':
+            cutoff = f"datetime('now', '-{SESSION_TTL_HOURS} hours')"
+        else:
+            cutoff = f"NOW() - INTERVAL '{SESSION_TTL_HOURS} hours'"
+        rows = conn.execute(f'''
+            SELECT id FROM upload_sessions WHERE status = 'open' AND updated_at < {cutoff} LIMIT ?
+        ''', (CLEANUP_BATCH,)).fetchall()
+        for (session_id,) in rows:
+            self.discard(conn, {'id': session_id}, 'expired')
+        if rows:
+            logger.info(f"Expired {len(rows)} idle upload sessions")
+        return len(rows)
@@ -4,7 +4,7 @@ import { useAuth } from '../../contexts/AuthContext'
 import toast from 'react-hot-toast'
 
 const Profile = () => {
-  const { user } = useAuth()
+  const { user, updateProfile } = useAuth()
   const [isEditing, setIsEditing] = useState(false)
   const [formData, setFormData] = useState({
     name: user?.name || '',
@@ -25,8 +25,8 @@ const Profile = () => {
   const handleSubmit = async (e) => {
     e.preventDefault()
     try {
-      // In a real app, you would make an API call to update the profile
-      console.log('Updating profile:', formData)
+      const { email, ...profile } = formData
+      await updateProfile(profile)
       toast.success('Profile updated successfully!')
       setIsEditing(false)
     } catch (error) {
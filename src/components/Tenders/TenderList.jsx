@@ -20,19 +20,25 @@ const TenderList = () => {
   const [searchTerm, setSearchTerm] = useState('')
   const [statusFilter, setStatusFilter] = useState('all')
   const [sortBy, setSortBy] = useState('deadline')
+  const [nextCursor, setNextCursor] = useState(null)
 
   useEffect(() => {
     fetchTenders()
-  }, [])
+  }, [statusFilter])
 
-  const fetchTenders = async () => {
+  const fetchTenders = async (cursor = null) => {
     try {
-      const response = await axios.get('/api/tenders')
-      setTenders(response.data.tenders)
+      const params = { limit: 50 }
+      if (statusFilter !== 'all') params.status = statusFilter
+      if (cursor) params.cursor = cursor
+      const response = await axios.get('/api/tenders', { params })
+      setTenders(prev => cursor ? [...prev, ...response.data.tenders] : response.data.tenders)
+      setNextCursor(response.data.nextCursor)
     } catch (error) {
       console.error('Error fetching tenders:', error)
       // Use mock data for demo
       setTenders(getMockTenders())
+      setNextCursor(null)
     } finally {
       setLoading(false)
     }
@@ -298,6 +304,14 @@ const TenderList = () => {
         ))}
       </div>
 
+      {nextCursor && (
+        <div className="text-center">
+          <button onClick={() => fetchTenders(nextCursor)} className="btn-secondary">
+            Load more
+          </button>
+        </div>
+      )}
+
       {filteredTenders.length === 0 && (
         <div className="text-center py-12">
           <FileText className="w-12 h-12 text-gray-400 mx-auto mb-4" />
@@ -86,11 +86,18 @@ export const AuthProvider = ({ children }) => {
     toast.success('Logged out successfully')
   }
 
+  const updateProfile = async (profile) => {
+    const response = await axios.put('/api/auth/me', profile)
+    setUser(response.data.user)
+    return response.data.user
+  }
+
   const value = {
     user,
     login,
     register,
     logout,
+    updateProfile,
     loading
   }
 
@@ -0,0 +1,71 @@
+-- Per-user dashboard summary maintained incrementally on tender writes
+-- PostgreSQL counterpart of the tender_stats table and triggers in backend/app.py
+
+CREATE TABLE IF NOT EXISTS tender_stats (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    total_tenders INTEGER NOT NULL DEFAULT 0,
+    active_tenders INTEGER NOT NULL DEFAULT 0,
+    won_tenders INTEGER NOT NULL DEFAULT 0,
+    won_value DECIMAL(15,2) NOT NULL DEFAULT 0,
+    profit_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    profit_count INTEGER NOT NULL DEFAULT 0,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_tenders_user_created ON tenders(user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_tenders_user_status ON tenders(user_id, status, created_at, id);
+
+CREATE OR REPLACE FUNCTION apply_tender_stats_delta(t tenders, sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO tender_stats (user_id) VALUES (t.user_id) ON CONFLICT (user_id) DO NOTHING;
+    UPDATE tender_stats SET
+        total_tenders = total_tenders + sign,
+        active_tenders = active_tenders + sign * (t.status = 'active')::INTEGER,
+        won_tenders = won_tenders + sign * (t.status = 'won')::INTEGER,
+        won_value = won_value + sign * (CASE WHEN t.status = 'won' THEN COALESCE(t.value, 0) ELSE 0 END),
+        profit_sum = profit_sum + sign * COALESCE(t.profit_prediction, 0),
+        profit_count = profit_count + sign * (t.profit_prediction IS NOT NULL)::INTEGER,
+        version = version + 1
+    WHERE user_id = t.user_id;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_tender_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_tender_stats_delta(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_tender_stats_delta(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maintain_tender_stats ON tenders;
+CREATE TRIGGER maintain_tender_stats
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, status, value, profit_prediction ON tenders
+    FOR EACH ROW EXECUTE FUNCTION maintain_tender_stats();
+
+-- Backfill existing tenders
+INSERT INTO tender_stats (user_id, total_tenders, active_tenders, won_tenders, won_value, profit_sum, profit_count)
+SELECT user_id,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE status = 'active'),
+       COUNT(*) FILTER (WHERE status = 'won'),
+       COALESCE(SUM(value) FILTER (WHERE status = 'won'), 0),
+       COALESCE(SUM(profit_prediction), 0),
+       COUNT(profit_prediction)
+FROM tenders
+WHERE user_id IS NOT NULL
+GROUP BY user_id
+ON CONFLICT (user_id) DO UPDATE SET
+    total_tenders = EXCLUDED.total_tenders,
+    active_tenders = EXCLUDED.active_tenders,
+    won_tenders = EXCLUDED.won_tenders,
+    won_value = EXCLUDED.won_value,
+    profit_sum = EXCLUDED.profit_sum,
+    profit_count = EXCLUDED.profit_count,
+    version = tender_stats.version + 1;
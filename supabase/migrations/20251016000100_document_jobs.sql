@@ -0,0 +1,21 @@
+-- Background document processing
+-- PostgreSQL counterpart of the jobs table in backend/jobs.py
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS status VARCHAR(20) DEFAULT 'ready';
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS job_id BIGINT;
+
+CREATE TABLE IF NOT EXISTS jobs (
+    id BIGSERIAL PRIMARY KEY,
+    kind VARCHAR(100) NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    progress DOUBLE PRECISION NOT NULL DEFAULT 0,
+    error TEXT,
+    run_after DOUBLE PRECISION NOT NULL,
+    created_at DOUBLE PRECISION NOT NULL,
+    updated_at DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs(status, run_after, id);
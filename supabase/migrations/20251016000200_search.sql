@@ -0,0 +1,18 @@
+-- Full-text search over tenders and extracted document text
+-- PostgreSQL counterpart of the FTS5 indexes in backend/search.py
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(client, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED;
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(original_filename, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(extracted_text, '')), 'D')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_tenders_search ON tenders USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_documents_search ON documents USING GIN (search_vector);
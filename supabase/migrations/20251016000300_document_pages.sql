@@ -0,0 +1,12 @@
+-- Per-page document text extraction
+-- PostgreSQL counterpart of document_pages in backend/documents.py
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS page_count INTEGER;
+
+CREATE TABLE IF NOT EXISTS document_pages (
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page_number INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    PRIMARY KEY (document_id, page_number)
+);
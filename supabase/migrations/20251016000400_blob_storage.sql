@@ -0,0 +1,20 @@
+-- Content-addressed document storage and extraction cache
+-- PostgreSQL counterpart of backend/storage.py and extraction_cache in backend/documents.py
+
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    size BIGINT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS blob_sha256 CHAR(64) REFERENCES blobs(sha256);
+CREATE INDEX IF NOT EXISTS idx_documents_blob ON documents(blob_sha256);
+
+CREATE TABLE IF NOT EXISTS extraction_cache (
+    sha256 CHAR(64) NOT NULL,
+    extractor_version VARCHAR(50) NOT NULL,
+    document_id UUID NOT NULL REFERENCES documents(id) ON DELETE CASCADE,
+    page_count INTEGER,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    PRIMARY KEY (sha256, extractor_version)
+);
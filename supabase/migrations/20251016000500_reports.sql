@@ -0,0 +1,15 @@
+-- Cached PDF report renders
+-- PostgreSQL counterpart of the reports table in backend/reports.py
+
+CREATE TABLE IF NOT EXISTS reports (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    report_type VARCHAR(20) NOT NULL,
+    data_version BIGINT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'processing',
+    job_id BIGINT,
+    file_path TEXT NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_reports_user_type_version ON reports(user_id, report_type, data_version);
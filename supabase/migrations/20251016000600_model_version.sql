@@ -0,0 +1,5 @@
+-- Model version behind each tender's risk_score/profit_prediction
+-- Versions live in the model registry on disk (backend/model_registry.py)
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS model_version VARCHAR(64);
+CREATE INDEX IF NOT EXISTS idx_tenders_model_version ON tenders(model_version);
@@ -0,0 +1,22 @@
+-- When each tender was decided (won/lost); new outcomes drive incremental model training
+-- PostgreSQL counterpart of trg_tenders_outcome in backend/app.py
+
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS outcome_at TIMESTAMP WITH TIME ZONE;
+
+CREATE OR REPLACE FUNCTION stamp_tender_outcome()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status IN ('won', 'lost') AND OLD.status IS DISTINCT FROM NEW.status THEN
+        NEW.outcome_at := NOW();
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS stamp_tender_outcome ON tenders;
+CREATE TRIGGER stamp_tender_outcome
+    BEFORE UPDATE OF status ON tenders
+    FOR EACH ROW EXECUTE FUNCTION stamp_tender_outcome();
+
+CREATE INDEX IF NOT EXISTS idx_tenders_outcome_time ON tenders ((COALESCE(outcome_at, created_at)))
+    WHERE status IN ('won', 'lost');
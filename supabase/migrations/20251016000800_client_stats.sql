@@ -0,0 +1,63 @@
+-- Per (user, client) bid/win counters behind the ML client_history feature
+-- PostgreSQL counterpart of backend/client_stats.py
+
+CREATE TABLE IF NOT EXISTS client_stats (
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    client TEXT NOT NULL,
+    bids INTEGER NOT NULL DEFAULT 0,
+    wins INTEGER NOT NULL DEFAULT 0,
+    losses INTEGER NOT NULL DEFAULT 0,
+    value_sum DECIMAL(15,2) NOT NULL DEFAULT 0,
+    last_submission DATE,
+    PRIMARY KEY (user_id, client)
+);
+
+CREATE OR REPLACE FUNCTION apply_client_stats_delta(t tenders, sign INTEGER)
+RETURNS VOID AS $$
+BEGIN
+    IF sign > 0 THEN
+        INSERT INTO client_stats (user_id, client, last_submission)
+        VALUES (t.user_id, COALESCE(t.client, ''), COALESCE(t.submission_date, t.created_at::DATE))
+        ON CONFLICT (user_id, client) DO UPDATE SET
+            last_submission = GREATEST(client_stats.last_submission, excluded.last_submission);
+    END IF;
+    UPDATE client_stats SET
+        bids = bids + sign,
+        wins = wins + sign * (t.status = 'won')::INTEGER,
+        losses = losses + sign * (t.status = 'lost')::INTEGER,
+        value_sum = value_sum + sign * COALESCE(t.value, 0)
+    WHERE user_id = t.user_id AND client = COALESCE(t.client, '');
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION maintain_client_stats()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM apply_client_stats_delta(OLD, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM apply_client_stats_delta(NEW, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS maintain_client_stats ON tenders;
+CREATE TRIGGER maintain_client_stats
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, client, status, value, submission_date ON tenders
+    FOR EACH ROW EXECUTE FUNCTION maintain_client_stats();
+
+-- Backfill existing tenders
+INSERT INTO client_stats (user_id, client, bids, wins, losses, value_sum, last_submission)
+SELECT user_id,
+       COALESCE(client, ''),
+       COUNT(*),
+       COUNT(*) FILTER (WHERE status = 'won'),
+       COUNT(*) FILTER (WHERE status = 'lost'),
+       COALESCE(SUM(value), 0),
+       MAX(COALESCE(submission_date, created_at::DATE))
+FROM tenders
+WHERE user_id IS NOT NULL
+GROUP BY user_id, COALESCE(client, '')
+ON CONFLICT (user_id, client) DO NOTHING;
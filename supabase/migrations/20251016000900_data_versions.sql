@@ -0,0 +1,72 @@
+-- Per-user data version behind ETag/Last-Modified on the read endpoints
+-- PostgreSQL counterpart of backend/http_cache.py
+
+CREATE TABLE IF NOT EXISTS data_versions (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO data_versions (user_id, version)
+SELECT id, 1 FROM users
+ON CONFLICT (user_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version(owner UUID)
+RETURNS VOID AS $$
+BEGIN
+    IF owner IS NULL THEN
+        RETURN;
+    END IF;
+    INSERT INTO data_versions (user_id, version, updated_at) VALUES (owner, 1, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET version = data_versions.version + 1, updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_user_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM bump_data_version(NEW.id);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_tender_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_data_version(OLD.user_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND OLD.user_id IS DISTINCT FROM NEW.user_id) THEN
+        PERFORM bump_data_version(NEW.user_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION bump_document_data_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM bump_data_version((SELECT user_id FROM tenders WHERE id = OLD.tender_id));
+    END IF;
+    IF TG_OP = 'INSERT' OR (TG_OP = 'UPDATE' AND OLD.tender_id IS DISTINCT FROM NEW.tender_id) THEN
+        PERFORM bump_data_version((SELECT user_id FROM tenders WHERE id = NEW.tender_id));
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS bump_user_data_version ON users;
+CREATE TRIGGER bump_user_data_version
+    AFTER INSERT OR UPDATE ON users
+    FOR EACH ROW EXECUTE FUNCTION bump_user_data_version();
+
+DROP TRIGGER IF EXISTS bump_tender_data_version ON tenders;
+CREATE TRIGGER bump_tender_data_version
+    AFTER INSERT OR UPDATE OR DELETE ON tenders
+    FOR EACH ROW EXECUTE FUNCTION bump_tender_data_version();
+
+DROP TRIGGER IF EXISTS bump_document_data_version ON documents;
+CREATE TRIGGER bump_document_data_version
+    AFTER INSERT OR UPDATE OR DELETE ON documents
+    FOR EACH ROW EXECUTE FUNCTION bump_document_data_version();
@@ -0,0 +1,19 @@
+-- Resumable chunked uploads
+-- PostgreSQL counterpart of backend/uploads.py
+
+CREATE TABLE IF NOT EXISTS upload_sessions (
+    id VARCHAR(32) PRIMARY KEY,
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    tender_id UUID NOT NULL REFERENCES tenders(id) ON DELETE CASCADE,
+    filename VARCHAR(255) NOT NULL,
+    size BIGINT NOT NULL,
+    received BIGINT NOT NULL DEFAULT 0,
+    sha256 CHAR(64),
+    ocr_engine VARCHAR(20),
+    status VARCHAR(20) NOT NULL DEFAULT 'open',
+    document_id UUID REFERENCES documents(id) ON DELETE SET NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_upload_sessions_updated ON upload_sessions(status, updated_at);
@@ -0,0 +1,20 @@
+-- Deadline-aware score refresh
+-- PostgreSQL counterpart of the deadline_bucket column in backend/app.py and backend/scheduler.py
+
+-- Days-to-deadline bucket each score was computed in; NULL means re-score on the next run
+ALTER TABLE tenders ADD COLUMN IF NOT EXISTS deadline_bucket INTEGER;
+
+CREATE INDEX IF NOT EXISTS idx_tenders_open_deadline ON tenders(deadline)
+    WHERE status IN ('active', 'pending');
+
+-- One lease row per periodic task, claimed by whichever worker runs it
+CREATE TABLE IF NOT EXISTS scheduled_tasks (
+    name VARCHAR(100) PRIMARY KEY,
+    next_run DOUBLE PRECISION NOT NULL DEFAULT 0,
+    lease_until DOUBLE PRECISION NOT NULL DEFAULT 0,
+    last_started DOUBLE PRECISION,
+    last_duration DOUBLE PRECISION,
+    last_rows INTEGER,
+    last_error TEXT,
+    runs INTEGER NOT NULL DEFAULT 0
+);
@@ -0,0 +1,55 @@
+-- Extracted document text moved off the documents row
+-- PostgreSQL counterpart of document_texts in backend/documents.py
+
+CREATE TABLE IF NOT EXISTS document_texts (
+    document_id UUID PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE,
+    text TEXT NOT NULL
+);
+
+INSERT INTO document_texts (document_id, text)
+SELECT id, extracted_text FROM documents WHERE extracted_text IS NOT NULL
+ON CONFLICT (document_id) DO NOTHING;
+
+-- search_vector was generated from extracted_text; it becomes a plain column kept by triggers
+DROP INDEX IF EXISTS idx_documents_search;
+ALTER TABLE documents DROP COLUMN IF EXISTS search_vector;
+ALTER TABLE documents DROP COLUMN IF EXISTS extracted_text;
+ALTER TABLE documents ADD COLUMN search_vector tsvector;
+
+CREATE OR REPLACE FUNCTION document_search_vector(filename TEXT, body TEXT) RETURNS tsvector AS $$
+    SELECT setweight(to_tsvector('english', coalesce(filename, '')), 'A') ||
+           setweight(to_tsvector('english', coalesce(body, '')), 'D')
+$$ LANGUAGE sql IMMUTABLE;
+
+UPDATE documents d SET search_vector = document_search_vector(
+    d.original_filename, (SELECT text FROM document_texts x WHERE x.document_id = d.id));
+
+CREATE INDEX IF NOT EXISTS idx_documents_search ON documents USING GIN (search_vector);
+
+CREATE OR REPLACE FUNCTION documents_search_vector_row() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.search_vector := document_search_vector(
+        NEW.original_filename, (SELECT text FROM document_texts WHERE document_id = NEW.id));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_documents_search_vector ON documents;
+CREATE TRIGGER trg_documents_search_vector
+    BEFORE INSERT OR UPDATE OF original_filename ON documents
+    FOR EACH ROW EXECUTE FUNCTION documents_search_vector_row();
+
+CREATE OR REPLACE FUNCTION document_texts_search_vector() RETURNS TRIGGER AS $$
+DECLARE
+    target UUID := CASE WHEN TG_OP = 'DELETE' THEN OLD.document_id ELSE NEW.document_id END;
+    body TEXT := CASE WHEN TG_OP = 'DELETE' THEN NULL ELSE NEW.text END;
+BEGIN
+    UPDATE documents SET search_vector = document_search_vector(original_filename, body) WHERE id = target;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_document_texts_search_vector ON document_texts;
+CREATE TRIGGER trg_document_texts_search_vector
+    AFTER INSERT OR UPDATE OF text OR DELETE ON document_texts
+    FOR EACH ROW EXECUTE FUNCTION document_texts_search_vector();